@@ -0,0 +1,78 @@
+"""
+Import a file of attempts with `srl add --batch` against one `srl add` per row.
+
+    python -m benchmarks.bench_add_batch --rows 1000 10000 --problems 2000
+"""
+
+from datetime import date, timedelta
+import argparse
+import os
+import random
+import tempfile
+import time
+
+# srl resolves its data directory from $HOME at import time
+os.environ["HOME"] = tempfile.mkdtemp(prefix="srl-bench-")
+
+from srl import storage  # noqa: E402
+from srl.commands import add  # noqa: E402
+
+
+def attempts(rows: int, problems: int) -> list[tuple]:
+    rng = random.Random(0)
+    start = date.today() - timedelta(days=rows // problems + 1)
+    return [
+        (f"Problem {rng.randrange(problems)}", rng.randint(1, 5), None, start + timedelta(days=i * problems // rows))
+        for i in range(rows)
+    ]
+
+
+def reset():
+    storage.ensure_data_dir()
+    for file_path in (storage.PROGRESS_FILE, storage.MASTERED_FILE, storage.NEXT_UP_FILE):
+        storage.save_json(file_path, {})
+
+
+def one_by_one(rows: list[tuple]) -> float:
+    reset()
+    today = add.today
+    start = time.perf_counter()
+    try:
+        for name, rating, url, on in rows:
+            # record_attempt always dates the attempt today
+            add.today = lambda on=on: on
+            add.record_attempt(name, rating, url)
+    finally:
+        add.today = today
+    return time.perf_counter() - start
+
+
+def batched(rows: list[tuple]) -> float:
+    reset()
+    start = time.perf_counter()
+    add.record_attempts(rows)
+    return time.perf_counter() - start
+
+
+def snapshot() -> tuple[dict, dict]:
+    return storage.load_json(storage.PROGRESS_FILE), storage.load_json(storage.MASTERED_FILE)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--problems", type=int, default=2000)
+    args = parser.parse_args()
+
+    print(f"{'rows':>7} {'per-row s':>10} {'batch s':>8} {'speedup':>8}")
+    for count in args.rows:
+        rows = attempts(count, args.problems)
+        single = one_by_one(rows)
+        expected = snapshot()
+        bulk = batched(rows)
+        assert snapshot() == expected
+        print(f"{count:>7} {single:>10.2f} {bulk:>8.3f} {single / bulk:>7.0f}x")
+
+
+if __name__ == "__main__":
+    main()
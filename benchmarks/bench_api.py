@@ -0,0 +1,82 @@
+"""
+Compare the JSON endpoints with the equivalent /run commands, which render the
+output through a recording Rich console.
+
+    python -m benchmarks.bench_api --problems 500 --repeat 50
+"""
+
+from contextlib import redirect_stdout
+from datetime import date, timedelta
+import argparse
+import io
+import json
+import os
+import statistics
+import tempfile
+import time
+
+# srl resolves its data directory from $HOME at import time
+os.environ["HOME"] = tempfile.mkdtemp(prefix="srl-bench-")
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from srl import storage  # noqa: E402
+from srl.server import create_app  # noqa: E402
+
+PAIRS = [
+    ("list -n 50", ("get", "/due", {"limit": 50})),
+    ("inprogress", ("get", "/inprogress", None)),
+    ("mastered", ("get", "/mastered", None)),
+    ("history -n 50", ("get", "/history", {"limit": 50})),
+    ("calendar", ("get", "/calendar", None)),
+]
+
+
+def seed(problems: int, attempts: int):
+    storage.ensure_data_dir()
+    start = date.today() - timedelta(days=attempts * 3)
+    progress, mastered = {}, {}
+    for i in range(problems):
+        history = [
+            {"rating": (i + j) % 4 + 1, "date": (start + timedelta(days=3 * j)).isoformat()}
+            for j in range(attempts)
+        ]
+        target = mastered if i % 5 == 0 else progress
+        target[f"Problem {i}"] = {"history": history}
+    # Never audit during the benchmark
+    storage.CONFIG_FILE.write_text(json.dumps({"audit_probability": 0}))
+    storage.save_json(storage.PROGRESS_FILE, progress)
+    storage.save_json(storage.MASTERED_FILE, mastered)
+
+
+def measure(fn, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        resp = fn()
+        timings.append((time.perf_counter() - start) * 1000)
+        assert resp.status_code == 200, resp.text
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--problems", type=int, default=500)
+    parser.add_argument("--attempts", type=int, default=6, help="Attempts per problem")
+    parser.add_argument("--repeat", type=int, default=30)
+    args = parser.parse_args()
+
+    seed(args.problems, args.attempts)
+
+    print(f"{'command':>15} {'/run ms':>9} {'endpoint':>12} {'json ms':>9} {'speedup':>8}")
+    with TestClient(create_app()) as client:
+        for cmd, (method, path, params) in PAIRS:
+            # /run consoles also echo to stdout
+            with redirect_stdout(io.StringIO()):
+                run = measure(lambda: client.post("/run", json={"cmd": cmd}), args.repeat)
+            api = measure(lambda: client.request(method, path, params=params), args.repeat)
+            print(f"{cmd:>15} {run:>9.2f} {path:>12} {api:>9.2f} {run / api:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Compare a plain in-place JSON write with the atomic temp-file + fsync + rename
+write used by srl.storage, on progress files of increasing size.
+
+    python -m benchmarks.bench_atomic_write --problems 100 1000 10000
+"""
+
+from datetime import date, timedelta
+from pathlib import Path
+import argparse
+import json
+import statistics
+import tempfile
+import time
+
+from srl.storage import write_json_file
+
+
+def make_progress(problems: int, attempts: int) -> dict:
+    start = date(2024, 1, 1)
+    return {
+        f"Problem {i}": {
+            "history": [
+                {"rating": (i + j) % 5 + 1, "date": (start + timedelta(days=j)).isoformat()}
+                for j in range(attempts)
+            ]
+        }
+        for i in range(problems)
+    }
+
+
+def plain_write(file_path: Path, data: dict):
+    with open(file_path, "w") as f:
+        json.dump(data, f, indent=2)
+
+
+def measure(write, file_path: Path, data: dict, repeat: int) -> list[float]:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        write(file_path, data)
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--problems", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--attempts", type=int, default=5, help="Attempts per problem")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'problems':>10} {'size KB':>10} {'plain ms':>10} {'atomic ms':>10} {'overhead':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        file_path = Path(tmp) / "problems_in_progress.json"
+        for problems in args.problems:
+            data = make_progress(problems, args.attempts)
+            plain = statistics.median(measure(plain_write, file_path, data, args.repeat))
+            atomic = statistics.median(measure(write_json_file, file_path, data, args.repeat))
+            size = file_path.stat().st_size / 1024
+            print(
+                f"{problems:>10} {size:>10.0f} {plain:>10.2f} {atomic:>10.2f} "
+                f"{atomic - plain:>+10.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
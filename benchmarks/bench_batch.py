@@ -0,0 +1,71 @@
+"""
+Build the due index for `srl list` one problem at a time and with the NumPy
+batch path (requires numpy: `pip install .[fast]`).
+
+    python -m benchmarks.bench_batch --problems 1000 10000 100000 --repeat 5
+"""
+
+from datetime import date, timedelta
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+
+# srl resolves its data directory from $HOME at import time
+os.environ["HOME"] = tempfile.mkdtemp(prefix="srl-bench-")
+
+from srl import batch, due_index, storage  # noqa: E402
+
+
+def seed(problems: int):
+    rng = random.Random(0)
+    today = date.today()
+    progress = {
+        f"Problem {i}": {
+            "history": [
+                {"rating": rng.randint(1, 5), "date": (today - timedelta(days=rng.randint(0, 30))).isoformat()}
+                for _ in range(3)
+            ]
+        }
+        for i in range(problems)
+    }
+    storage.ensure_data_dir()
+    storage.save_json(storage.PROGRESS_FILE, progress)
+
+
+def measure(repeat: int) -> tuple[float, list]:
+    backend = storage.get_backend()
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        rows = due_index.build(backend)["rows"]
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings), rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--problems", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    if not batch.available():
+        parser.exit(1, "numpy is not installed\n")
+
+    print(f"{'problems':>9} {'loop ms':>9} {'numpy ms':>9} {'speedup':>8}")
+    threshold = batch.BATCH_THRESHOLD
+    for problems in args.problems:
+        seed(problems)
+        batch.BATCH_THRESHOLD = float("inf")
+        loop, expected = measure(args.repeat)
+        batch.BATCH_THRESHOLD = 0
+        vectorized, rows = measure(args.repeat)
+        batch.BATCH_THRESHOLD = threshold
+        assert rows == expected
+        print(f"{problems:>9} {loop:>9.1f} {vectorized:>9.1f} {loop / vectorized:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Encode and decode generated progress files with each JSON codec and format:
+the standard library as srl used to write (indent=2) and compact, and orjson
+compact and indented when it is installed.
+
+    python -m benchmarks.bench_codec --problems 10000 100000 1000000
+"""
+
+import argparse
+import json
+import statistics
+import time
+
+from benchmarks.generate import generate
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+CODECS = {
+    "json indent=2": (lambda data: json.dumps(data, indent=2).encode(), json.loads),
+    "json compact": (lambda data: json.dumps(data, separators=(",", ":")).encode(), json.loads),
+}
+if orjson is not None:
+    CODECS["orjson compact"] = (orjson.dumps, orjson.loads)
+    CODECS["orjson indent=2"] = (lambda data: orjson.dumps(data, option=orjson.OPT_INDENT_2), orjson.loads)
+
+
+def measure(fn, arg, repeat: int) -> tuple[float, object]:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(arg)
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--problems", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--history", type=int, default=6, help="Average attempts per problem")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    if orjson is None:
+        print("orjson is not installed: only the standard library is measured")
+
+    print(f"{'problems':>9} {'codec':>16} {'encode ms':>10} {'decode ms':>10} {'size MB':>8}")
+    for problems in args.problems:
+        # Everything attempted, as in progress
+        data = generate(problems, args.history, mastered=0)["progress"]
+        for name, (dumps, loads) in CODECS.items():
+            encode, raw = measure(dumps, data, args.repeat)
+            decode, parsed = measure(loads, raw, args.repeat)
+            assert parsed == data
+            print(f"{problems:>9} {name:>16} {encode:>10.1f} {decode:>10.1f} {len(raw) / 1e6:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
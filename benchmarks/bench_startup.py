@@ -0,0 +1,75 @@
+"""
+Cold-start cost of srl commands: wall time of a fresh `python -m srl ...` and the
+import time reported by `python -X importtime`, compared with importing every
+command module up front.
+
+    python -m benchmarks.bench_startup --repeat 10
+"""
+
+from pathlib import Path
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = Path(__file__).resolve().parent.parent
+
+COMMANDS = {
+    "srl list": ["-m", "srl", "list"],
+    "srl add": ["-m", "srl", "add", "Two Sum", "3"],
+    # What `srl list` cost when every command module was imported eagerly
+    "srl list eager": [
+        "-c",
+        "import sys\n"
+        "from srl import cli\n"
+        "for name in cli.COMMANDS: cli.command_module(name)\n"
+        "sys.argv = ['srl', 'list']\n"
+        "from srl.main import main\n"
+        "main()",
+    ],
+}
+
+
+def import_time(stderr: str) -> int:
+    """Sum of the cumulative times of top-level imports, in microseconds."""
+    total = 0
+    for line in stderr.splitlines():
+        fields = line.split("|")
+        if line.startswith("import time:") and len(fields) == 3 and fields[1].strip().isdigit():
+            if not fields[2].startswith("  "):
+                total += int(fields[1])
+    return total
+
+
+def run(argv: list[str], home: str) -> tuple[float, int]:
+    env = dict(os.environ, HOME=home, PYTHONPATH=str(ROOT))
+    start = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", *argv],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return (time.perf_counter() - start) * 1000, import_time(proc.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    print(f"{'command':>15} {'wall ms':>9} {'imports ms':>11}")
+    with tempfile.TemporaryDirectory() as home:
+        for label, argv in COMMANDS.items():
+            results = [run(argv, home) for _ in range(args.repeat)]
+            wall = statistics.median(r[0] for r in results)
+            imports = statistics.median(r[1] for r in results) / 1000
+            print(f"{label:>15} {wall:>9.1f} {imports:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Fixtures for the pytest-benchmark suite, run on data from generate.py:
+
+    pytest benchmarks --srl-problems 100000 --benchmark-autosave
+    pytest benchmarks --srl-problems 100000 --benchmark-compare
+
+The suite is skipped when pytest-benchmark is not installed
+(`pip install -e ".[bench]"`).
+"""
+
+import importlib.util
+import io
+import os
+import tempfile
+
+# srl resolves its data directory from $HOME at import time
+os.environ["HOME"] = tempfile.mkdtemp(prefix="srl-bench-")
+
+import pytest  # noqa: E402
+from rich.console import Console  # noqa: E402
+
+from benchmarks.generate import generate, write  # noqa: E402
+from srl import cli, storage  # noqa: E402
+
+if importlib.util.find_spec("pytest_benchmark") is None:
+    collect_ignore_glob = ["test_*.py"]
+
+# Rounds for commands that read the data; commands that write use fewer
+ROUNDS = 10
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("srl", "srl benchmark data")
+    group.addoption("--srl-problems", type=int, default=10000, help="Attempted problems (default: 10000)")
+    group.addoption("--srl-history", type=int, default=6, help="Average attempts per problem (default: 6)")
+    group.addoption(
+        "--srl-backend",
+        default=storage.DEFAULT_BACKEND,
+        choices=sorted(storage.BACKENDS),
+        help="Storage backend holding the data (default: json)",
+    )
+
+
+@pytest.fixture(scope="session")
+def dataset(request):
+    """The generated documents, written to the benchmark data directory."""
+    options = request.config.option
+    documents = generate(options.srl_problems, options.srl_history, url_keys=0.02)
+    write(documents, options.srl_backend)
+    return documents
+
+
+@pytest.fixture
+def restore(request, dataset):
+    """Writes the generated data back, for benchmarks that change it."""
+
+    def restore():
+        write(dataset, request.config.option.srl_backend)
+
+    yield restore
+    restore()
+
+
+@pytest.fixture
+def run_command(benchmark, dataset, request):
+    """
+    Benchmark a command handler, parsed from `argv` as the CLI does. Each round
+    starts from cold parse caches, as a new `srl` process would; `setup` runs
+    before each round, untimed.
+    """
+    benchmark.extra_info["problems"] = request.config.option.srl_problems
+    benchmark.extra_info["backend"] = request.config.option.srl_backend
+
+    def run(argv: list[str], setup=None, rounds: int = ROUNDS):
+        args = cli.build_parser().parse_args(argv)
+
+        def before():
+            if setup is not None:
+                setup()
+            storage.invalidate()
+            return (args, Console(file=io.StringIO(), width=120)), {}
+
+        benchmark.pedantic(args.handler, setup=before, rounds=rounds, warmup_rounds=1)
+
+    return run
@@ -0,0 +1,191 @@
+"""
+Generate a synthetic ~/.srl data directory shaped like real use.
+
+    python -m benchmarks.generate --home /tmp/srl-100k --problems 100000 --history 8
+    HOME=/tmp/srl-100k srl list
+
+Problems are split between in progress and mastered. Each history follows the
+default schedule (the next attempt about `rating` days after the last, a few
+days late at times) and ends recently, so a realistic share is due today.
+Mastered problems end with two 5s and some have been audited. Part of the
+catalogue not yet attempted is queued in next up, and `--url-keys` stores a
+share of problems under their URL, as old versions of srl did, for `srl migrate`.
+"""
+
+from datetime import date, timedelta
+from typing import Optional
+import argparse
+import json
+import os
+import random
+
+WORDS = (
+    "two sum array string tree graph path binary search linked list window "
+    "interval matrix median merge sorted rotated subarray substring palindrome "
+    "prefix trie heap stack queue island course schedule coin change word break "
+    "jump game climbing stairs house robber valid parentheses kth largest"
+).split()
+
+RATINGS = (1, 2, 3, 4, 5)
+# Ratings are skewed towards the middle, as in practice
+WEIGHTS = (1, 2, 4, 3, 2)
+
+
+def problem_name(rng: random.Random, i: int) -> str:
+    # The number keeps names unique; the words make them look like titles
+    words = rng.sample(WORDS, rng.randint(2, 4))
+    return " ".join(word.capitalize() for word in words) + f" {i}"
+
+
+def problem_url(name: str) -> str:
+    return f"https://leetcode.com/problems/{name.lower().replace(' ', '-')}/"
+
+
+def history(rng: random.Random, depth: int, end: date, mastered: bool) -> list[dict]:
+    ratings = rng.choices(RATINGS, WEIGHTS, k=depth)
+    if mastered:
+        ratings[-2:] = [5, 5]
+    elif depth >= 2 and ratings[-1] == ratings[-2] == 5:
+        ratings[-1] = 4
+
+    # Lay the attempts out forwards, then shift them to end on `end`
+    days = [0]
+    for rating in ratings[:-1]:
+        days.append(days[-1] + rating + rng.choice((0, 0, 0, 1, 3)))
+    start = end - timedelta(days=days[-1])
+    return [
+        {"rating": rating, "date": (start + timedelta(days=day)).isoformat()}
+        for rating, day in zip(ratings, days)
+    ]
+
+
+def generate(
+    problems: int,
+    history_depth: int = 6,
+    mastered: float = 0.2,
+    next_up: float = 0.05,
+    audits: float = 0.3,
+    url_keys: float = 0.0,
+    seed: int = 0,
+    on: Optional[date] = None,
+) -> dict[str, dict]:
+    """
+    Documents for `problems` attempted problems, `history_depth` attempts each on
+    average, keyed as storage names them: progress, mastered, next_up and audit.
+    """
+    rng = random.Random(seed)
+    on = on or date.today()
+    progress_doc, mastered_doc, audit_history = {}, {}, []
+
+    for i in range(problems):
+        name = problem_name(rng, i)
+        is_mastered = rng.random() < mastered
+        depth = max(2 if is_mastered else 1, round(rng.expovariate(1 / history_depth)))
+        # In progress problems were last attempted up to a week or two ago
+        end = on - timedelta(days=rng.randint(0, 14 if not is_mastered else 365))
+        entry = {"history": history(rng, depth, end, is_mastered)}
+
+        key = name
+        if rng.random() < url_keys:
+            key = problem_url(name)
+        elif rng.random() < 0.5:
+            entry["url"] = problem_url(name)
+
+        if is_mastered:
+            mastered_doc[key] = entry
+            if rng.random() < audits:
+                audit_history.append(
+                    {
+                        "date": (end + timedelta(days=rng.randint(1, 60))).isoformat(),
+                        "problem": key,
+                        "result": "pass" if rng.random() < 0.9 else "fail",
+                    }
+                )
+        else:
+            progress_doc[key] = entry
+
+    queued = {}
+    for position, i in enumerate(range(problems, problems + round(problems * next_up))):
+        name = problem_name(rng, i)
+        added = on - timedelta(days=rng.randint(0, 90))
+        queued[name] = {"added": added.isoformat(), "url": problem_url(name), "position": position}
+
+    audit_history.sort(key=lambda record: record["date"])
+    return {
+        "progress": progress_doc,
+        "mastered": mastered_doc,
+        "next_up": queued,
+        "audit": {"history": audit_history},
+    }
+
+
+def write(documents: dict[str, dict], backend: str = "json"):
+    """
+    Replace the data in the current data directory with `documents`, stored
+    with `backend`. Audits are disabled so commands never stop to prompt.
+    """
+    from srl import storage
+
+    storage.ensure_data_dir()
+    storage.invalidate()
+    for file_path in (storage.DUE_INDEX_FILE, storage.DUE_INDEX_LOG_FILE, storage.ACTIVITY_FILE):
+        file_path.unlink(missing_ok=True)
+
+    config = {"audit_probability": 0, "storage_backend": backend}
+    storage.write_json_file(storage.CONFIG_FILE, config)
+    files = {
+        storage.PROGRESS_FILE: documents["progress"],
+        storage.MASTERED_FILE: documents["mastered"],
+        storage.NEXT_UP_FILE: documents["next_up"],
+        storage.AUDIT_FILE: documents["audit"],
+    }
+    storage.write_json_files(files)
+    if backend != storage.DEFAULT_BACKEND:
+        storage.import_json_files(storage.get_backend(backend))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--home", required=True, help="Directory to use as $HOME (data goes in .srl)")
+    parser.add_argument("--problems", type=int, default=10000, help="Attempted problems")
+    parser.add_argument("--history", type=int, default=6, help="Average attempts per problem")
+    parser.add_argument("--mastered", type=float, default=0.2, help="Share of problems mastered")
+    parser.add_argument("--next-up", type=float, default=0.05, help="Queued problems, as a share of --problems")
+    parser.add_argument("--audits", type=float, default=0.3, help="Share of mastered problems audited")
+    parser.add_argument("--url-keys", type=float, default=0.0, help="Share of problems stored under their URL")
+    parser.add_argument("--backend", default="json", help="Storage backend to write (default: json)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    # srl resolves its data directory from $HOME at import time
+    os.environ["HOME"] = os.path.abspath(args.home)
+    documents = generate(
+        args.problems,
+        args.history,
+        mastered=args.mastered,
+        next_up=args.next_up,
+        audits=args.audits,
+        url_keys=args.url_keys,
+        seed=args.seed,
+    )
+    write(documents, args.backend)
+
+    from srl import storage
+
+    size = sum(path.stat().st_size for path in storage.DATA_DIR.iterdir() if path.is_file())
+    print(
+        json.dumps(
+            {
+                "data_dir": str(storage.DATA_DIR),
+                "in_progress": len(documents["progress"]),
+                "mastered": len(documents["mastered"]),
+                "next_up": len(documents["next_up"]),
+                "audits": len(documents["audit"]["history"]),
+                "bytes": size,
+            }
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Measure throughput and latency of a running `srl server` under concurrent clients.
+
+    srl server --port 8080 &
+    python -m benchmarks.load_test --clients 1 8 32 --requests 500 --cmd "list"
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+
+
+async def client_loop(client: httpx.AsyncClient, url: str, payload: dict, count: int, latencies: list, errors: list):
+    for _ in range(count):
+        start = time.perf_counter()
+        resp = await client.post(url, json=payload)
+        latencies.append((time.perf_counter() - start) * 1000)
+        if resp.status_code != 200:
+            errors.append(resp.status_code)
+
+
+async def run_load(url: str, payload: dict, clients: int, requests: int) -> dict:
+    latencies, errors = [], []
+    per_client = max(1, requests // clients)
+    limits = httpx.Limits(max_connections=clients)
+
+    async with httpx.AsyncClient(limits=limits, timeout=60) as client:
+        start = time.perf_counter()
+        await asyncio.gather(
+            *(client_loop(client, url, payload, per_client, latencies, errors) for _ in range(clients))
+        )
+        elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "rps": len(latencies) / elapsed,
+        "p50": statistics.median(latencies),
+        "p95": latencies[int(len(latencies) * 0.95) - 1],
+        "errors": len(errors),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--url", default="http://127.0.0.1:8080/run")
+    parser.add_argument("--cmd", default="list", help="Command sent to /run")
+    parser.add_argument("--clients", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--requests", type=int, default=200, help="Requests per run")
+    args = parser.parse_args()
+
+    payload = {"cmd": args.cmd}
+    print(f"{'clients':>8} {'requests':>9} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'errors':>7}")
+    for clients in args.clients:
+        r = asyncio.run(run_load(args.url, payload, clients, args.requests))
+        print(
+            f"{clients:>8} {r['requests']:>9} {r['rps']:>9.1f} {r['p50']:>9.2f} "
+            f"{r['p95']:>9.2f} {r['errors']:>7}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Benchmarks of the command handlers on generated data. `server`, `daemon`,
+`generate-preview` and `reset` are long-running or interactive and not covered.
+"""
+
+import pytest
+from srl import storage
+
+READS = [
+    ["list"],
+    ["list", "-n", "50"],
+    ["inprogress"],
+    ["mastered"],
+    ["mastered", "-c"],
+    ["history"],
+    ["history", "-n", "500"],
+    ["history", "--since", "2000-01-01", "-n", "50"],
+    ["calendar"],
+    ["forecast"],
+    ["forecast", "--days", "60", "--rating", "3"],
+    ["nextup", "list"],
+    ["take", "1"],
+    ["random"],
+    ["random", "--all"],
+    ["config", "--get"],
+]
+
+
+def stored_name(document: dict) -> str:
+    return next(name for name in document if not name.startswith("http"))
+
+
+@pytest.mark.parametrize("argv", READS, ids=" ".join)
+def test_read(run_command, argv):
+    run_command(argv)
+
+
+def test_add(run_command, dataset, restore):
+    # A 3 never masters the problem, so every round records the same kind of attempt
+    run_command(["add", stored_name(dataset["progress"]), "3"])
+
+
+def test_remove(run_command, dataset, restore):
+    name = stored_name(dataset["progress"])
+    entry = dataset["progress"][name]
+    run_command(["remove", name], setup=lambda: storage.put_entry(storage.PROGRESS_FILE, name, entry))
+
+
+def test_nextup_add(run_command, restore):
+    name = "Benchmark Queued Problem"
+    run_command(["nextup", "add", name], setup=lambda: storage.delete_entry(storage.NEXT_UP_FILE, name))
+
+
+def test_nextup_remove(run_command, dataset, restore):
+    name = stored_name(dataset["next_up"])
+    entry = dataset["next_up"][name]
+    run_command(["nextup", "remove", name], setup=lambda: storage.put_entry(storage.NEXT_UP_FILE, name, entry))
+
+
+def test_audit(run_command, restore):
+    run_command(["audit"])
+
+
+def test_calendar_rebuild(run_command, restore):
+    run_command(["calendar", "--rebuild"])
+
+
+def test_migrate(run_command, restore):
+    # Every round migrates the URL keyed problems again
+    run_command(["migrate"], setup=restore, rounds=3)
+
+
+def test_import_json(run_command, request, restore):
+    if request.config.option.srl_backend == storage.DEFAULT_BACKEND:
+        pytest.skip("import-json does nothing with the json backend")
+    run_command(["import-json"], rounds=3)
+
+
+def test_compact(run_command, request, restore):
+    if request.config.option.srl_backend != "eventlog":
+        pytest.skip("compact needs the eventlog backend")
+    run_command(["compact"], rounds=3)
@@ -0,0 +1,37 @@
+"""Benchmarks of `POST /run` and the JSON endpoints, through the in-process test client."""
+
+from fastapi.testclient import TestClient
+import pytest
+from srl.server import create_app
+
+RUN = ["list", "list -n 50", "inprogress", "mastered", "history -n 50", "calendar", "forecast", "nextup list"]
+
+ENDPOINTS = ["/due", "/inprogress", "/mastered", "/history", "/calendar", "/forecast", "/nextup"]
+
+
+@pytest.fixture(scope="module")
+def client(dataset):
+    with TestClient(create_app()) as client:
+        yield client
+
+
+@pytest.fixture
+def request_timer(benchmark, client, request):
+    benchmark.extra_info["problems"] = request.config.option.srl_problems
+    benchmark.extra_info["backend"] = request.config.option.srl_backend
+
+    def timed(method: str, path: str, **kwargs):
+        response = benchmark(client.request, method, path, **kwargs)
+        assert response.status_code == 200, response.text
+
+    return timed
+
+
+@pytest.mark.parametrize("cmd", RUN)
+def test_run(request_timer, cmd):
+    request_timer("POST", "/run", json={"cmd": cmd})
+
+
+@pytest.mark.parametrize("path", ENDPOINTS)
+def test_endpoint(request_timer, path):
+    request_timer("GET", path)
@@ -0,0 +1,18 @@
+"""Benchmarks of parsing and writing the generated progress file, with its size."""
+
+from srl import codec, storage
+
+
+def test_parse_progress(benchmark, dataset):
+    raw = codec.dumps(dataset["progress"], pretty=storage.json_format() == "pretty")
+    benchmark.extra_info["bytes"] = len(raw)
+    benchmark.extra_info["orjson"] = codec.available()
+    benchmark(codec.loads, raw)
+
+
+def test_write_progress(benchmark, dataset, restore):
+    benchmark.extra_info["orjson"] = codec.available()
+    benchmark.pedantic(
+        storage.write_json_file, (storage.PROGRESS_FILE, dataset["progress"]), rounds=5, warmup_rounds=1
+    )
+    benchmark.extra_info["bytes"] = storage.PROGRESS_FILE.stat().st_size
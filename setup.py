@@ -3,7 +3,14 @@ from setuptools import setup, find_packages
 setup(
     name="srl",
     author="Hayes Barber",
-    packages=find_packages(),
+    packages=find_packages(include=["srl", "srl.*"]),
+    package_data={"srl": ["starter_data/*.txt"]},
+    extras_require={
+        # Vectorized due index and faster JSON for large collections
+        "fast": ["numpy", "orjson"],
+        # Benchmark suite in benchmarks/
+        "bench": ["pytest-benchmark"],
+    },
     entry_points={
         "console_scripts": [
             "srl = srl.main:main",
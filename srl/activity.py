@@ -0,0 +1,134 @@
+"""
+Persisted per-day activity counts behind the calendar: attempts on in-progress
+and mastered problems plus passed audits.
+
+Counts are kept per document together with the signature of the document they
+mirror, as the due index does. Entry writes made through storage adjust the
+attempt counts in place; a document changed any other way (edited by hand,
+rewritten by migrate or reset) is recounted on the next read. The audit log is
+recounted whenever it changes: it holds one record per audit, not per attempt.
+"""
+
+from collections import Counter
+from pathlib import Path
+from typing import Optional
+from srl import metrics, storage
+from srl.storage import (
+    clone_json,
+    view_json_file,
+    write_json_file,
+    StorageBackend,
+)
+
+INDEX_VERSION = 1
+
+# Indexes over backends that are not persisted (the server's in-memory engine)
+_volatile = {}
+
+
+def _documents() -> tuple[Path, ...]:
+    return (storage.PROGRESS_FILE, storage.MASTERED_FILE, storage.AUDIT_FILE)
+
+
+def _source(backend: StorageBackend, file_path: Path) -> list:
+    return [backend.name, backend.signature(file_path)]
+
+
+def _count(backend: StorageBackend, file_path: Path) -> dict[str, int]:
+    if file_path == storage.AUDIT_FILE:
+        history = backend.view(file_path).get("history", [])
+        return dict(
+            Counter(
+                record["date"]
+                for record in history
+                if record.get("date") and record.get("result") == "pass"
+            )
+        )
+    return dict(backend.date_counts(file_path))
+
+
+def _read(backend: StorageBackend) -> dict:
+    if not backend.persistent:
+        return _volatile.get(id(backend), {})
+    return view_json_file(storage.ACTIVITY_FILE)
+
+
+def _write(backend: StorageBackend, index: dict):
+    if not backend.persistent:
+        _volatile.clear()
+        _volatile[id(backend)] = index
+    else:
+        write_json_file(storage.ACTIVITY_FILE, index)
+
+
+def load(backend: Optional[StorageBackend] = None) -> dict:
+    """Return up-to-date counts (shared, read-only), recounting stale documents."""
+    backend = backend or storage.get_backend()
+    index = _read(backend)
+    if index.get("version") != INDEX_VERSION:
+        index = {"version": INDEX_VERSION, "documents": {}}
+
+    stale = [
+        file_path
+        for file_path in _documents()
+        if index["documents"].get(storage.document_name(file_path), {}).get("source")
+        != _source(backend, file_path)
+    ]
+    metrics.cache("activity", hit=not stale)
+    if stale:
+        index = clone_json(index)
+        for file_path in stale:
+            # Taken first: if the document changes while we count, it stays stale
+            source = _source(backend, file_path)
+            index["documents"][storage.document_name(file_path)] = {
+                "source": source,
+                "counts": _count(backend, file_path),
+            }
+        _write(backend, index)
+    return index
+
+
+def rebuild(backend: Optional[StorageBackend] = None) -> dict:
+    """Recount every document from scratch."""
+    backend = backend or storage.get_backend()
+    _write(backend, {})
+    return load(backend)
+
+
+def update(backend: StorageBackend, file_path: Path, changes: list, before):
+    """
+    Apply committed entry changes to an attempts document, given as
+    (name, previous entry or None, new entry or None).
+
+    `before` is the document signature prior to the writes; if the counts did not
+    match it, they were already stale and are left to be recounted lazily.
+    """
+    index = _read(backend)
+    doc = storage.document_name(file_path)
+    if (
+        index.get("version") != INDEX_VERSION
+        or index["documents"].get(doc, {}).get("source") != [backend.name, before]
+    ):
+        return
+    index = clone_json(index)
+    counts = index["documents"][doc]["counts"]
+
+    for _, old, entry in changes:
+        for sign, item in ((-1, old), (1, entry)):
+            for attempt in (item or {}).get("history", []):
+                date = attempt.get("date")
+                if date:
+                    counts[date] = counts.get(date, 0) + sign
+                    if not counts[date]:
+                        del counts[date]
+
+    index["documents"][doc]["source"] = _source(backend, file_path)
+    _write(backend, index)
+
+
+def date_counts() -> Counter[str]:
+    """Number of attempts and passed audits per day."""
+    counts = Counter()
+    for doc in load()["documents"].values():
+        counts.update(doc["counts"])
+    return counts
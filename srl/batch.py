@@ -0,0 +1,68 @@
+"""
+Vectorized construction of due index rows with NumPy, used in place of the
+per-problem loop in due_index.build for large collections.
+
+The last attempt of every problem is loaded into columns (day, rating, seq) and
+the due dates, mastery flags and row order are computed on whole arrays. Only
+the default scheduler is handled: it depends on the last attempt alone, while
+sm2 and fsrs read the state stored with each problem and never replay histories
+in bulk. NumPy is optional (`pip install srl[fast]`); without it, or below
+BATCH_THRESHOLD problems, the index is built one problem at a time.
+"""
+
+from typing import Iterable
+import importlib.util
+
+# Smaller collections are built faster without the conversion to arrays
+BATCH_THRESHOLD = 2000
+
+
+def available() -> bool:
+    # Found without importing it: NumPy is only loaded once rows are built with it
+    return importlib.util.find_spec("numpy") is not None
+
+
+def due_rows(last_attempts: Iterable[tuple[str, dict]]) -> list[list]:
+    """
+    Sorted due index rows `[due_date, last_date, rating, seq, mastery_attempt, name]`
+    for the default scheduler, from (name, last_attempt) in document order.
+    """
+    names = []
+    dates = []
+    ratings = []
+    for name, last in last_attempts:
+        names.append(name)
+        # Attempts may carry a time of day; only the date counts
+        dates.append(last["date"][:10])
+        ratings.append(last["rating"])
+
+    if not names:
+        return []
+
+    import numpy as np
+
+    day = np.array(dates, dtype="datetime64[D]")
+    rating = np.array(ratings, dtype=np.int64)
+    due = day + rating.astype("timedelta64[D]")
+
+    # Same order as sorting the rows: due date, then last date, rating and seq
+    order = np.lexsort((np.arange(len(names)), rating, day, due))
+
+    rating = rating[order]
+    columns = (
+        _iso(due[order]),
+        _iso(day[order]),
+        rating.tolist(),
+        order.tolist(),  # seq is the position in document order
+        (rating == 5).tolist(),
+        np.array(names, dtype=object)[order].tolist(),
+    )
+    return list(map(list, zip(*columns)))
+
+
+def _iso(days) -> list[str]:
+    import numpy as np
+
+    # Few distinct days: format each once and share the strings
+    unique, inverse = np.unique(days, return_inverse=True)
+    return np.datetime_as_string(unique).astype(object)[inverse].tolist()
@@ -1,42 +1,91 @@
 import argparse
-from srl.commands import (
-    add,
-    list_,
-    mastered,
-    inprogress,
-    calendar,
-    nextup,
-    audit,
-    remove,
-    config,
-    take,
-    server,
-    random,
-    generate_preview,
-    migrate,
-    reset,
-    history,
-)
-
-
-def build_parser() -> argparse.ArgumentParser:
+import importlib
+
+# Subcommand name -> (module in srl.commands, help). Only the module of the
+# command being run is imported; the help text here is what `srl -h` lists and
+# must match the module's own add_parser call.
+COMMANDS = {
+    "add": ("add", "Add or update a problem attempt"),
+    "list": ("list_", "List due problems"),
+    "mastered": ("mastered", "List mastered problems"),
+    "inprogress": ("inprogress", "List problems in progress"),
+    "calendar": ("calendar", "Graph of SRL activity"),
+    "nextup": ("nextup", "Next up problem queue"),
+    "audit": ("audit", "Random audit functionality"),
+    "remove": ("remove", "Remove a problem from in-progress"),
+    "config": ("config", "Update configuration values"),
+    "take": ("take", "Output a problem by index"),
+    "server": ("server", "Run HTTP server to expose CLI"),
+    "random": (
+        "random",
+        "Pick a random due problem (use --all to pick from progress, mastered and next up)",
+    ),
+    "generate-preview": ("generate_preview", "Generate SVG preview for the README"),
+    "migrate": ("migrate", "Migrate URL entries to problem names (merge duplicates)"),
+    "reset": ("reset", "Reset progress data (with confirmation)"),
+    "history": ("history", "Show recent activity history"),
+    "forecast": ("forecast", "Forecast how many reviews are due each day"),
+    "import-json": ("import_json", "Import the JSON data files into the configured storage backend"),
+    "compact": ("compact", "Fold the event log into a new snapshot"),
+    "daemon": ("daemon", "Keep srl loaded in the background to speed up commands"),
+}
+
+
+def command_module(name: str):
+    return importlib.import_module(f"srl.commands.{COMMANDS[name][0]}")
+
+
+class LazySubParsersAction(argparse._SubParsersAction):
+    """
+    Subparsers registered by name and help only. The command's module is
+    imported, and its real parser built, when the command is selected.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._lazy = set()
+
+    def add_lazy_parser(self, name: str, help: str):
+        self.add_parser(name, help=help, add_help=False)
+        self._lazy.add(name)
+
+    def load(self, name: str):
+        if name not in self._lazy:
+            return
+        self._lazy.discard(name)
+        order = list(self._name_parser_map)
+        del self._name_parser_map[name]
+        command_module(name).add_subparser(self)
+        # Keep the help entry of the placeholder and the original order
+        self._choices_actions.pop()
+        parsers = dict(self._name_parser_map)
+        self._name_parser_map.clear()
+        self._name_parser_map.update((key, parsers[key]) for key in order)
+
+    def __call__(self, parser, namespace, values, option_string=None):
+        self.load(values[0])
+        super().__call__(parser, namespace, values, option_string)
+
+
+def build_parser(load_all: bool = False) -> argparse.ArgumentParser:
+    """load_all builds every command's parser now, for long-running processes."""
     parser = argparse.ArgumentParser(prog="srl")
-    subparsers = parser.add_subparsers(dest="command")
-
-    add.add_subparser(subparsers)
-    list_.add_subparser(subparsers)
-    mastered.add_subparser(subparsers)
-    inprogress.add_subparser(subparsers)
-    calendar.add_subparser(subparsers)
-    nextup.add_subparser(subparsers)
-    audit.add_subparser(subparsers)
-    remove.add_subparser(subparsers)
-    config.add_subparser(subparsers)
-    take.add_subparser(subparsers)
-    server.add_subparser(subparsers)
-    random.add_subparser(subparsers)
-    generate_preview.add_subparser(subparsers)
-    migrate.add_subparser(subparsers)
-    reset.add_subparser(subparsers)
-    history.add_subparser(subparsers)
+    parser.add_argument(
+        "--timings",
+        action="store_true",
+        help="Report the time and bytes spent loading, computing, rendering and saving",
+    )
+    parser.add_argument(
+        "--profile",
+        metavar="FILE",
+        help="Report timings and write a cProfile dump of the command to FILE",
+    )
+    parser.register("action", "lazy_parsers", LazySubParsersAction)
+    subparsers = parser.add_subparsers(dest="command", action="lazy_parsers")
+
+    for name, (_, help) in COMMANDS.items():
+        subparsers.add_lazy_parser(name, help)
+    if load_all:
+        for name in COMMANDS:
+            subparsers.load(name)
     return parser
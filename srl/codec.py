@@ -0,0 +1,63 @@
+"""
+Encoding and decoding of the JSON stored by srl: the data files, event log
+lines and the JSON columns of the SQLite backend.
+
+orjson is used when it is installed (`pip install srl[fast]`) and the standard
+library otherwise. Both write standard JSON and read any JSON, so files move
+freely between installs with and without it. Output is compact unless `pretty`
+is asked for (`srl config --json-format pretty` for the data files).
+
+orjson is imported on first use rather than with this module, and only inputs
+of FAST_LOADS_BYTES or more are parsed with it: for a small config file the
+import costs more than it saves, and `srl list` on a current due index reads
+nothing larger.
+"""
+
+from typing import Any
+import json
+
+# Smaller inputs are parsed with the standard library, which is already loaded
+FAST_LOADS_BYTES = 64 * 1024
+
+# The orjson module once imported, None without it; _UNLOADED until first use
+_UNLOADED = object()
+orjson = _UNLOADED
+
+
+def _fast():
+    global orjson
+    if orjson is _UNLOADED:
+        try:
+            import orjson as module
+        except ImportError:
+            module = None
+        orjson = module
+    return orjson
+
+
+def available() -> bool:
+    """Whether the fast codec (orjson) is in use."""
+    return _fast() is not None
+
+
+def loads(raw: bytes | str) -> Any:
+    if len(raw) >= FAST_LOADS_BYTES and _fast() is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+def dumps(data: Any, pretty: bool = False) -> bytes:
+    """UTF-8 JSON; non-string keys (e.g. calendar color levels) become strings."""
+    if _fast() is not None:
+        option = orjson.OPT_NON_STR_KEYS
+        if pretty:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(data, option=option)
+    if pretty:
+        return json.dumps(data, indent=2, ensure_ascii=False).encode()
+    return json.dumps(data, separators=(",", ":"), ensure_ascii=False).encode()
+
+
+def dumps_text(data: Any) -> str:
+    """Compact JSON as a str, for text columns and log lines."""
+    return dumps(data).decode()
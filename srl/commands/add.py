@@ -1,8 +1,22 @@
 from rich.console import Console
+from datetime import date
+from pathlib import Path
+from typing import Optional
+import csv
+import json
 from srl.utils import today, resolve_problem_identifier
+from srl.due_index import Balancer
+from srl.scheduling import get_scheduler, merge_history
 from srl.storage import (
+    find_entry,
+    find_name,
+    load_balance_days,
+    name_key,
+    put_entry,
+    delete_entry,
     load_json,
     save_json,
+    transaction,
     PROGRESS_FILE,
     MASTERED_FILE,
     NEXT_UP_FILE,
@@ -12,13 +26,32 @@ from srl.commands.list_ import get_due_problems
 
 def add_subparser(subparsers):
     add = subparsers.add_parser("add", help="Add or update a problem attempt")
-    add.add_argument("identifier", type=str, help="Problem name, URL, or number from `srl list`")
-    add.add_argument("rating", type=int, choices=range(1, 6), help="Rating from 1-5")
+    add.add_argument(
+        "identifier", type=str, nargs="?", help="Problem name, URL, or number from `srl list`"
+    )
+    add.add_argument("rating", type=int, nargs="?", choices=range(1, 6), help="Rating from 1-5")
+    add.add_argument(
+        "--batch",
+        metavar="FILE",
+        help="Record every attempt in a CSV or NDJSON file (identifier, rating, optional date)",
+    )
     add.set_defaults(handler=handle)
     return add
 
 
 def handle(args, console: Console):
+    if getattr(args, "batch", None):
+        if args.identifier is not None or args.rating is not None:
+            console.print(
+                "[bold red]Give either a problem and rating or --batch FILE, not both.[/bold red]"
+            )
+            return
+        handle_batch(args.batch, console)
+        return
+    if args.identifier is None or args.rating is None:
+        console.print("[bold red]Please provide a problem and a rating (or --batch FILE).[/bold red]")
+        return
+
     rating: int = args.rating
 
     # Get list of due problems for number resolution
@@ -30,54 +63,232 @@ def handle(args, console: Console):
     if not name:
         return  # Error already printed by resolver
 
-    data = load_json(PROGRESS_FILE)
-
-    # Check for existing entry case-insensitively
-    existing_name = None
-    for key in data:
-        if key.lower() == name.lower():
-            existing_name = key
-            break
-
-    # Use existing name if found, otherwise use the provided name
-    target_name = existing_name if existing_name else name
-    entry = data.get(target_name, {"history": []})
-
-    # Store URL if provided and not already stored
-    if url and "url" not in entry:
-        entry["url"] = url
-
-    entry["history"].append(
-        {
-            "rating": rating,
-            "date": today().isoformat(),
-        }
-    )
-
-    # Mastery check: last two ratings are 5
-    history = entry["history"]
-    if len(history) >= 2 and history[-1]["rating"] == 5 and history[-2]["rating"] == 5:
-        mastered = load_json(MASTERED_FILE)
-        if target_name in mastered:
-            mastered[target_name]["history"].extend(history)
-        else:
-            mastered[target_name] = entry
-        save_json(MASTERED_FILE, mastered)
-        if target_name in data:
-            del data[target_name]
+    target_name, mastered = record_attempt(name, rating, url)
+    if mastered:
         console.print(
             f"[bold green]{target_name}[/bold green] moved to [cyan]mastered[/cyan]!"
         )
     else:
-        data[target_name] = entry
         console.print(
             f"Added rating [yellow]{rating}[/yellow] for '[cyan]{target_name}[/cyan]'"
         )
 
-    save_json(PROGRESS_FILE, data)
 
-    # Remove from next up if it exists there
-    next_up = load_json(NEXT_UP_FILE)
-    if target_name in next_up:
-        del next_up[target_name]
+def record_identified_attempt(
+    identifier: str, rating: int, url: Optional[str] = None
+) -> tuple[Optional[str], bool]:
+    """
+    Resolve `identifier` (name, URL or due list number) as `srl add` does and
+    record the attempt. Returns (None, False) if it names no problem.
+    """
+    name, resolved_url = resolve_problem_identifier(identifier, get_due_problems(), Console(quiet=True))
+    if not name:
+        return None, False
+    return record_attempt(name, rating, url or resolved_url)
+
+
+def record_attempt(name: str, rating: int, url: Optional[str] = None) -> tuple[str, bool]:
+    """
+    Record an attempt at `name` (matched against problems in progress ignoring
+    case and slug form). Returns the stored name and whether the problem became
+    mastered.
+    """
+    # Read and write under one lock so concurrent adds can't lose an attempt;
+    # progress, mastered and next up change together or not at all
+    with transaction():
+        # Check for an existing entry, ignoring case and slug form
+        existing_name, existing_entry = find_entry(PROGRESS_FILE, name)
+
+        # Use existing name if found, otherwise use the provided name
+        target_name = existing_name if existing_name else name
+        entry = existing_entry if existing_entry else {"history": []}
+
+        # Store URL if provided and not already stored
+        if url and "url" not in entry:
+            entry["url"] = url
+
+        # Appends the attempt; the scheduler decides on mastery
+        # (by default: last two ratings are 5)
+        scheduler = get_scheduler()
+        is_mastered = scheduler.record(entry, rating, today())
+        history = entry["history"]
+        if is_mastered:
+            # Under its own stored name: the mastered entry may be spelled differently
+            if existing_name is not None:
+                delete_entry(PROGRESS_FILE, existing_name)
+            mastered_name, mastered = find_entry(MASTERED_FILE, target_name)
+            if mastered is not None:
+                target_name = mastered_name
+                merge_history(mastered["history"], history)
+            else:
+                mastered = entry
+            put_entry(MASTERED_FILE, target_name, mastered)
+        else:
+            Balancer(scheduler, load_balance_days()).record(target_name, entry)
+            put_entry(PROGRESS_FILE, target_name, entry)
+
+        # Remove from next up if it exists there
+        queued = find_name(NEXT_UP_FILE, target_name)
+        if queued is not None:
+            delete_entry(NEXT_UP_FILE, queued)
+
+    return target_name, is_mastered
+
+
+def read_batch(path: str) -> list[dict]:
+    """
+    Rows of a batch file as dicts with "identifier", "rating" and optionally "date".
+    NDJSON files (.ndjson, .jsonl, or starting with "{") hold one object per line
+    (the identifier may be given as "name"); CSV files have the columns in that
+    order, with or without a header row.
+    """
+    text = Path(path).read_text()
+    if Path(path).suffix in (".ndjson", ".jsonl") or text.lstrip().startswith("{"):
+        rows = []
+        for line in text.splitlines():
+            if line.strip():
+                row = json.loads(line)
+                if "identifier" not in row and "name" in row:
+                    row["identifier"] = row.pop("name")
+                rows.append(row)
+        return rows
+
+    records = [record for record in csv.reader(text.splitlines()) if record]
+    if records and records[0][0].strip().lower() in ("identifier", "name", "problem"):
+        records = records[1:]
+    return [
+        dict(zip(("identifier", "rating", "date"), (field.strip() for field in record)))
+        for record in records
+    ]
+
+
+def parse_batch(rows: list[dict], problems: list[str]) -> tuple[list[tuple], list[str]]:
+    """
+    Validate batch rows and resolve their identifiers against `problems` (the due
+    list, for numbers). Returns (name, rating, url, date) tuples and the errors
+    found, one per invalid row.
+    """
+    attempts, errors = [], []
+    quiet = Console(quiet=True)
+    for line, row in enumerate(rows, start=1):
+        identifier = str(row.get("identifier") or "").strip()
+        try:
+            rating = _rating(row.get("rating"))
+            on = date.fromisoformat(row["date"]) if row.get("date") else today()
+        except (TypeError, ValueError):
+            errors.append(f"row {line}: invalid rating or date")
+            continue
+        if rating is None or not 1 <= rating <= 5:
+            errors.append(f"row {line}: rating must be 1-5")
+            continue
+
+        name, url = resolve_problem_identifier(identifier, problems, quiet) if identifier else (None, None)
+        if not name:
+            errors.append(f"row {line}: unknown problem {identifier!r}")
+            continue
+        attempts.append((name, rating, url, on))
+    return attempts, errors
+
+
+def _rating(value) -> Optional[int]:
+    """A batch rating as an int; None for numbers that are not whole (3.7)."""
+    if isinstance(value, bool):
+        raise ValueError(value)
+    if isinstance(value, float):
+        return int(value) if value.is_integer() else None
+    return int(value)
+
+
+def record_attempts(attempts: list[tuple]) -> list[tuple[str, bool]]:
+    """
+    Record (name, rating, url, date) attempts in date order, as record_attempt
+    does one at a time, but reading and writing progress, mastered and next up
+    once. Returns (stored name, is_mastered) for each attempt, in that order.
+    """
+    scheduler = get_scheduler()
+    # Stable, so attempts on the same day keep the order of the file
+    attempts = sorted(attempts, key=lambda attempt: attempt[3])
+    results = []
+    with transaction():
+        progress = load_json(PROGRESS_FILE)
+        mastered = load_json(MASTERED_FILE)
+        next_up = load_json(NEXT_UP_FILE)
+        # Stored names by name_key, to match names as find_name does
+        progress_names = _name_index(progress)
+        mastered_names = _name_index(mastered)
+        queued_names = _name_index(next_up)
+        balancer = Balancer(scheduler, load_balance_days())
+
+        for name, rating, url, on in attempts:
+            target_name = _find(progress, progress_names, name) or name
+            entry = progress.get(target_name, {"history": []})
+            if url and "url" not in entry:
+                entry["url"] = url
+
+            is_mastered = scheduler.record(entry, rating, on)
+            if is_mastered:
+                if progress.pop(target_name, None) is not None:
+                    progress_names.pop(name_key(target_name), None)
+                    balancer.remove(target_name)
+                mastered_name = _find(mastered, mastered_names, target_name)
+                if mastered_name is not None:
+                    target_name = mastered_name
+                    merge_history(mastered[target_name]["history"], entry["history"])
+                else:
+                    mastered[target_name] = entry
+                    mastered_names.setdefault(name_key(target_name), target_name)
+            else:
+                balancer.record(target_name, entry)
+                progress[target_name] = entry
+                progress_names.setdefault(name_key(target_name), target_name)
+
+            queued = _find(next_up, queued_names, target_name)
+            if queued is not None:
+                del next_up[queued]
+                queued_names.pop(name_key(queued), None)
+            results.append((target_name, is_mastered))
+
+        save_json(PROGRESS_FILE, progress)
+        save_json(MASTERED_FILE, mastered)
         save_json(NEXT_UP_FILE, next_up)
+    return results
+
+
+def _name_index(data: dict) -> dict[str, str]:
+    index = {}
+    for name in data:
+        index.setdefault(name_key(name), name)
+    return index
+
+
+def _find(data: dict, index: dict[str, str], name: str) -> Optional[str]:
+    return name if name in data else index.get(name_key(name))
+
+
+def handle_batch(path: str, console: Console):
+    try:
+        rows = read_batch(path)
+    except FileNotFoundError:
+        console.print(f"[bold red]File not found:[/bold red] {path}")
+        return
+    except (ValueError, csv.Error) as e:
+        console.print(f"[bold red]Could not read {path}:[/bold red] {e}")
+        return
+
+    attempts, errors = parse_batch(rows, get_due_problems())
+    if errors:
+        # Nothing is recorded unless every row is valid
+        for error in errors[:10]:
+            console.print(f"[red]{error}[/red]")
+        if len(errors) > 10:
+            console.print(f"[red]... and {len(errors) - 10} more[/red]")
+        console.print(f"[yellow]No attempts recorded: {len(errors)} invalid row(s).[/yellow]")
+        return
+
+    results = record_attempts(attempts)
+    problems = {name for name, _ in results}
+    moved = {name for name, is_mastered in results if is_mastered}
+    console.print(
+        f"[green]Recorded {len(results)} attempt(s)[/green] for {len(problems)} problem(s); "
+        f"{len(moved)} moved to [cyan]mastered[/cyan]."
+    )
@@ -4,6 +4,10 @@ import random
 from srl.storage import (
     load_json,
     save_json,
+    transaction,
+    get_entry,
+    put_entry,
+    delete_entry,
     AUDIT_FILE,
     MASTERED_FILE,
     PROGRESS_FILE,
@@ -64,21 +68,22 @@ def get_current_audit():
 
 
 def log_audit_attempt(problem, result):
-    audit_data = load_json(AUDIT_FILE)
-    if "history" not in audit_data:
-        audit_data["history"] = []
-
-    audit_data["history"].append(
-        {
-            "date": today().isoformat(),
-            "problem": problem,
-            "result": result,
-        }
-    )
+    with transaction():
+        audit_data = load_json(AUDIT_FILE)
+        if "history" not in audit_data:
+            audit_data["history"] = []
+
+        audit_data["history"].append(
+            {
+                "date": today().isoformat(),
+                "problem": problem,
+                "result": result,
+            }
+        )
 
-    audit_data.pop("current_audit", None)
+        audit_data.pop("current_audit", None)
 
-    save_json(AUDIT_FILE, audit_data)
+        save_json(AUDIT_FILE, audit_data)
 
 
 def audit_pass(curr):
@@ -86,40 +91,38 @@ def audit_pass(curr):
 
 
 def audit_fail(curr, console: Console):
-    mastered = load_json(MASTERED_FILE)
-    progress = load_json(PROGRESS_FILE)
-
-    if curr not in mastered:
-        console.print(f"[red]{curr}[/red] not found in mastered.")
-        return
-
-    entry = mastered[curr]
-    # Append new failed attempt
-    entry["history"].append(
-        {
-            "rating": 1,
-            "date": today().isoformat(),
-        }
-    )
+    with transaction():
+        entry = get_entry(MASTERED_FILE, curr)
+
+        if entry is None:
+            console.print(f"[red]{curr}[/red] not found in mastered.")
+            return
+
+        # Append new failed attempt
+        entry["history"].append(
+            {
+                "rating": 1,
+                "date": today().isoformat(),
+            }
+        )
 
-    # Move to progress
-    progress[curr] = entry
-    save_json(PROGRESS_FILE, progress)
+        # Move to progress
+        put_entry(PROGRESS_FILE, curr, entry)
 
-    # Remove from mastered
-    del mastered[curr]
-    save_json(MASTERED_FILE, mastered)
+        # Remove from mastered
+        delete_entry(MASTERED_FILE, curr)
 
-    log_audit_attempt(curr, "fail")
+        log_audit_attempt(curr, "fail")
 
 
 def random_audit():
-    data_mastered = load_json(MASTERED_FILE)
-    mastered = list(data_mastered)
-    if not mastered:
-        return None
-    problem: str = random.choice(mastered)
-    audit_data = load_json(AUDIT_FILE)
-    audit_data["current_audit"] = problem
-    save_json(AUDIT_FILE, audit_data)
-    return problem
+    with transaction():
+        data_mastered = load_json(MASTERED_FILE)
+        mastered = list(data_mastered)
+        if not mastered:
+            return None
+        problem: str = random.choice(mastered)
+        audit_data = load_json(AUDIT_FILE)
+        audit_data["current_audit"] = problem
+        save_json(AUDIT_FILE, audit_data)
+        return problem
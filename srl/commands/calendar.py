@@ -3,10 +3,10 @@ from collections import Counter
 from pathlib import Path
 from datetime import date, timedelta
 from rich.table import Table
+from srl import activity
 from srl.storage import (
     load_json,
-    MASTERED_FILE,
-    PROGRESS_FILE,
+    attempt_dates,
     AUDIT_FILE,
 )
 from srl.commands.config import Config
@@ -21,12 +21,19 @@ def add_subparser(subparsers):
         default=12,
         help="Number of months to display (default: 12)",
     )
+    parser.add_argument(
+        "--rebuild",
+        action="store_true",
+        help="Recount the stored daily activity from every attempt",
+    )
     parser.set_defaults(handler=handle)
     return parser
 
 
 def handle(args, console: Console):
     colors = Config.load().calendar_colors
+    if getattr(args, "rebuild", False):
+        activity.rebuild()
     counts = get_all_date_counts()
     render_activity(console, counts, colors, getattr(args, "months", 12))
     console.print("-" * 5)
@@ -93,28 +100,11 @@ def key(d: date) -> str:
 
 
 def get_all_date_counts() -> Counter[str]:
-    counts = Counter()
-    counts.update(get_dates(MASTERED_FILE))
-    counts.update(get_dates(PROGRESS_FILE))
-    counts.update(get_audit_dates())
-
-    return counts
+    return activity.date_counts()
 
 
 def get_dates(path: Path) -> list[str]:
-    json_data = load_json(path)
-    res = []
-
-    for obj in json_data.values():
-        history = obj.get("history", [])
-        if not history:
-            continue
-        for record in history:
-            date = record.get("date", "")
-            if date:
-                res.append(date)
-
-    return res
+    return attempt_dates(path)
 
 
 def get_audit_dates() -> list[str]:
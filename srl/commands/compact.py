@@ -0,0 +1,25 @@
+from rich.console import Console
+from srl.storage import get_backend
+
+
+def add_subparser(subparsers):
+    parser = subparsers.add_parser(
+        "compact", help="Fold the event log into a new snapshot"
+    )
+    parser.set_defaults(handler=handle)
+    return parser
+
+
+def handle(args, console: Console):
+    backend = get_backend()
+
+    if not hasattr(backend, "compact"):
+        console.print(
+            f"[yellow]The {backend.name} backend has no event log to compact.[/yellow]"
+        )
+        return
+
+    folded = backend.compact()
+    console.print(
+        f"[green]Compacted[/green] {folded} event(s) into a new snapshot."
+    )
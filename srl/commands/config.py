@@ -1,8 +1,19 @@
 from rich.console import Console
 from srl.storage import (
+    backend_name,
     load_json,
     save_json,
+    transaction,
+    BACKENDS,
+    DEFAULT_BACKEND,
+    DEFAULT_SCHEDULER,
+    DEFAULT_JSON_FORMAT,
+    JSON_FORMATS,
+    AUDIT_FILE,
     CONFIG_FILE,
+    MASTERED_FILE,
+    NEXT_UP_FILE,
+    PROGRESS_FILE,
 )
 from dataclasses import dataclass, field
 
@@ -13,6 +24,10 @@ class Config:
     calendar_colors: dict[int, str] = field(
         default_factory=lambda: Config.default_calendar_colors()
     )
+    storage_backend: str = DEFAULT_BACKEND
+    scheduler: str = DEFAULT_SCHEDULER
+    load_balance_days: int = 0
+    json_format: str = DEFAULT_JSON_FORMAT
 
     @staticmethod
     def default_calendar_colors() -> dict[int, str]:
@@ -47,6 +62,8 @@ class Config:
 
 
 def add_subparser(subparsers):
+    from srl.scheduling import SCHEDULERS
+
     parser = subparsers.add_parser("config", help="Update configuration values")
     parser.add_argument(
         "--audit-probability", type=float, help="Set audit probability (0-1)"
@@ -64,46 +81,100 @@ def add_subparser(subparsers):
         action="store_true",
         help="Reset calendar colors to defaults",
     )
+    parser.add_argument(
+        "--storage-backend",
+        choices=sorted(BACKENDS),
+        help="Select the storage engine (run `srl import-json` after switching)",
+    )
+    parser.add_argument(
+        "--scheduler",
+        choices=list(SCHEDULERS),
+        help="Select how review dates and mastery are decided (default: default)",
+    )
+    parser.add_argument(
+        "--load-balance",
+        type=int,
+        metavar="DAYS",
+        help="Move due dates up to DAYS either way to even out daily reviews (0 disables)",
+    )
+    parser.add_argument(
+        "--json-format",
+        choices=JSON_FORMATS,
+        help="Write the JSON data files compact (the default) or indented for reading",
+    )
     parser.set_defaults(handler=handle)
     return parser
 
 
 def handle(args, console: Console):
-    cfg = Config.load()
-
-    if getattr(args, "get", False):
-        console.print_json(data=cfg.__dict__)
-    elif getattr(args, "reset_colors", False):
-        cfg.reset_colors()
-        cfg.save()
-        console.print("Colors reset")
-    elif getattr(args, "set_color", []):
-        updated_levels = []
-
-        for entry in args.set_color:
-            try:
-                level_str, hex_value = entry.split("=")
-                level = int(level_str)
-                cfg.calendar_colors[level] = hex_value
-                updated_levels.append(level)
-            except ValueError:
-                console.print(f"[red]Invalid format: {entry}[/red]")
-                continue
-
-        cfg.save()
-
-        if updated_levels:
-            lvls = ", ".join(str(level) for level in updated_levels)
-            console.print(f"[green]Updated colors for level(s): {lvls}.[/green]")
+    # Config changes are read-modify-write too
+    with transaction():
+        cfg = Config.load()
+
+        if getattr(args, "get", False):
+            console.print_json(data=cfg.__dict__)
+        elif getattr(args, "reset_colors", False):
+            cfg.reset_colors()
+            cfg.save()
+            console.print("Colors reset")
+        elif getattr(args, "set_color", []):
+            updated_levels = []
+
+            for entry in args.set_color:
+                try:
+                    level_str, hex_value = entry.split("=")
+                    level = int(level_str)
+                    cfg.calendar_colors[level] = hex_value
+                    updated_levels.append(level)
+                except ValueError:
+                    console.print(f"[red]Invalid format: {entry}[/red]")
+                    continue
+
+            cfg.save()
+
+            if updated_levels:
+                lvls = ", ".join(str(level) for level in updated_levels)
+                console.print(f"[green]Updated colors for level(s): {lvls}.[/green]")
+            else:
+                console.print("[yellow]No valid color updates provided.[/yellow]")
+        elif getattr(args, "storage_backend", None):
+            cfg.set("storage_backend", args.storage_backend)
+            cfg.save()
+            console.print(
+                f"Storage backend set to [cyan]{args.storage_backend}[/cyan]"
+            )
+        elif getattr(args, "scheduler", None):
+            cfg.set("scheduler", args.scheduler)
+            cfg.save()
+            console.print(f"Scheduler set to [cyan]{args.scheduler}[/cyan]")
+        elif getattr(args, "load_balance", None) is not None:
+            if args.load_balance < 0:
+                console.print("[yellow]--load-balance must be 0 or more days.[/yellow]")
+                return
+            cfg.set("load_balance_days", args.load_balance)
+            cfg.save()
+            if args.load_balance:
+                console.print(
+                    f"Load balancing due dates within [cyan]{args.load_balance}[/cyan] day(s)"
+                )
+            else:
+                console.print("Load balancing disabled")
+        elif getattr(args, "json_format", None):
+            cfg.set("json_format", args.json_format)
+            cfg.save()
+            if backend_name() == DEFAULT_BACKEND:
+                # Rewrite the data files now rather than on their next change
+                for file_path in (PROGRESS_FILE, MASTERED_FILE, NEXT_UP_FILE, AUDIT_FILE):
+                    if file_path.exists():
+                        save_json(file_path, load_json(file_path))
+            console.print(f"JSON data files are written [cyan]{args.json_format}[/cyan]")
         else:
-            console.print("[yellow]No valid color updates provided.[/yellow]")
-    else:
-        probability: float | None = args.audit_probability
+            probability: float | None = args.audit_probability
 
-        if probability is None or probability < 0:
-            console.print("[yellow]Invalid configuration option provided.[/yellow]")
-            return
+            if probability is None or probability < 0:
+                console.print("[yellow]Invalid configuration option provided.[/yellow]")
+                return
 
-        cfg.set("audit_probability", probability)
-        cfg.save()
-        console.print(f"Audit probability set to [cyan]{probability}[/cyan]")
+            cfg.set("audit_probability", probability)
+            cfg.save()
+            console.print(f"Audit probability set to [cyan]{probability}[/cyan]")
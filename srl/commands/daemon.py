@@ -0,0 +1,47 @@
+from rich.console import Console
+
+
+def add_subparser(subparsers):
+    parser = subparsers.add_parser(
+        "daemon", help="Keep srl loaded in the background to speed up commands"
+    )
+    parser.add_argument(
+        "action",
+        nargs="?",
+        choices=["start", "stop", "status"],
+        default="start",
+        help="Run the daemon in the foreground, stop it, or check whether it is running",
+    )
+    parser.set_defaults(handler=handle)
+    return parser
+
+
+def handle(args, console: Console):
+    from srl import daemon
+
+    if args.action == "stop":
+        if daemon.stop():
+            console.print("[green]Stopped the srl daemon.[/green]")
+        else:
+            console.print("[yellow]The srl daemon is not running.[/yellow]")
+        return
+
+    info = daemon.status()
+    if args.action == "status":
+        if info is None:
+            console.print("[yellow]The srl daemon is not running.[/yellow]")
+        else:
+            console.print(
+                f"[green]Running[/green] (pid {info['pid']}, {info['served']} command(s) served)"
+            )
+        return
+
+    if info is not None:
+        console.print(f"[yellow]The srl daemon is already running (pid {info['pid']}).[/yellow]")
+        return
+
+    console.print(f"Serving srl commands on {daemon.storage.DAEMON_SOCKET} (Ctrl+C to stop)")
+    try:
+        daemon.serve()
+    except KeyboardInterrupt:
+        pass
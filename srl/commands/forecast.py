@@ -0,0 +1,104 @@
+from rich.console import Console
+from datetime import date, timedelta
+from typing import Optional
+import heapq
+from srl import due_index
+from srl.scheduling import get_scheduler
+from srl.storage import load_balance_days, view_json, PROGRESS_FILE
+from srl.utils import today
+
+BAR_WIDTH = 40
+
+
+def add_subparser(subparsers):
+    parser = subparsers.add_parser("forecast", help="Forecast how many reviews are due each day")
+    parser.add_argument(
+        "--days",
+        type=int,
+        default=14,
+        help="Number of days to forecast, starting today (default: 14)",
+    )
+    parser.add_argument(
+        "--rating",
+        type=int,
+        choices=range(1, 6),
+        help="Also count the follow-up reviews, assuming each review is rated this",
+    )
+    parser.set_defaults(handler=handle)
+    return parser
+
+
+def handle(args, console: Console):
+    days = getattr(args, "days", 14)
+    if days < 1:
+        console.print("[yellow]--days must be at least 1.[/yellow]")
+        return
+
+    forecast = get_forecast(days, getattr(args, "rating", None))
+    if not any(count for _, count in forecast):
+        console.print(f"[bold green]No reviews due in the next {days} day(s).[/bold green]")
+        return
+
+    most = max(count for _, count in forecast)
+    total = sum(count for _, count in forecast)
+    console.print(f"[bold blue]Reviews due over the next {days} day(s) ({total})[/bold blue]")
+    for day, count in forecast:
+        bar = "█" * round(count / most * BAR_WIDTH) if count else ""
+        console.print(f"{day}  {count:>4}  [cyan]{bar}[/cyan]")
+
+
+def get_forecast(days: int, rating: Optional[int] = None) -> list[tuple[str, int]]:
+    """
+    Number of problems due on each of the next `days` days, overdue ones counting
+    today. With `rating`, each review is assumed to be rated `rating` and the
+    reviews it schedules within the window are counted too, until the problem
+    would be mastered. Reviews are simulated in date order and load balanced as
+    recording them would. Returns (ISO date, count) pairs starting today.
+    """
+    start = today()
+    counts = [0] * days
+
+    def count(due: date) -> Optional[int]:
+        offset = max((due - start).days, 0)
+        if offset < days:
+            counts[offset] += 1
+            return offset
+        return None
+
+    if rating is None:
+        # Rows are sorted by due date: stop at the first one past the window
+        end = (start + timedelta(days=days)).isoformat()
+        for row in due_index.load()["rows"]:
+            if row[0] >= end:
+                break
+            count(date.fromisoformat(row[0]))
+    else:
+        scheduler = get_scheduler()
+        days_balanced = load_balance_days()
+        balancer = due_index.Balancer(scheduler, days_balanced)
+        # (due date, seq, name, history, state), earliest review first
+        pending = []
+        for seq, (name, entry) in enumerate(view_json(PROGRESS_FILE).items()):
+            history = entry.get("history", [])
+            if history:
+                state = scheduler.state(entry)
+                due = due_index.due_date(name, entry, state, days_balanced)
+                pending.append((due, seq, name, list(history), state))
+        heapq.heapify(pending)
+
+        while pending:
+            due, seq, name, history, state = heapq.heappop(pending)
+            offset = count(date.fromisoformat(due))
+            if offset is None:
+                break
+            # Reviewed on the day it is counted
+            on = start + timedelta(days=offset)
+            history.append({"rating": rating, "date": on.isoformat()})
+            state = scheduler.review(state, rating, on)
+            if scheduler.is_mastered(history, state):
+                balancer.remove(name)
+                continue
+            due = balancer.place(name, state, on.isoformat())
+            heapq.heappush(pending, (due, seq, name, history, state))
+
+    return [((start + timedelta(days=i)).isoformat(), n) for i, n in enumerate(counts)]
@@ -2,11 +2,15 @@ from rich.console import Console
 from rich.table import Table
 from srl.utils import format_problem_link
 from srl.storage import (
-    load_json,
+    recent_attempts,
     PROGRESS_FILE,
     MASTERED_FILE,
 )
-from datetime import datetime
+from datetime import date
+import argparse
+import heapq
+import itertools
+from typing import Optional
 
 
 def add_subparser(subparsers):
@@ -17,13 +21,32 @@ def add_subparser(subparsers):
         default=20,
         help="Number of recent entries to show (default: 20)"
     )
+    parser.add_argument(
+        "--since", type=iso_date, help="Only show attempts on or after this date (YYYY-MM-DD)"
+    )
+    parser.add_argument(
+        "--until", type=iso_date, help="Only show attempts on or before this date (YYYY-MM-DD)"
+    )
+    parser.add_argument("--problem", help="Only show attempts of this problem")
     parser.set_defaults(handler=handle)
     return parser
 
 
+def iso_date(value: str) -> str:
+    try:
+        return date.fromisoformat(value).isoformat()
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid date: '{value}' (expected YYYY-MM-DD)")
+
+
 def handle(args, console: Console):
     limit = args.n if hasattr(args, "n") else 20
-    history_entries = get_history(limit)
+    history_entries = get_history(
+        limit,
+        since=getattr(args, "since", None),
+        until=getattr(args, "until", None),
+        problem=getattr(args, "problem", None),
+    )
 
     if not history_entries:
         console.print("[yellow]No history found.[/yellow]")
@@ -58,54 +81,36 @@ def handle(args, console: Console):
     console.print(table)
 
 
-def get_history(limit: int = 20) -> list[dict]:
+def get_history(
+    limit: int = 20,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    problem: Optional[str] = None,
+) -> list[dict]:
     """
-    Get recent history entries from all problems.
+    Get recent history entries from all problems, optionally only those dated
+    between `since` and `until` (inclusive, YYYY-MM-DD) or of one problem.
     Returns a list of dicts with keys: date, problem, rating, status, url
     """
-    progress = load_json(PROGRESS_FILE)
-    mastered = load_json(MASTERED_FILE)
-
-    entries = []
-    index = 0
-
-    # Collect entries from progress
-    for name, info in progress.items():
-        url = info.get("url")
-        for attempt in info.get("history", []):
-            entries.append({
-                "date": attempt["date"],
-                "problem": name,
-                "rating": attempt["rating"],
-                "status": "In Progress",
-                "url": url,
-                "datetime": datetime.fromisoformat(attempt["date"]),
-                "index": index
-            })
-            index += 1
-
-    # Collect entries from mastered
-    for name, info in mastered.items():
-        url = info.get("url")
-        for attempt in info.get("history", []):
-            entries.append({
-                "date": attempt["date"],
-                "problem": name,
-                "rating": attempt["rating"],
-                "status": "Mastered",
-                "url": url,
-                "datetime": datetime.fromisoformat(attempt["date"]),
-                "index": index
-            })
-            index += 1
-
-    # Sort by date (most recent first), then by index (later entries first for same date)
-    entries.sort(key=lambda x: (x["datetime"], x["index"]), reverse=True)
-
-    # Remove the datetime and index fields (used only for sorting)
-    for entry in entries:
-        del entry["datetime"]
-        del entry["index"]
-
-    # Return limited results
-    return entries[:limit]
+    # Each file returns its own most recent attempts, newest first; mastered
+    # entries rank before progress ones when dates tie, as they come later on disk.
+    sources = ((PROGRESS_FILE, "In Progress"), (MASTERED_FILE, "Mastered"))
+    ranked = [
+        [
+            ((attempt["date"], rank, seq), name, attempt, url, status)
+            for seq, name, attempt, url in recent_attempts(path, limit, since, until, problem)
+        ]
+        for rank, (path, status) in enumerate(sources)
+    ]
+
+    merged = heapq.merge(*ranked, key=lambda entry: entry[0], reverse=True)
+    return [
+        {
+            "date": attempt["date"],
+            "problem": name,
+            "rating": attempt["rating"],
+            "status": status,
+            "url": url,
+        }
+        for _, name, attempt, url, status in itertools.islice(merged, max(limit, 0))
+    ]
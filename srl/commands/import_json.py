@@ -0,0 +1,34 @@
+from rich.console import Console
+from srl.storage import (
+    get_backend,
+    import_json_files,
+    DEFAULT_BACKEND,
+)
+
+
+def add_subparser(subparsers):
+    parser = subparsers.add_parser(
+        "import-json",
+        help="Import the JSON data files into the configured storage backend",
+    )
+    parser.set_defaults(handler=handle)
+    return parser
+
+
+def handle(args, console: Console):
+    backend = get_backend()
+
+    if backend.name == DEFAULT_BACKEND:
+        console.print(
+            "[yellow]The JSON backend is active; nothing to import.[/yellow] "
+            "Select another one with [green]srl config --storage-backend[/green]."
+        )
+        return
+
+    counts = import_json_files(backend)
+
+    console.print(f"[bold green]Imported JSON data into {backend.name}![/bold green]")
+    console.print(f"  In progress: {counts['progress']}")
+    console.print(f"  Mastered: {counts['mastered']}")
+    console.print(f"  Next up: {counts['next_up']}")
+    console.print(f"  Audits: {counts['audit']}")
@@ -1,11 +1,13 @@
 from rich.console import Console
+from typing import Optional
 from rich.panel import Panel
 from srl.utils import today, format_problem_link
 from srl.commands.audit import get_current_audit, random_audit
-from datetime import datetime, timedelta
 import random
+from srl import due_index, next_up_queue
 from srl.storage import (
     load_json,
+    view_json,
     NEXT_UP_FILE,
     PROGRESS_FILE,
 )
@@ -35,19 +37,12 @@ def handle(args, console: Console):
             )
             return
 
-    problems = get_due_problems(getattr(args, "n", None))
-    masters = mastery_candidates()
+    problems = get_due_details(getattr(args, "n", None))
 
     if problems:
-        # Load problem data to get URLs
-        data = load_json(PROGRESS_FILE)
-        next_up = load_json(NEXT_UP_FILE)
-
         lines = []
-        for i, p in enumerate(problems):
-            mark = " [magenta]*[/magenta]" if p in masters else ""
-            # Get URL from either progress or next_up data
-            url = data.get(p, {}).get("url") or next_up.get(p, {}).get("url")
+        for i, (p, url, mastery) in enumerate(problems):
+            mark = " [magenta]*[/magenta]" if mastery else ""
             lines.append(f"{i+1}. {format_problem_link(p, url)}{mark}")
 
         console.print(
@@ -73,37 +68,34 @@ def should_audit():
 
 
 def get_due_problems(limit=None) -> list[str]:
-    data = load_json(PROGRESS_FILE)
-    due = []
-
-    for name, info in data.items():
-        history = info["history"]
-        if not history:
-            continue
-        last = history[-1]
-        last_date = datetime.fromisoformat(last["date"]).date()
-        due_date = last_date + timedelta(days=last["rating"])
-        if due_date <= today():
-            due.append((name, last_date, last["rating"]))
-
-    # Sort: older last attempt first, then lower rating
-    due.sort(key=lambda x: (x[1], x[2]))
-    due_names = [name for name, _, _ in (due[:limit] if limit else due)]
+    # Sorted: older last attempt first, then lower rating
+    due_names = [row[-1] for row in due_index.due_rows(today(), limit)]
 
     if not due_names:
-        next_up = load_json(NEXT_UP_FILE)
-        fallback = list(next_up.keys())[: limit or 3]
-        return fallback
+        # Only the head of the queue is read
+        return next_up_queue.head(limit or 3)
 
     return due_names
 
 
 def mastery_candidates() -> set[str]:
-    """Return names of problems whose *last* rating was 5."""
-    data = load_json(PROGRESS_FILE)
-    out = set()
-    for name, info in data.items():
-        hist = info.get("history", [])
-        if hist and hist[-1].get("rating") == 5:
-            out.add(name)
-    return out
+    """Return names of problems that a 5 would master (by default: last rating was 5)."""
+    return due_index.mastery_attempts()
+
+
+def get_due_details(limit=None) -> list[tuple[str, Optional[str], bool]]:
+    """Due problems as (name, url, is_mastery_attempt), in `get_due_problems` order."""
+    problems = get_due_problems(limit)
+    masters = mastery_candidates()
+
+    # Get URL from either progress or next_up data
+    data = view_json(PROGRESS_FILE)
+    next_up = view_json(NEXT_UP_FILE)
+    return [
+        (
+            p,
+            data.get(p, {}).get("url") or next_up_queue.entry_info(next_up.get(p)).get("url"),
+            p in masters,
+        )
+        for p in problems
+    ]
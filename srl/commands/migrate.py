@@ -1,8 +1,10 @@
 from rich.console import Console
 from srl.utils import extract_problem_name_from_url
 from srl.storage import (
+    name_key,
     load_json,
     save_json,
+    transaction,
     PROGRESS_FILE,
     MASTERED_FILE,
     NEXT_UP_FILE,
@@ -31,6 +33,12 @@ def migrate_file(file_path, console: Console) -> tuple[int, int]:
     renamed_count = 0
     urls_to_remove = []
 
+    # Problem name entries by name_key, so each URL is matched with one lookup
+    names = {}
+    for key in data:
+        if not (key.startswith('http://') or key.startswith('https://')):
+            names.setdefault(name_key(key), key)
+
     # Find all URL entries (convert to list to avoid modification during iteration)
     for key in list(data.keys()):
         if key.startswith('http://') or key.startswith('https://'):
@@ -41,11 +49,7 @@ def migrate_file(file_path, console: Console) -> tuple[int, int]:
                 continue
 
             # Check if there's already an entry with the problem name
-            existing_entry = None
-            for existing_key in data.keys():
-                if existing_key.lower() == problem_name.lower() and existing_key != key:
-                    existing_entry = existing_key
-                    break
+            existing_entry = names.get(name_key(problem_name))
 
             if existing_entry:
                 # Merge histories
@@ -61,6 +65,7 @@ def migrate_file(file_path, console: Console) -> tuple[int, int]:
             else:
                 # No existing entry, rename the URL entry to the problem name
                 data[problem_name] = data[key]
+                names[name_key(problem_name)] = problem_name
                 urls_to_remove.append(key)
                 renamed_count += 1
                 console.print(f"[blue]Renamed[/blue] '{key}' to '{problem_name}'")
@@ -82,23 +87,25 @@ def handle(args, console: Console):
     total_merged = 0
     total_renamed = 0
 
-    # Migrate progress file
-    console.print("[cyan]Checking problems_in_progress.json...[/cyan]")
-    merged, renamed = migrate_file(PROGRESS_FILE, console)
-    total_merged += merged
-    total_renamed += renamed
-
-    # Migrate mastered file
-    console.print("\n[cyan]Checking problems_mastered.json...[/cyan]")
-    merged, renamed = migrate_file(MASTERED_FILE, console)
-    total_merged += merged
-    total_renamed += renamed
-
-    # Migrate next up file
-    console.print("\n[cyan]Checking next_up.json...[/cyan]")
-    merged, renamed = migrate_file(NEXT_UP_FILE, console)
-    total_merged += merged
-    total_renamed += renamed
+    # All files are migrated under one lock and committed together
+    with transaction():
+        # Migrate progress file
+        console.print("[cyan]Checking problems_in_progress.json...[/cyan]")
+        merged, renamed = migrate_file(PROGRESS_FILE, console)
+        total_merged += merged
+        total_renamed += renamed
+
+        # Migrate mastered file
+        console.print("\n[cyan]Checking problems_mastered.json...[/cyan]")
+        merged, renamed = migrate_file(MASTERED_FILE, console)
+        total_merged += merged
+        total_renamed += renamed
+
+        # Migrate next up file
+        console.print("\n[cyan]Checking next_up.json...[/cyan]")
+        merged, renamed = migrate_file(NEXT_UP_FILE, console)
+        total_merged += merged
+        total_renamed += renamed
 
     # Summary
     console.print(f"\n[bold green]Migration complete![/bold green]")
@@ -1,24 +1,41 @@
 from rich.console import Console
 from rich.panel import Panel
+from importlib import resources
+from typing import Iterable, Optional
 from srl.utils import today, extract_problem_name_from_url, format_problem_link
+from srl.next_up_queue import entry_info, NextUpQueue
 from srl.storage import (
-    load_json,
+    view_json,
     save_json,
+    find_name,
+    name_key,
+    delete_entry,
+    transaction,
     NEXT_UP_FILE,
     PROGRESS_FILE,
     MASTERED_FILE,
 )
 
+# queue_problem statuses for which the problem was added
+ADDED = ("added", "added_mastered")
+
+# Problem lists shipped with the package, for `srl nextup import-starter`
+STARTER_DATA = resources.files("srl") / "starter_data"
+
 
 def add_subparser(subparsers):
     parser = subparsers.add_parser("nextup", help="Next up problem queue")
     parser.add_argument(
         "action",
-        choices=["add", "list", "remove", "clear"],
-        help="Add, remove, list, or clear next-up problems",
+        choices=["add", "list", "remove", "clear", "import-starter", "pop", "move", "tag", "untag"],
+        help="Add, remove, list, or clear next-up problems, queue a starter list, "
+        "take problems off the front, reorder, or tag them",
     )
     parser.add_argument(
-        "name", nargs="?", help="Problem name (only needed for 'add' or 'remove')"
+        "name",
+        nargs="?",
+        help="Problem name (for 'add', 'remove', 'move', 'tag' and 'untag'), or starter "
+        "list for 'import-starter' (e.g. blind_75, neetcode_150)",
     )
     parser.add_argument(
         "--file",
@@ -30,32 +47,57 @@ def add_subparser(subparsers):
         action="store_true",
         help="Allow adding problems that are already mastered",
     )
+    parser.add_argument(
+        "--front",
+        action="store_true",
+        help="Add to the front of the queue (within its priority)",
+    )
+    parser.add_argument(
+        "--priority",
+        type=int,
+        default=0,
+        help="Queue ahead of problems with a lower priority (default: 0)",
+    )
+    parser.add_argument(
+        "--tag",
+        "-t",
+        action="append",
+        default=[],
+        dest="tags",
+        help="Tag to add, remove, or list by (repeatable)",
+    )
+    parser.add_argument(
+        "--to",
+        type=int,
+        help="New position for 'move', 1 being the front",
+    )
+    parser.add_argument(
+        "-n",
+        type=int,
+        default=1,
+        dest="count",
+        help="Number of problems to 'pop' (default: 1)",
+    )
     parser.set_defaults(handler=handle)
     return parser
 
 
 def handle(args, console: Console):
+    priority = getattr(args, "priority", 0)
+    tags = getattr(args, "tags", [])
+
     if args.action == "add":
         if hasattr(args, "file") and args.file:
-            try:
-                with open(args.file, "r") as f:
-                    lines = [line.strip() for line in f.readlines()]
-            except FileNotFoundError:
-                console.print(f"[bold red]File not found:[/bold red] {args.file}")
+            added_count = import_file(
+                args.file,
+                console,
+                hasattr(args, "allow_mastered") and args.allow_mastered,
+                priority,
+                tags,
+            )
+            if added_count is None:
                 return
 
-            added_count = 0
-            for line in lines:
-                if not line:
-                    continue
-                added = add_to_next_up(
-                    line,
-                    console,
-                    hasattr(args, "allow_mastered") and args.allow_mastered,
-                )
-                if added:
-                    added_count += 1
-
             console.print(
                 f"[green]Added {added_count} problems from file[/green] [bold]{args.file}[/bold] to Next Up Queue"
             )
@@ -69,17 +111,24 @@ def handle(args, console: Console):
                     args.name,
                     console,
                     hasattr(args, "allow_mastered") and args.allow_mastered,
+                    getattr(args, "front", False),
+                    priority,
+                    tags,
                 )
                 if added:
                     console.print(
                         f"[green]Added[/green] [bold]{args.name}[/bold] to Next Up Queue"
                     )
     elif args.action == "list":
-        next_up = get_next_up_problems()
+        next_up = [
+            (name, entry)
+            for name, entry in NextUpQueue.load().items()
+            if set(tags) <= set(entry_info(entry).get("tags", []))
+        ]
         if next_up:
             console.print(
                 Panel.fit(
-                    "\n".join(f"• {format_problem_link(name, url)}" for name, url in next_up),
+                    "\n".join(f"• {_describe(name, entry)}" for name, entry in next_up),
                     title=f"[bold cyan]Next Up Problems ({len(next_up)})[/bold cyan]",
                     border_style="cyan",
                     title_align="left",
@@ -96,59 +145,221 @@ def handle(args, console: Console):
             remove_from_next_up(args.name, console)
     elif args.action == "clear":
         clear_next_up(console)
+    elif args.action == "import-starter":
+        starters = starter_lists()
+        if args.name not in starters:
+            console.print(
+                f"[bold red]Please choose a starter list:[/bold red] {', '.join(starters) or 'none found'}"
+            )
+            return
 
+        added_count = import_lines(
+            (STARTER_DATA / f"{args.name}.txt").read_text().splitlines(),
+            console,
+            hasattr(args, "allow_mastered") and args.allow_mastered,
+            priority,
+            tags,
+        )
+        console.print(
+            f"[green]Added {added_count} problems from[/green] [bold]{args.name}[/bold] to Next Up Queue"
+        )
+    elif args.action == "pop":
+        popped = pop_next_up(getattr(args, "count", 1))
+        if popped:
+            console.print(f"[green]Took {len(popped)} problem(s) off the Next Up Queue:[/green]")
+            for name, entry in popped:
+                console.print(f"• {_describe(name, entry)}")
+        else:
+            console.print("[yellow]Next Up queue is empty.[/yellow]")
+    elif args.action in ("move", "tag", "untag"):
+        if not args.name:
+            console.print(
+                f"[bold red]Please provide a problem name to {args.action}.[/bold red]"
+            )
+        elif args.action == "move" and getattr(args, "to", None) is None:
+            console.print("[bold red]Please provide the new position with --to.[/bold red]")
+        elif args.action != "move" and not tags:
+            console.print("[bold red]Please provide at least one --tag.[/bold red]")
+        else:
+            update_next_up(args.action, args.name, console, getattr(args, "to", None), tags)
 
-def add_to_next_up(identifier, console, allow_mastered=False) -> bool:
+
+def add_to_next_up(
+    identifier, console, allow_mastered=False, front=False, priority=0, tags=()
+) -> bool:
     """
     Add a problem to Next Up queue if not already present, in progress, or mastered.
     Accepts name or URL. Returns True if added, False otherwise.
     """
-    # Extract name and URL if it's a URL
-    url = None
-    name = identifier
-    if identifier.startswith('http://') or identifier.startswith('https://'):
-        extracted_name = extract_problem_name_from_url(identifier)
-        if extracted_name:
-            name = extracted_name
-            url = identifier
-        else:
-            console.print(f"[red]Could not extract problem name from URL:[/red] {identifier}")
-            return False
+    name, status = queue_problem(identifier, allow_mastered, front, priority, tags)
+    report(identifier, name, status, console)
+    return status in ADDED
 
-    next_up = load_json(NEXT_UP_FILE)
-    in_progress = load_json(PROGRESS_FILE)
-    mastered = load_json(MASTERED_FILE)
 
-    if name in next_up:
+def report(identifier: str, name: str, status: str, console: Console):
+    """Print why a problem was not added (or added despite being mastered)."""
+    if status == "invalid_url":
+        console.print(f"[red]Could not extract problem name from URL:[/red] {identifier}")
+    elif status == "queued":
         console.print(f'[yellow]"{name}" is already in the Next Up queue.[/yellow]')
-        return False
-
-    if name in in_progress:
+    elif status == "in_progress":
         console.print(f'[yellow]"{name}" is already in progress.[/yellow]')
-        return False
+    elif status == "mastered":
+        console.print(f'[yellow]"{name}" is already mastered.[/yellow]')
+    elif status == "added_mastered":
+        console.print(
+            f'[blue]"{name}" is mastered but will be added due to flag.[/blue]'
+        )
 
-    if name in mastered:
-        if allow_mastered:
-            console.print(
-                f'[blue]"{name}" is mastered but will be added due to flag.[/blue]'
-            )
-        else:
-            console.print(f'[yellow]"{name}" is already mastered.[/yellow]')
-            return False
 
-    entry = {"added": today().isoformat()}
-    if url:
-        entry["url"] = url
-    next_up[name] = entry
-    save_json(NEXT_UP_FILE, next_up)
-    return True
+def import_file(
+    path, console: Console, allow_mastered: bool = False, priority: int = 0, tags: Iterable[str] = ()
+) -> Optional[int]:
+    """
+    Queue the problems listed in a file (one name or URL per line), reporting the
+    ones skipped. Returns the number added, or None if the file does not exist.
+    """
+    try:
+        with open(path, "r") as f:
+            lines = f.readlines()
+    except FileNotFoundError:
+        console.print(f"[bold red]File not found:[/bold red] {path}")
+        return None
+    return import_lines(lines, console, allow_mastered, priority, tags)
+
+
+def starter_lists() -> list[str]:
+    """Names of the starter lists shipped with srl (e.g. blind_75)."""
+    return sorted(
+        entry.name.removesuffix(".txt") for entry in STARTER_DATA.iterdir() if entry.name.endswith(".txt")
+    )
+
+
+def import_lines(
+    lines: Iterable[str], console: Console, allow_mastered: bool = False, priority: int = 0, tags: Iterable[str] = ()
+) -> int:
+    """Queue the problems in `lines` as import_file does. Returns the number added."""
+    identifiers = [line.strip() for line in lines if line.strip()]
+    results = queue_problems(identifiers, allow_mastered, priority, tags)
+    for identifier, (name, status) in zip(identifiers, results):
+        report(identifier, name, status, console)
+    return sum(status in ADDED for _, status in results)
+
+
+def _parse_identifier(identifier: str) -> tuple[Optional[str], Optional[str]]:
+    """(name, url) of a problem name or URL; (None, None) for a URL without a name."""
+    if identifier.startswith('http://') or identifier.startswith('https://'):
+        return extract_problem_name_from_url(identifier), identifier
+    return identifier, None
+
+
+def queue_problem(
+    identifier: str,
+    allow_mastered: bool = False,
+    front: bool = False,
+    priority: int = 0,
+    tags: Iterable[str] = (),
+) -> tuple[str, str]:
+    """
+    Add a problem (name or URL) to the Next Up queue unless it is already queued,
+    in progress, or mastered: at the back of the problems of the same or a higher
+    priority, or with `front` ahead of those of the same or a lower one. Returns
+    (name, status) where status is one of "added", "added_mastered", "queued",
+    "in_progress", "mastered" or "invalid_url".
+    """
+    # Extract name and URL if it's a URL
+    name, url = _parse_identifier(identifier)
+    if not name:
+        return identifier, "invalid_url"
+
+    with transaction():
+        # Matched ignoring case and slug form; reported under the stored name
+        queued = find_name(NEXT_UP_FILE, name)
+        if queued is not None:
+            return queued, "queued"
+
+        in_progress = find_name(PROGRESS_FILE, name)
+        if in_progress is not None:
+            return in_progress, "in_progress"
+
+        status = "added"
+        mastered = find_name(MASTERED_FILE, name)
+        if mastered is not None:
+            if not allow_mastered:
+                return mastered, "mastered"
+            status = "added_mastered"
+
+        entry = {"added": today().isoformat()}
+        if url:
+            entry["url"] = url
+        queue = NextUpQueue.load()
+        queue.push(name, entry, front, priority, tags)
+        queue.save()
+        return name, status
+
+
+def queue_problems(
+    identifiers: Iterable[str],
+    allow_mastered: bool = False,
+    priority: int = 0,
+    tags: Iterable[str] = (),
+) -> list[tuple[str, str]]:
+    """
+    queue_problem for many problems, in order: next up, progress and mastered are
+    read once and next up is saved once. A problem listed twice is "queued" the
+    second time. Returns (name, status) for each identifier.
+    """
+    results = []
+    with transaction():
+        queue = NextUpQueue.load()
+        # Stored names by name_key, matched as find_name does
+        in_progress = _names(view_json(PROGRESS_FILE))
+        mastered = _names(view_json(MASTERED_FILE))
+
+        added = today().isoformat()
+        for identifier in identifiers:
+            name, url = _parse_identifier(identifier)
+            if not name:
+                results.append((identifier, "invalid_url"))
+                continue
+
+            queued = queue.find(name)
+            if queued is not None:
+                results.append((queued, "queued"))
+                continue
+            key = name_key(name)
+            if key in in_progress:
+                results.append((in_progress[key], "in_progress"))
+                continue
+
+            status = "added"
+            if key in mastered:
+                if not allow_mastered:
+                    results.append((mastered[key], "mastered"))
+                    continue
+                status = "added_mastered"
+
+            entry = {"added": added}
+            if url:
+                entry["url"] = url
+            queue.push(name, entry, priority=priority, tags=tags)
+            results.append((name, status))
+
+        queue.save()
+    return results
+
+
+def _names(data: dict) -> dict[str, str]:
+    names = {}
+    for name in data:
+        names.setdefault(name_key(name), name)
+    return names
 
 
 def get_next_up_problems() -> list[tuple[str, str]]:
-    data = load_json(NEXT_UP_FILE)
     res = []
 
-    for name, info in data.items():
+    for name, info in NextUpQueue.load().items():
         url = info.get("url") if isinstance(info, dict) else None
         res.append((name, url))
 
@@ -156,17 +367,57 @@ def get_next_up_problems() -> list[tuple[str, str]]:
 
 
 def remove_from_next_up(name: str, console: Console):
-    data = load_json(NEXT_UP_FILE)
+    with transaction():
+        stored = find_name(NEXT_UP_FILE, name)
+
+        if stored is None:
+            console.print(f'[yellow]"{name}" not found in the Next Up queue.[/yellow]')
+            return
+
+        delete_entry(NEXT_UP_FILE, stored)
+        console.print(f"[green]Removed[/green] [bold]{stored}[/bold] from Next Up Queue")
+
+
+def pop_next_up(n: int) -> list[tuple[str, dict]]:
+    """Remove the first `n` problems from the queue and return them with their entries."""
+    with transaction():
+        queue = NextUpQueue.load()
+        popped = queue.pop(n)
+        queue.save()
+    return popped
+
+
+def update_next_up(action: str, name: str, console: Console, to: Optional[int] = None, tags=()):
+    """Move ('move', to a 1-based position) or tag ('tag'/'untag') a queued problem."""
+    with transaction():
+        queue = NextUpQueue.load()
+        if action == "move":
+            stored = queue.move(name, to - 1)
+        else:
+            stored = queue.tag(name, tags, remove=action == "untag")
+        if stored is None:
+            console.print(f'[yellow]"{name}" not found in the Next Up queue.[/yellow]')
+            return
+        queue.save()
+
+    if action == "move":
+        console.print(f"[green]Moved[/green] [bold]{stored}[/bold] to position {list(queue).index(stored) + 1}")
+    else:
+        console.print(f"[green]Tags of[/green] [bold]{stored}[/bold]: {', '.join(queue.get(stored).get('tags', [])) or 'none'}")
 
-    if name not in data:
-        console.print(f'[yellow]"{name}" not found in the Next Up queue.[/yellow]')
-        return
 
-    del data[name]
-    save_json(NEXT_UP_FILE, data)
-    console.print(f"[green]Removed[/green] [bold]{name}[/bold] from Next Up Queue")
+def _describe(name: str, entry: dict) -> str:
+    info = entry if isinstance(entry, dict) else {}
+    text = format_problem_link(name, info.get("url"))
+    if info.get("priority"):
+        text += f" [magenta](priority {info['priority']})[/magenta]"
+    if info.get("tags"):
+        text += " " + " ".join(f"[cyan]#{tag}[/cyan]" for tag in info["tags"])
+    return text
 
 
 def clear_next_up(console: Console):
-    save_json(NEXT_UP_FILE, {})
+    # Under the data lock, so the event log can't sequence it alongside another writer
+    with transaction():
+        save_json(NEXT_UP_FILE, {})
     console.print("[green]Next Up queue cleared.[/green]")
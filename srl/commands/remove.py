@@ -1,8 +1,9 @@
 from rich.console import Console
 from srl.utils import resolve_problem_identifier
 from srl.storage import (
-    load_json,
-    save_json,
+    view_json,
+    find_name,
+    delete_entry,
     PROGRESS_FILE,
 )
 
@@ -15,7 +16,7 @@ def add_subparser(subparsers):
 
 
 def handle(args, console: Console):
-    data = load_json(PROGRESS_FILE)
+    data = view_json(PROGRESS_FILE)
 
     # Get list of in-progress problems for number resolution
     in_progress_problems = list(data.keys())
@@ -26,9 +27,9 @@ def handle(args, console: Console):
     if not name:
         return  # Error already printed by resolver
 
-    if name in data:
-        del data[name]
-        save_json(PROGRESS_FILE, data)
+    stored = find_name(PROGRESS_FILE, name)
+    if stored is not None and delete_entry(PROGRESS_FILE, stored):
+        name = stored
         console.print(
             f"[green]Removed[/green] '[cyan]{name}[/cyan]' [green]from in-progress.[/green]"
         )
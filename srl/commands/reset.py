@@ -1,8 +1,9 @@
 from rich.console import Console
 from rich.prompt import Confirm
 from srl.storage import (
-    load_json,
     save_json,
+    view_json,
+    transaction,
     PROGRESS_FILE,
     MASTERED_FILE,
     NEXT_UP_FILE,
@@ -93,31 +94,20 @@ def handle(args, console: Console):
     # Perform reset
     reset_count = 0
 
-    if reset_progress:
-        if PROGRESS_FILE.exists():
-            save_json(PROGRESS_FILE, {})
-            console.print("[green]✓[/green] Reset in-progress problems")
-            reset_count += 1
-
-    if reset_mastered:
-        if MASTERED_FILE.exists():
-            save_json(MASTERED_FILE, {})
-            console.print("[green]✓[/green] Reset mastered problems")
-            reset_count += 1
-
-    if reset_next_up:
-        if NEXT_UP_FILE.exists():
-            save_json(NEXT_UP_FILE, {})
-            console.print("[green]✓[/green] Reset next up queue")
-            reset_count += 1
-
-    if reset_audit:
-        if AUDIT_FILE.exists():
-            save_json(AUDIT_FILE, {})
-            console.print("[green]✓[/green] Reset audit data")
-            reset_count += 1
+    # Check through the backend: SQLite and the event log keep no JSON files
+    with transaction():
+        for selected, file_path, label in (
+            (reset_progress, PROGRESS_FILE, "in-progress problems"),
+            (reset_mastered, MASTERED_FILE, "mastered problems"),
+            (reset_next_up, NEXT_UP_FILE, "next up queue"),
+            (reset_audit, AUDIT_FILE, "audit data"),
+        ):
+            if selected and view_json(file_path):
+                save_json(file_path, {})
+                console.print(f"[green]✓[/green] Reset {label}")
+                reset_count += 1
 
     if reset_count > 0:
         console.print(f"\n[bold green]Successfully reset {reset_count} data file(s).[/bold green]")
     else:
-        console.print("[yellow]No data files found to reset.[/yellow]")
+        console.print("[yellow]No data found to reset.[/yellow]")
@@ -1,4 +1,5 @@
 from rich.console import Console
+from srl.memory_backend import FLUSH_DELAY
 
 
 def add_subparser(subparsers):
@@ -9,6 +10,22 @@ def add_subparser(subparsers):
         "--reload", action="store_true", help="Enable auto-reload (dev)"
     )
     parser.add_argument("--public", action="store_true", help="Alias: bind to 0.0.0.0")
+    parser.add_argument(
+        "--flush-delay",
+        type=float,
+        default=FLUSH_DELAY,
+        help=f"Seconds of quiet before changes are written to disk (default: {FLUSH_DELAY})",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        help="Commands run at the same time (default: 4)",
+    )
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        help="Seconds before a command is answered with a timeout (default: 30)",
+    )
     parser.set_defaults(handler=handle)
     return parser
 
@@ -20,4 +37,16 @@ def handle(args, console: Console):
     msg = f"Starting server on {host}:{args.port} (reload={bool(args.reload)})"
     console.print(msg)
 
-    run_server(host=host, port=args.port, reload=bool(args.reload))
+    # Unset options fall back to the server's defaults
+    limits = {
+        key: getattr(args, key)
+        for key in ("workers", "timeout")
+        if getattr(args, key) is not None
+    }
+    run_server(
+        host=host,
+        port=args.port,
+        reload=bool(args.reload),
+        flush_delay=args.flush_delay,
+        **limits,
+    )
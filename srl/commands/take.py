@@ -1,6 +1,7 @@
 from types import SimpleNamespace
 from rich.console import Console
 from srl.commands import add, list_
+from srl.next_up_queue import entry_info
 from srl.utils import format_problem_link
 from srl.storage import load_json, PROGRESS_FILE, NEXT_UP_FILE
 import argparse
@@ -55,5 +56,5 @@ def handle(args, console: Console):
         # Load URL for display
         data = load_json(PROGRESS_FILE)
         next_up = load_json(NEXT_UP_FILE)
-        url = data.get(problem, {}).get("url") or next_up.get(problem, {}).get("url")
+        url = data.get(problem, {}).get("url") or entry_info(next_up.get(problem)).get("url")
         console.print(format_problem_link(problem, url))
@@ -0,0 +1,200 @@
+"""
+Long-running `srl daemon` and the client side used by `srl` to reach it.
+
+The daemon keeps the parser, the command modules and the parsed data files warm
+and runs commands sent over a Unix domain socket, one at a time. Requests and
+responses are a single JSON line each:
+
+    -> {"argv": [...], "cwd": "...", "width": 80, "terminal": true, "env": {...}}
+    <- {"stdout": "...", "stderr": "...", "exit": 0}
+
+srl.main imports this module only when the socket file exists, and the client
+half only uses the standard library.
+"""
+
+from contextlib import redirect_stderr, redirect_stdout
+from typing import Optional
+import io
+import json
+import os
+import shutil
+import socket
+import socketserver
+import sys
+import threading
+import traceback
+from srl import storage
+
+# Commands that need the caller's terminal or process and always run locally
+LOCAL_COMMANDS = {"daemon", "server", "reset"}
+# Options measuring this process, so commands using them run locally too
+LOCAL_OPTIONS = {"--timings", "--profile"}
+# Set to run every command in-process even when a daemon is running
+DISABLE_ENV = "SRL_NO_DAEMON"
+# Terminal settings forwarded so output is rendered as it would be locally
+FORWARDED_ENV = ("TERM", "COLORTERM", "NO_COLOR")
+
+CONNECT_TIMEOUT = 0.5
+
+
+def _request(message: dict, timeout: Optional[float] = None) -> Optional[dict]:
+    """Send one request to the daemon; None when no daemon is listening."""
+    if not os.path.exists(storage.DAEMON_SOCKET):
+        return None
+
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.settimeout(CONNECT_TIMEOUT)
+        sock.connect(str(storage.DAEMON_SOCKET))
+        sock.settimeout(timeout)
+        sock.sendall(json.dumps(message).encode() + b"\n")
+        with sock.makefile("rb") as f:
+            line = f.readline()
+    except OSError:
+        # Stale socket file or a daemon that went away
+        return None
+    finally:
+        sock.close()
+    return json.loads(line) if line else None
+
+
+def forward(argv: list[str]) -> Optional[int]:
+    """
+    Run `srl <argv>` in the daemon and write its output to this process's
+    stdout/stderr. Returns the exit code, or None if the command must run locally.
+    """
+    if os.environ.get(DISABLE_ENV) or not argv or argv[0] in LOCAL_COMMANDS:
+        return None
+    if any(arg.split("=", 1)[0] in LOCAL_OPTIONS for arg in argv):
+        return None
+
+    response = _request(
+        {
+            "argv": argv,
+            "cwd": os.getcwd(),
+            "width": shutil.get_terminal_size().columns,
+            "terminal": sys.stdout.isatty(),
+            "env": {key: os.environ[key] for key in FORWARDED_ENV if key in os.environ},
+        }
+    )
+    if response is None:
+        return None
+
+    sys.stdout.write(response.get("stdout", ""))
+    sys.stderr.write(response.get("stderr", ""))
+    return response.get("exit", 0)
+
+
+def status() -> Optional[dict]:
+    return _request({"op": "status"}, timeout=5)
+
+
+def stop() -> bool:
+    return _request({"op": "stop"}, timeout=5) is not None
+
+
+# Server side
+
+
+def _color_system(env: dict) -> Optional[str]:
+    """Same detection rich applies to a terminal, using the client's environment."""
+    if "NO_COLOR" in env:
+        return None
+    if env.get("COLORTERM", "").lower() in ("truecolor", "24bit"):
+        return "truecolor"
+    if env.get("TERM", "").endswith("256color"):
+        return "256"
+    return "standard"
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self):
+        line = self.rfile.readline()
+        if not line:
+            return
+        try:
+            request = json.loads(line)
+        except ValueError:
+            return
+
+        if request.get("op") == "stop":
+            response = {"stopping": True}
+            threading.Thread(target=self.server.shutdown, daemon=True).start()
+        elif request.get("op") == "status":
+            response = {"pid": os.getpid(), "served": self.server.served}
+        else:
+            response = self.server.run_command(request)
+
+        self.wfile.write(json.dumps(response).encode() + b"\n")
+
+
+class DaemonServer(socketserver.UnixStreamServer):
+    """Serves commands sequentially with a parser built once."""
+
+    def __init__(self, socket_path):
+        from srl import cli
+        from rich.console import Console
+
+        self.console_cls = Console
+        self.parser = cli.build_parser(load_all=True)
+        self.served = 0
+
+        super().__init__(str(socket_path), _Handler)
+        os.chmod(socket_path, 0o600)
+
+    def run_command(self, request: dict) -> dict:
+        stdout, stderr = io.StringIO(), io.StringIO()
+        env = request.get("env", {})
+        terminal = request.get("terminal", False)
+        console = self.console_cls(
+            file=stdout,
+            width=request.get("width") or 80,
+            force_terminal=terminal,
+            color_system=_color_system(env) if terminal else None,
+            no_color="NO_COLOR" in env,
+        )
+
+        code = 0
+        cwd = os.getcwd()
+        try:
+            os.chdir(request.get("cwd", cwd))
+            with redirect_stdout(stdout), redirect_stderr(stderr):
+                args = self.parser.parse_args(request.get("argv", []))
+                if hasattr(args, "handler"):
+                    args.handler(args, console)
+                else:
+                    self.parser.print_help()
+        except SystemExit as e:
+            if isinstance(e.code, str):
+                stderr.write(e.code + "\n")
+            code = e.code if isinstance(e.code, int) else int(e.code is not None)
+        except Exception:
+            stderr.write(traceback.format_exc())
+            code = 1
+        finally:
+            os.chdir(cwd)
+
+        self.served += 1
+        return {"stdout": stdout.getvalue(), "stderr": stderr.getvalue(), "exit": code}
+
+
+def serve(ready: Optional[threading.Event] = None):
+    """Run the daemon until it is asked to stop."""
+    socket_path = storage.DAEMON_SOCKET
+    storage.ensure_data_dir()
+
+    if status() is not None:
+        raise RuntimeError("srl daemon is already running")
+    # Left behind by a daemon that did not shut down cleanly
+    if os.path.exists(socket_path):
+        os.unlink(socket_path)
+
+    server = DaemonServer(socket_path)
+    if ready is not None:
+        ready.set()
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
@@ -0,0 +1,414 @@
+"""
+Persisted due-date index over the in-progress problems.
+
+Rows are `[due_date, last_date, rating, seq, mastery_attempt, name]`, kept sorted
+so the problems due on a given day are a prefix of the list. Due dates come from
+the configured scheduler. `seq` is the order problems were first added, which
+breaks ties the same way scanning the progress file did. The index stores the
+signature of the progress document it mirrors and the scheduling settings, and is
+rebuilt when they no longer match (e.g. the file was edited by hand).
+
+On disk the index is a base file holding the rows, plus a log of the rows each
+write removed and added, so recording an attempt appends one short line instead
+of rewriting every row. The log is folded into a new base once it grows past
+LOG_LIMIT. Lookups by name and the counts per day are rebuilt in memory.
+
+With load balancing on (`srl config --load-balance DAYS`), a due date may move
+up to DAYS either way, and at most a quarter of its interval, to the day with
+the fewest reviews, so problems added together don't all come back together.
+The day is picked when an attempt is recorded (Balancer, counting `load`, the
+rows due on each day) and stored with the entry under "balance", so rebuilding
+the index reads the same dates back instead of choosing again.
+"""
+
+from bisect import bisect_right, insort
+from datetime import date, timedelta
+from operator import itemgetter
+from typing import Optional, TYPE_CHECKING
+import heapq
+import os
+import time
+import zlib
+from srl import codec, metrics, storage, timing
+from srl.storage import (
+    view_json_file,
+    write_json_file,
+    StorageBackend,
+)
+
+if TYPE_CHECKING:
+    from srl.scheduling import Scheduler
+
+INDEX_VERSION = 5
+
+# Share of its interval a due date may move by when load balancing
+BALANCE_FRACTION = 0.25
+
+# Bytes of logged row changes folded into a new base file
+LOG_LIMIT = 256 * 1024
+
+# Indexes over backends that are not persisted (the server's in-memory engine)
+_volatile = {}
+
+# The persisted index as of the log offset last replayed: base (the parse it was
+# built from), index, log (inode) and offset
+_loaded = {}
+
+
+def _row(scheduler: "Scheduler", name: str, entry: dict, seq: int, days: int) -> list:
+    history = entry["history"]
+    last = history[-1]
+    state = scheduler.state(entry)
+    return [
+        due_date(name, entry, state, days),
+        # Attempts may carry a time of day; only the date counts
+        last["date"][:10],
+        last["rating"],
+        seq,
+        scheduler.mastery_attempt(history, state),
+        name,
+    ]
+
+
+def _window(due: str, last: str, days: int) -> list[str]:
+    """Days a due date may move to when balancing within `days`, earliest first."""
+    ideal = date.fromisoformat(due)
+    after = date.fromisoformat(last[:10])
+    spread = max(0, min(days, round((ideal - after).days * BALANCE_FRACTION)))
+    window = [ideal + timedelta(days=offset) for offset in range(-spread, spread + 1)]
+    return [day.isoformat() for day in window if day > after]
+
+
+def due_date(name: str, entry: dict, state: dict, days: int) -> str:
+    """
+    The date `entry` shows up in `srl list`: its scheduled due date, or with load
+    balancing the day stored when its last attempt was recorded. Entries without
+    one (edited by hand, or recorded before balancing was on) get a pick in their
+    window that depends only on the entry, so a rebuild never moves them either.
+    """
+    due = state["due"]
+    if not days:
+        return due
+    window = _window(due, entry["history"][-1]["date"], days)
+    if len(window) < 2:
+        return due
+    stored = entry.get("balance") or {}
+    if stored.get("due") == due and stored.get("on") in window:
+        return stored["on"]
+    return window[zlib.crc32(f"{name}\n{due}".encode()) % len(window)]
+
+
+class Balancer:
+    """
+    Picks balanced due dates as attempts are recorded: the day in a problem's
+    window with the fewest reviews, tie going to the closest to its scheduled
+    date. Days are counted from the index, with the picks made so far in place
+    of the rows they replace.
+    """
+
+    def __init__(self, scheduler: "Scheduler", days: int):
+        self.scheduler = scheduler
+        self.days = days
+        index = load() if days else {"names": {}, "load": {}}
+        self._rows = index["names"]
+        self._placed = {}
+        self.load = dict(index["load"])
+
+    def _move(self, name: str, day: Optional[str]):
+        """Count `name` as due on `day` (None: no longer in progress)."""
+        if name in self._placed:
+            old = self._placed[name]
+        else:
+            row = self._rows.get(name)
+            old = row[0] if row is not None else None
+        if old is not None:
+            self.load[old] -= 1
+            if not self.load[old]:
+                del self.load[old]
+        if day is not None:
+            self.load[day] = self.load.get(day, 0) + 1
+        self._placed[name] = day
+
+    def place(self, name: str, state: dict, last: str) -> str:
+        """Due date for `name`, scheduled for state["due"] after an attempt on `last`."""
+        self._move(name, None)
+        due = state["due"]
+        window = _window(due, last, self.days) if self.days else []
+        if window:
+            ideal = date.fromisoformat(due)
+            due = min(
+                window,
+                key=lambda day: (self.load.get(day, 0), abs((date.fromisoformat(day) - ideal).days), day),
+            )
+        self._move(name, due)
+        return due
+
+    def record(self, name: str, entry: dict):
+        """Store the balanced due date of `entry`, whose attempt was just recorded."""
+        if self.days:
+            state = self.scheduler.state(entry)
+            on = self.place(name, state, entry["history"][-1]["date"])
+            entry["balance"] = {"due": state["due"], "on": on}
+
+    def remove(self, name: str):
+        """`name` is no longer in progress (mastered)."""
+        if self.days:
+            self._move(name, None)
+
+
+def _source(backend: StorageBackend, signature) -> list:
+    # Read from config, so checking an index is current loads no scheduler
+    return [backend.name, signature, storage.scheduler_name(), storage.load_balance_days()]
+
+
+def _current_source(backend: StorageBackend) -> list:
+    return _source(backend, backend.signature(storage.PROGRESS_FILE))
+
+
+def _is_current(index: dict, backend: StorageBackend) -> bool:
+    return (
+        index.get("version") == INDEX_VERSION
+        and index.get("source") == _current_source(backend)
+    )
+
+
+def build(backend: StorageBackend) -> dict:
+    # Taken first: if the document changes while we read it, the index is stale
+    source = _current_source(backend)
+    # Only needed to rebuild, so a current index is read without them
+    from srl import batch
+    from srl.scheduling import get_scheduler
+
+    scheduler = get_scheduler()
+    days = source[-1]
+    # Stored balanced dates are kept with the entry, not its last attempt
+    if scheduler.stateful or days:
+        entries = (
+            (name, entry)
+            for name, entry in backend.view(storage.PROGRESS_FILE).items()
+            if entry.get("history")
+        )
+    else:
+        # Only the last attempt is needed
+        attempts = list(backend.last_attempts(storage.PROGRESS_FILE))
+        if len(attempts) >= batch.BATCH_THRESHOLD and batch.available():
+            return _index(source, batch.due_rows(attempts))
+        entries = ((name, {"history": [last]}) for name, last in attempts)
+    rows = [_row(scheduler, name, entry, seq, days) for seq, (name, entry) in enumerate(entries)]
+    rows.sort()
+    return _index(source, rows)
+
+
+def _index(source: list, rows: list) -> dict:
+    """Index over `rows`, sorted by their due dates."""
+    load = {}
+    for row in rows:
+        load[row[0]] = load.get(row[0], 0) + 1
+    return {
+        "version": INDEX_VERSION,
+        "source": source,
+        "next_seq": len(rows),
+        "rows": rows,
+        "names": {row[-1]: row for row in rows},
+        "load": load,
+    }
+
+
+def _materialize(base: dict) -> dict:
+    """In-memory index over a base file: its rows, with lookups by name and day."""
+    if base.get("version") != INDEX_VERSION:
+        return {}
+    # Rows are never changed once created, so the parse can share them
+    index = dict(base)
+    index["rows"] = rows = list(base["rows"])
+    index["names"] = {row[-1]: row for row in rows}
+    load = index["load"] = {}
+    for row in rows:
+        load[row[0]] = load.get(row[0], 0) + 1
+    return index
+
+
+def _copy(index: dict) -> dict:
+    """Copy of `index` that changes can be applied to; readers keep the original."""
+    return {
+        **index,
+        "rows": list(index["rows"]),
+        "names": dict(index["names"]),
+        "load": dict(index["load"]),
+    }
+
+
+def _remove(index: dict, name: str) -> Optional[list]:
+    old = index["names"].pop(name, None)
+    if old is not None:
+        rows = index["rows"]
+        pos = bisect_right(rows, old) - 1
+        if pos >= 0 and rows[pos] == old:
+            del rows[pos]
+        load = index["load"]
+        load[old[0]] -= 1
+        if not load[old[0]]:
+            del load[old[0]]
+    return old
+
+
+def _insert(index: dict, row: list):
+    insort(index["rows"], row)
+    index["names"][row[-1]] = row
+    index["load"][row[0]] = index["load"].get(row[0], 0) + 1
+
+
+def _apply(index: dict, delta: dict):
+    """Replay a logged write: each change replaces the row of a name (or drops it)."""
+    for name, row in delta["changes"]:
+        _remove(index, name)
+        if row is not None:
+            _insert(index, row)
+    index["source"] = delta["source"]
+    index["next_seq"] = delta["next_seq"]
+
+
+def _replay(index: dict) -> dict:
+    """`index` with the changes logged since the last replay applied."""
+    try:
+        st = os.stat(storage.DUE_INDEX_LOG_FILE)
+    except FileNotFoundError:
+        st = None
+    if st is None or st.st_ino != _loaded["log"] or st.st_size < _loaded["offset"]:
+        if _loaded["offset"]:
+            # Lines already applied are gone: start over from the base
+            index = _materialize(_loaded["base"])
+        _loaded["log"] = st.st_ino if st else None
+        _loaded["offset"] = 0
+    if st is None or st.st_size == _loaded["offset"] or not index:
+        return index
+
+    with timing.phase("load"):
+        start = time.perf_counter()
+        with open(storage.DUE_INDEX_LOG_FILE, "rb") as f:
+            f.seek(_loaded["offset"])
+            chunk = f.read()
+        # A torn last line is read again once complete
+        chunk = chunk[: chunk.rfind(b"\n") + 1]
+        timing.count(len(chunk))
+        index = _copy(index)
+        for line in chunk.splitlines():
+            try:
+                delta = codec.loads(line)
+            except ValueError:
+                continue
+            # Lines logged against an older base were folded into it or are stale
+            if delta.get("base") == index.get("id"):
+                _apply(index, delta)
+        metrics.storage_read(len(chunk), time.perf_counter() - start)
+    _loaded["offset"] += len(chunk)
+    return index
+
+
+def _read(backend: StorageBackend) -> dict:
+    if not backend.persistent:
+        return _volatile.get(id(backend), {})
+
+    base = view_json_file(storage.DUE_INDEX_FILE)
+    if _loaded.get("base") is not base:
+        _loaded.update(base=base, index=_materialize(base), log=None, offset=0)
+    _loaded["index"] = _replay(_loaded["index"])
+    return _loaded["index"]
+
+
+def _write(backend: StorageBackend, index: dict, delta: Optional[dict] = None):
+    """Store `index`; for a persisted one, by logging `delta` when it is given."""
+    if not backend.persistent:
+        # Rebuilding from memory is cheap; keep the index off the disk
+        _volatile.clear()
+        _volatile[id(backend)] = index
+        return
+
+    if delta is not None and _loaded.get("index") is not None:
+        line = codec.dumps({"base": index.get("id"), **delta}) + b"\n"
+        if _loaded["offset"] + len(line) <= LOG_LIMIT:
+            with timing.phase("save"):
+                start = time.perf_counter()
+                with open(storage.DUE_INDEX_LOG_FILE, "ab") as f:
+                    f.write(line)
+                    st = os.fstat(f.fileno())
+                timing.count(len(line))
+                metrics.storage_write(len(line), time.perf_counter() - start)
+            _loaded.update(index=index, log=st.st_ino, offset=st.st_size)
+            return
+
+    index["id"] = os.urandom(8).hex()
+    base = {key: index[key] for key in ("version", "id", "source", "next_seq", "rows")}
+    write_json_file(storage.DUE_INDEX_FILE, base)
+    # After the new base: a reader in between skips the old lines by their base id
+    storage.DUE_INDEX_LOG_FILE.unlink(missing_ok=True)
+    _loaded.update(base=view_json_file(storage.DUE_INDEX_FILE), index=index, log=None, offset=0)
+
+
+def load(backend: Optional[StorageBackend] = None) -> dict:
+    """Return an up-to-date index (shared, read-only), rebuilding it when stale."""
+    backend = backend or storage.get_backend()
+    index = _read(backend)
+    current = _is_current(index, backend)
+    metrics.cache("due_index", hit=current)
+    if not current:
+        index = build(backend)
+        _write(backend, index)
+    return index
+
+
+def update(backend: StorageBackend, changes: list[tuple[str, Optional[dict]]], before):
+    """
+    Apply committed in-progress entry changes, given as (name, entry or None).
+
+    `before` is the progress signature prior to the writes; if the index did not
+    match it, the index was already stale and is left to be rebuilt lazily.
+    """
+    index = _read(backend)
+    if index.get("version") != INDEX_VERSION or index.get("source") != _source(backend, before):
+        return
+    index = _copy(index)
+    from srl.scheduling import get_scheduler
+
+    scheduler = get_scheduler()
+    days = storage.load_balance_days()
+
+    logged = []
+    for name, entry in changes:
+        old = _remove(index, name)
+        if old is not None:
+            seq = old[3]
+        else:
+            seq = index["next_seq"]
+            index["next_seq"] += 1
+
+        row = None
+        history = entry.get("history", []) if entry else []
+        if history:
+            row = _row(scheduler, name, entry, seq, days)
+            _insert(index, row)
+        logged.append([name, row])
+
+    index["source"] = _current_source(backend)
+    delta = {"source": index["source"], "next_seq": index["next_seq"], "changes": logged}
+    _write(backend, index, delta)
+
+
+def due_rows(on: date, limit: Optional[int] = None) -> list[list]:
+    """Rows due on or before `on`, oldest last attempt first, then lowest rating."""
+    rows = load()["rows"]
+    cut = bisect_right(rows, [on.isoformat(), "\uffff"])
+    key = itemgetter(1, 2, 3)
+    if limit:
+        return heapq.nsmallest(limit, rows[:cut], key=key)
+    return sorted(rows[:cut], key=key)
+
+
+def last_ratings() -> dict[str, int]:
+    """Most recent rating of every in-progress problem."""
+    return {name: row[2] for name, row in load()["names"].items()}
+
+
+def mastery_attempts() -> set[str]:
+    """Problems that a 5 on their next attempt would master."""
+    return {name for name, row in load()["names"].items() if row[4]}
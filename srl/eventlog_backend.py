@@ -0,0 +1,308 @@
+from pathlib import Path
+from contextlib import contextmanager
+from typing import Optional
+import os
+import time
+from srl import codec, metrics, storage, timing
+from srl.storage import StorageBackend, clone_json
+
+# Fold the log into a new snapshot once this many events have piled up, or once
+# it holds this many bytes (right after an import or other large replace)
+AUTO_COMPACT_EVENTS = 5000
+AUTO_COMPACT_BYTES = 1024 * 1024
+
+DOCUMENTS = ("progress", "mastered", "next_up", "audit")
+
+
+def _appended(old: list, new: list) -> Optional[list]:
+    """Items appended to `old` to obtain `new`, or None if `new` is not an extension."""
+    if len(new) >= len(old) and new[: len(old)] == old:
+        return new[len(old):]
+    return None
+
+
+def diff_events(doc: str, old: dict, new: dict) -> list[dict]:
+    """
+    Smallest list of events turning document `old` into `new`, keys in order.
+    A new rating or audit result becomes a single one-line event.
+    """
+    events = []
+    for name in old.keys() - new.keys():
+        events.append({"op": "delete", "doc": doc, "name": name})
+
+    for name, value in new.items():
+        current = old.get(name)
+        if current == value:
+            continue
+
+        if isinstance(current, list) and isinstance(value, list):
+            added = _appended(current, value)
+            if added is not None:
+                for item in added:
+                    events.append({"op": "append", "doc": doc, "name": name, "item": item})
+                continue
+
+        if isinstance(current, dict) and isinstance(value, dict) and "history" in current:
+            added = _appended(current["history"], value.get("history", []))
+            # The scheduler state changes along with the attempts
+            rest_equal = {k: v for k, v in current.items() if k not in ("history", "schedule")} == {
+                k: v for k, v in value.items() if k not in ("history", "schedule")
+            }
+            schedule_changed = current.get("schedule") != value.get("schedule")
+            if added and rest_equal and (not schedule_changed or "schedule" in value):
+                for attempt in added:
+                    events.append({"op": "attempt", "doc": doc, "name": name, "attempt": attempt})
+                if schedule_changed:
+                    events[-1]["schedule"] = value["schedule"]
+                continue
+
+        events.append({"op": "put", "doc": doc, "name": name, "value": value})
+
+    # Rewriting most of a document (reset, import) is cheaper as a single event.
+    # Puts of new names append them, so a reordered document is replaced too.
+    kept = [name for name in old if name in new]
+    reordered = list(new) != kept + [name for name in new if name not in old]
+    if reordered or len(events) > max(8, len(new) // 2):
+        return [{"op": "replace", "doc": doc, "data": new}]
+    return events
+
+
+def apply_event(docs: dict, event: dict):
+    op = event["op"]
+    if op == "batch":
+        for inner in event["events"]:
+            apply_event(docs, inner)
+        return
+
+    data = docs.setdefault(event["doc"], {})
+    if op == "put":
+        data[event["name"]] = event["value"]
+    elif op == "delete":
+        data.pop(event["name"], None)
+    elif op == "attempt":
+        entry = data.setdefault(event["name"], {"history": []})
+        entry["history"].append(event["attempt"])
+        if "schedule" in event:
+            entry["schedule"] = event["schedule"]
+    elif op == "append":
+        data.setdefault(event["name"], []).append(event["item"])
+    elif op == "replace":
+        docs[event["doc"]] = event["data"]
+
+
+class EventLogBackend(StorageBackend):
+    """
+    Append-only journal of changes on top of a periodic snapshot.
+
+    Every write is diffed against the materialized state and appended to the log as
+    one line per event (a rating, an audit result, a next up change), so its cost
+    does not grow with the size of the collection. The state is rebuilt from the
+    snapshot plus a replay of the log tail; `compact` folds the log into a new
+    snapshot. Events carry a sequence number and the snapshot records the last one
+    it contains, so a crash between writing the snapshot and truncating the log
+    never applies an event twice.
+    """
+
+    name = "eventlog"
+
+    def __init__(self):
+        self.log_path = storage.EVENT_LOG_FILE
+        self.snapshot_path = storage.SNAPSHOT_FILE
+        self._docs = None
+        self._versions = {}
+        self._seq = 0
+        self._snapshot_seq = 0
+        self._log_id = None
+        self._offset = 0
+        self._needs_newline = False
+        self._batch = None
+
+    # Materialization
+
+    def _read_snapshot(self) -> dict:
+        # Parsed for this instance alone: the state is changed in place, so the
+        # shared parse cache would only add a copy of the whole collection
+        try:
+            with timing.phase("load"):
+                start = time.perf_counter()
+                raw = self.snapshot_path.read_bytes()
+                timing.count(len(raw))
+                snapshot = codec.loads(raw)
+        except FileNotFoundError:
+            return {}
+        metrics.storage_read(len(raw), time.perf_counter() - start)
+        return snapshot
+
+    def _reset(self):
+        snapshot = self._read_snapshot()
+        self._docs = snapshot.get("docs", {})
+        self._versions = snapshot.get("versions", {})
+        self._seq = self._snapshot_seq = snapshot.get("seq", 0)
+        self._log_id = None
+        self._offset = 0
+        self._needs_newline = False
+
+    def _refresh(self):
+        """Replay log lines written since the last refresh (by any process)."""
+        try:
+            st = os.stat(self.log_path)
+        except FileNotFoundError:
+            st = None
+
+        log_id = st.st_ino if st else None
+        size = st.st_size if st else 0
+        if self._docs is None or log_id != self._log_id or size < self._offset:
+            self._reset()
+            self._log_id = log_id
+        if size == self._offset:
+            return
+
+        start = time.perf_counter()
+        with open(self.log_path, "rb") as f:
+            f.seek(self._offset)
+            tail = f.read()
+        # A line still being appended is read again once complete
+        chunk = tail[: tail.rfind(b"\n") + 1]
+        timing.count(len(tail))
+
+        for line in chunk.splitlines():
+            try:
+                event = codec.loads(line)
+            except ValueError:
+                # A torn line from an interrupted append
+                continue
+            if event.get("seq", 0) <= self._seq:
+                continue
+            apply_event(self._docs, event)
+            self._seq = event["seq"]
+            self._touch(event)
+
+        self._offset += len(chunk)
+        # Left unfinished by a crashed writer if it is still there when we append
+        self._needs_newline = len(chunk) < len(tail)
+        metrics.storage_read(len(tail), time.perf_counter() - start)
+
+    def _touch(self, event: dict):
+        for inner in event["events"] if event["op"] == "batch" else [event]:
+            self._versions[inner["doc"]] = event["seq"]
+
+    def _doc(self, file_path: Path) -> tuple[str, dict]:
+        doc = storage.document_name(file_path)
+        if doc not in DOCUMENTS:
+            raise ValueError(f"{file_path} is not stored in the event log")
+        self._refresh()
+        return doc, self._docs.setdefault(doc, {})
+
+    def _append(self, events: list[dict]):
+        if not events:
+            return
+
+        # Apply copies so later changes to the caller's objects don't leak into
+        # the state; our own lines are skipped by sequence number on replay.
+        for event in events:
+            apply_event(self._docs, clone_json(event))
+
+        if self._batch is not None:
+            self._batch.extend(events)
+        else:
+            self._write(events)
+
+    def _write(self, events: list[dict]):
+        lines = []
+        for event in events:
+            self._seq += 1
+            event["seq"] = self._seq
+            self._touch(event)
+            lines.append(codec.dumps_text(event))
+        payload = ("\n" if self._needs_newline else "") + "\n".join(lines) + "\n"
+
+        start = time.perf_counter()
+        with timing.phase("save"), open(self.log_path, "a") as f:
+            timing.count(len(payload))
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+            size = f.tell()
+        metrics.storage_write(len(payload), time.perf_counter() - start)
+        self._needs_newline = False
+
+        if self._seq - self._snapshot_seq >= AUTO_COMPACT_EVENTS or size >= AUTO_COMPACT_BYTES:
+            self.compact()
+
+    @contextmanager
+    def transaction(self):
+        """Buffer events and append them as a single line, so they apply all or nothing."""
+        if self._batch is not None:
+            yield
+            return
+
+        self._refresh()
+        self._batch = []
+        try:
+            yield
+            events, self._batch = self._batch, None
+        except BaseException:
+            # Drop the uncommitted changes from the materialized state
+            self._batch = None
+            self._docs = None
+            raise
+
+        if len(events) > 1:
+            events = [{"op": "batch", "events": events}]
+        if events:
+            self._write(events)
+
+    # StorageBackend interface
+
+    def load(self, file_path: Path) -> dict:
+        _, data = self._doc(file_path)
+        return clone_json(data)
+
+    def view(self, file_path: Path) -> dict:
+        _, data = self._doc(file_path)
+        return data
+
+    def save(self, file_path: Path, data: dict):
+        doc, current = self._doc(file_path)
+        self._append(diff_events(doc, current, data))
+
+    def signature(self, file_path: Path):
+        self._refresh()
+        return self._versions.get(storage.document_name(file_path), 0)
+
+    def put_entry(self, file_path: Path, name: str, entry: dict):
+        doc, data = self._doc(file_path)
+        self._append(diff_events(doc, {name: data[name]} if name in data else {}, {name: entry}))
+
+    def delete_entry(self, file_path: Path, name: str) -> bool:
+        doc, data = self._doc(file_path)
+        if name not in data:
+            return False
+        self._append([{"op": "delete", "doc": doc, "name": name}])
+        return True
+
+    def pending_events(self) -> int:
+        """Number of log events not yet folded into the snapshot."""
+        self._refresh()
+        return self._seq - self._snapshot_seq
+
+    def compact(self) -> int:
+        """
+        Write the current state as a new snapshot and start an empty log. Holds
+        `data_lock` so no event can be appended between the last replay and the
+        log being replaced.
+        """
+        with storage.data_lock():
+            self._refresh()
+            folded = self._seq - self._snapshot_seq
+            snapshot = {"seq": self._seq, "versions": self._versions, "docs": self._docs}
+
+            storage.write_file(self.snapshot_path, codec.dumps(snapshot))
+            # A new, empty file: other processes see the inode change and reload
+            storage.write_file(self.log_path, b"")
+
+            self._snapshot_seq = self._seq
+            self._log_id = os.stat(self.log_path).st_ino
+            self._offset = 0
+            self._needs_newline = False
+        return folded
@@ -1,15 +1,35 @@
+import os
+import sys
 from srl.cli import build_parser
 from srl.storage import ensure_data_dir
-from srl.banner import banner
-from rich.console import Console
+from srl import storage
 
 
 def main():
+    # A running `srl daemon` has everything loaded already; without one, its
+    # client (sockets and the server half) is not even imported
+    if os.path.exists(storage.DAEMON_SOCKET):
+        from srl import daemon
+
+        code = daemon.forward(sys.argv[1:])
+        if code:
+            sys.exit(code)
+        if code is not None:
+            return
+
+    from rich.console import Console
+    from srl.banner import banner
+
     ensure_data_dir()
     parser = build_parser()
     args = parser.parse_args()
-    console = Console()
+    if hasattr(args, "handler") and (getattr(args, "timings", False) or getattr(args, "profile", None)):
+        from srl import timing
+
+        timing.run_handler(args, getattr(args, "profile", None))
+        return
 
+    console = Console()
     if hasattr(args, "handler"):
         args.handler(args, console)
     else:
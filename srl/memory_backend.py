@@ -0,0 +1,276 @@
+from pathlib import Path
+from contextlib import contextmanager
+from typing import Optional
+import threading
+import time
+import uuid
+from srl import metrics, storage
+from srl.storage import StorageBackend, clone_json
+
+# Wait this long after the last write before flushing, so bursts share one write
+FLUSH_DELAY = 0.5
+# ...but never keep changes in memory for longer than this
+MAX_FLUSH_DELAY = 5.0
+
+
+def _merge(base: dict, changed: dict, names: set) -> dict:
+    """`base` with the entries `names` taken from `changed` (or removed)."""
+    merged = dict(base)
+    for name in names:
+        if name in changed:
+            merged[name] = changed[name]
+        else:
+            merged.pop(name, None)
+    return merged
+
+
+class MemoryBackend(StorageBackend):
+    """
+    Keeps every document in memory and writes changes behind to another backend.
+
+    Used by the HTTP server: requests read and modify the in-memory documents and a
+    background thread persists the changed ones, batched into one transaction of
+    the underlying backend once writes have been quiet for `delay` seconds. `close`
+    flushes what is left. Documents that have no pending changes are reloaded when
+    the underlying backend's signature shows they were modified elsewhere (e.g. by
+    the CLI).
+    """
+
+    name = "memory"
+    persistent = False
+
+    def __init__(
+        self,
+        inner: StorageBackend,
+        delay: float = FLUSH_DELAY,
+        max_delay: float = MAX_FLUSH_DELAY,
+    ):
+        self.inner = inner
+        self.delay = delay
+        self.max_delay = max_delay
+
+        self._lock = threading.RLock()
+        self._changed = threading.Condition(self._lock)
+        self._docs = {}
+        self._known = {}
+        self._versions = {}
+        self._token = uuid.uuid4().hex
+        # Changed documents -> names of the changed entries (None: whole document)
+        self._dirty = {}
+        self._flushing = set()
+        self._first_dirty = 0.0
+        self._last_write = 0.0
+        self._undo = None
+        self._closed = False
+
+        # Serialize flushes, and access to the underlying backend. Locks are
+        # taken in the order _flush_lock, storage.data_lock, _lock, _inner_lock.
+        self._flush_lock = threading.Lock()
+        self._inner_lock = threading.Lock()
+        self._thread = threading.Thread(
+            target=self._run, name="srl-write-behind", daemon=True
+        )
+        self._thread.start()
+
+    # In-memory state
+
+    def _doc(self, file_path: Path) -> dict:
+        """Current document, (re)loaded from the underlying backend when needed."""
+        if file_path in self._dirty or file_path in self._flushing:
+            metrics.cache("memory", hit=True)
+            return self._docs[file_path]
+
+        # While a flush holds the underlying backend, memory is the newest state
+        if not self._inner_lock.acquire(blocking=False):
+            if file_path in self._docs:
+                metrics.cache("memory", hit=True)
+                return self._docs[file_path]
+            self._inner_lock.acquire()
+        try:
+            signature = self.inner.signature(file_path)
+            current = file_path in self._docs and signature == self._known[file_path]
+            metrics.cache("memory", hit=current)
+            if not current:
+                self._docs[file_path] = self.inner.load(file_path)
+                self._known[file_path] = signature
+                self._versions[file_path] = self._versions.get(file_path, 0) + 1
+        finally:
+            self._inner_lock.release()
+        return self._docs[file_path]
+
+    def _replace(self, file_path: Path, data: dict, name: Optional[str] = None):
+        """
+        Swap in a new version of a document, changed at entry `name` or as a
+        whole. Documents are never modified in place, so views handed to other
+        threads stay consistent.
+        """
+        previous = self._docs[file_path]
+        self._docs[file_path] = data
+        if self._undo is not None:
+            self._undo.append((file_path, previous))
+
+        now = time.monotonic()
+        if not self._dirty:
+            self._first_dirty = now
+        self._last_write = now
+        self._mark(file_path, None if name is None else {name})
+        self._versions[file_path] = self._versions.get(file_path, 0) + 1
+        self._changed.notify()
+
+    def _mark(self, file_path: Path, names: Optional[set]):
+        """Record changed entries of a document (None: the whole document)."""
+        if file_path not in self._dirty:
+            self._dirty[file_path] = set(names) if names is not None else None
+        elif self._dirty[file_path] is not None:
+            if names is None:
+                self._dirty[file_path] = None
+            else:
+                self._dirty[file_path] |= names
+
+    # StorageBackend interface
+
+    def load(self, file_path: Path) -> dict:
+        with self._lock:
+            return clone_json(self._doc(file_path))
+
+    def view(self, file_path: Path) -> dict:
+        with self._lock:
+            return self._doc(file_path)
+
+    def save(self, file_path: Path, data: dict):
+        with self._lock:
+            self._doc(file_path)
+            self._replace(file_path, clone_json(data))
+
+    def signature(self, file_path: Path):
+        with self._lock:
+            self._doc(file_path)
+            return [self._token, self._versions[file_path]]
+
+    @contextmanager
+    def transaction(self):
+        """Hold the documents for the block and undo its changes if it fails."""
+        with self._lock:
+            if self._undo is not None:
+                yield
+                return
+
+            self._undo = []
+            try:
+                yield
+            except BaseException:
+                for file_path, previous in reversed(self._undo):
+                    self._docs[file_path] = previous
+                    self._versions[file_path] += 1
+                raise
+            finally:
+                self._undo = None
+
+    def get_entry(self, file_path: Path, name: str) -> Optional[dict]:
+        with self._lock:
+            entry = self._doc(file_path).get(name)
+            return clone_json(entry) if entry is not None else None
+
+    def put_entry(self, file_path: Path, name: str, entry: dict):
+        with self._lock:
+            data = dict(self._doc(file_path))
+            data[name] = clone_json(entry)
+            self._replace(file_path, data, name)
+
+    def delete_entry(self, file_path: Path, name: str) -> bool:
+        with self._lock:
+            data = self._doc(file_path)
+            if name not in data:
+                return False
+            data = dict(data)
+            del data[name]
+            self._replace(file_path, data, name)
+            return True
+
+    # Write-behind
+
+    def _run(self):
+        while True:
+            with self._lock:
+                while not self._dirty and not self._closed:
+                    self._changed.wait()
+                while not self._closed:
+                    deadline = min(
+                        self._last_write + self.delay,
+                        self._first_dirty + self.max_delay,
+                    )
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._changed.wait(remaining)
+                if self._closed:
+                    return
+
+            try:
+                self.flush()
+            except Exception:
+                # Keep the changes in memory and retry after the next quiet period
+                with self._lock:
+                    self._last_write = time.monotonic()
+
+    def flush(self):
+        """
+        Write every changed document to the underlying backend.
+
+        Runs under the data directory lock. If another process changed a document
+        since it was loaded, only the entries changed here are written on top of
+        that version, so both sets of changes are kept.
+        """
+        with self._flush_lock:
+            with self._lock:
+                if not self._dirty:
+                    return
+                pending = {
+                    path: (clone_json(self._docs[path]), names)
+                    for path, names in self._dirty.items()
+                }
+                self._flushing = set(pending)
+                self._dirty = {}
+
+            # Not holding self._lock: requests keep being served from memory
+            merged = {}
+            try:
+                with storage.data_lock(), self._inner_lock:
+                    with self.inner.transaction():
+                        for file_path, (data, names) in pending.items():
+                            changed = self.inner.signature(file_path) != self._known.get(file_path)
+                            if changed and names is not None:
+                                data = merged[file_path] = _merge(
+                                    self.inner.load(file_path), data, names
+                                )
+                            self.inner.save(file_path, data)
+                    known = {path: self.inner.signature(path) for path in pending}
+            except BaseException:
+                with self._lock:
+                    for file_path, (_, names) in pending.items():
+                        self._mark(file_path, names)
+                    self._flushing = set()
+                raise
+
+            with self._lock:
+                self._known.update(known)
+                for file_path, data in merged.items():
+                    # Bring in the other process's changes, keeping newer local ones
+                    names = self._dirty.get(file_path, set())
+                    if names is not None:
+                        self._docs[file_path] = _merge(data, self._docs[file_path], names)
+                        self._versions[file_path] += 1
+                self._flushing = set()
+
+    def pending(self) -> int:
+        """Number of documents with changes not yet written."""
+        with self._lock:
+            return len(self._dirty.keys() | self._flushing)
+
+    def close(self):
+        """Stop the background writer and flush remaining changes."""
+        with self._lock:
+            self._closed = True
+            self._changed.notify()
+        self._thread.join()
+        self.flush()
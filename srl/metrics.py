@@ -0,0 +1,161 @@
+"""
+Process-wide counters and histograms, exposed by the server at /metrics in the
+Prometheus text format.
+
+Metrics live in memory for the life of the process and are updated from any
+thread. Nothing is sent anywhere: a scraper (or curl) reads the current values.
+Only the standard library is imported here: srl.storage uses this module.
+"""
+
+from typing import Callable, Iterable, Iterator
+import threading
+
+# Seconds; request latencies from sub-millisecond to the default 30s timeout
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_lock = threading.Lock()
+REGISTRY: list["Metric"] = []
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: tuple, values: tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labels: Iterable[str] = ()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._values = {}
+        REGISTRY.append(self)
+
+    def samples(self) -> Iterator[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self.samples())
+        return "\n".join(lines)
+
+    def reset(self):
+        with _lock:
+            self._values.clear()
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, *labels, amount: float = 1):
+        with _lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, *labels) -> float:
+        return self._values.get(labels, 0)
+
+    def samples(self):
+        with _lock:
+            values = sorted(self._values.items())
+        if not values and not self.labels:
+            values = [((), 0)]
+        for labels, value in values:
+            yield f"{self.name}{_labels(self.labels, labels)} {_number(value)}"
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labels: Iterable[str] = (), buckets=BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = buckets
+
+    def observe(self, value: float, *labels):
+        with _lock:
+            state = self._values.get(labels)
+            if state is None:
+                # Per bucket counts (the last for +Inf), then the sum
+                state = self._values[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[i] += 1
+                    break
+            else:
+                state[len(self.buckets)] += 1
+            state[-1] += value
+
+    def count(self, *labels) -> int:
+        state = self._values.get(labels)
+        return sum(state[:-1]) if state else 0
+
+    def samples(self):
+        with _lock:
+            values = sorted((labels, list(state)) for labels, state in self._values.items())
+        for labels, state in values:
+            cumulative = 0
+            for bound, n in zip(self.buckets + (float("inf"),), state):
+                cumulative += n
+                le = "+Inf" if bound == float("inf") else _number(bound)
+                bucket = _labels(self.labels, labels, f'le="{le}"')
+                yield f"{self.name}_bucket{bucket} {cumulative}"
+            yield f"{self.name}_sum{_labels(self.labels, labels)} {_number(state[-1])}"
+            yield f"{self.name}_count{_labels(self.labels, labels)} {cumulative}"
+
+
+class Gauge(Metric):
+    """A value read when the metrics are rendered, from `collect`: {labels: value}."""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, help: str, labels: Iterable[str] = (), collect: Callable[[], dict] = dict):
+        super().__init__(name, help, labels)
+        self.collect = collect
+
+    def samples(self):
+        for labels, value in sorted(self.collect().items()):
+            yield f"{self.name}{_labels(self.labels, labels)} {_number(value)}"
+
+
+STORAGE_READS = Counter("srl_storage_reads_total", "Data files read and parsed")
+STORAGE_READ_BYTES = Counter("srl_storage_read_bytes_total", "Bytes of data files read")
+STORAGE_READ_SECONDS = Counter("srl_storage_read_seconds_total", "Time spent reading and parsing data files")
+STORAGE_WRITES = Counter("srl_storage_writes_total", "Data files written")
+STORAGE_WRITE_BYTES = Counter("srl_storage_written_bytes_total", "Bytes of data files written")
+STORAGE_WRITE_SECONDS = Counter("srl_storage_write_seconds_total", "Time spent encoding and writing data files")
+CACHE_REQUESTS = Counter(
+    "srl_cache_requests_total",
+    "Lookups in srl's caches (parsed files, name indexes, due index, activity counts, server memory)",
+    ("cache", "result"),
+)
+
+
+def storage_read(nbytes: int, seconds: float):
+    STORAGE_READS.inc()
+    STORAGE_READ_BYTES.inc(amount=nbytes)
+    STORAGE_READ_SECONDS.inc(amount=seconds)
+
+
+def storage_write(nbytes: int, seconds: float, files: int = 1):
+    STORAGE_WRITES.inc(amount=files)
+    STORAGE_WRITE_BYTES.inc(amount=nbytes)
+    STORAGE_WRITE_SECONDS.inc(amount=seconds)
+
+
+def cache(name: str, hit: bool):
+    CACHE_REQUESTS.inc(name, "hit" if hit else "miss")
+
+
+def render(metrics: Iterable[Metric] = ()) -> str:
+    """Every registered metric (or those given) in the Prometheus text format."""
+    return "\n".join(metric.render() for metric in (metrics or REGISTRY)) + "\n"
@@ -0,0 +1,235 @@
+"""
+The Next Up queue: problems to start once nothing is due, in order.
+
+next_up.json still maps names to entries. Each entry records its "position" in
+the queue and optionally a "priority" (higher first, default 0) and "tags"; the
+queue is ordered by priority, then position. The document itself is stored in
+queue order, so the head of the queue is the start of the document: `head` asks
+the backend for its first names only (a LIMIT query on SQLite). Entries from
+before positions existed are ordered as they were stored, which is the order
+they were queued in; entries that are not objects (null, a bare string) count
+as having no fields.
+"""
+
+from collections import deque
+from typing import Iterable, Iterator, Optional
+from srl import storage
+from srl.storage import (
+    load_json,
+    save_json,
+    put_entry,
+    delete_entry,
+    name_key,
+    transaction,
+)
+
+
+def entry_info(entry) -> dict:
+    """Fields of a queue entry; {} for entries that are not objects."""
+    return entry if isinstance(entry, dict) else {}
+
+
+def _order(entry, index: int) -> tuple[int, int]:
+    info = entry_info(entry)
+    # Stored order stands in for a missing position
+    return -info.get("priority", 0), info.get("position", index)
+
+
+def head(n: int) -> list[str]:
+    """
+    The first `n` names in the queue. SQLite reads only those rows; the JSON file
+    is parsed whole (once per change, as every read of it is).
+    """
+    return storage.first_names(storage.NEXT_UP_FILE, n)
+
+
+class NextUpQueue:
+    """
+    The queue as a deque of names over their entries, with a name_key index for
+    membership. Changes are kept in memory until `save`.
+    """
+
+    def __init__(self, entries: dict):
+        self._entries = entries
+        keys = [_order(entry, index) for index, entry in enumerate(entries.values())]
+        self._order = deque(entries)
+        # A document out of order (edited by hand) is rewritten on the next save
+        self._reordered = keys != sorted(keys)
+        if self._reordered:
+            ranked = sorted(zip(keys, entries))
+            self._order = deque(name for _, name in ranked)
+
+        self._names = {}
+        for name in self._order:
+            self._names.setdefault(name_key(name), name)
+        self._changed = set()
+        self._removed = set()
+
+    @classmethod
+    def load(cls) -> "NextUpQueue":
+        return cls(load_json(storage.NEXT_UP_FILE))
+
+    def __len__(self) -> int:
+        return len(self._order)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._order)
+
+    def __contains__(self, name: str) -> bool:
+        return self.find(name) is not None
+
+    def items(self) -> Iterator[tuple[str, dict]]:
+        return ((name, self._entries[name]) for name in self._order)
+
+    def find(self, name: str) -> Optional[str]:
+        """Stored name of a queued problem, matched as storage.find_name does."""
+        if name in self._entries:
+            return name
+        return self._names.get(name_key(name))
+
+    def get(self, name: str) -> Optional[dict]:
+        stored = self.find(name)
+        return self._entries[stored] if stored is not None else None
+
+    def _priority(self, name: str) -> int:
+        return entry_info(self._entries[name]).get("priority", 0)
+
+    def _writable(self, name: str) -> dict:
+        """The entry of `name`, replaced by an empty one if it is not an object."""
+        if not isinstance(self._entries[name], dict):
+            self._entries[name] = {}
+        return self._entries[name]
+
+    def _next_position(self) -> int:
+        if not self._order:
+            return 0
+        return entry_info(self._entries[self._order[-1]]).get("position", len(self._order) - 1) + 1
+
+    def _slot(self, priority: int, front: bool) -> int:
+        """Index at which an entry of `priority` is inserted."""
+        if not front:
+            # Behind every entry of the same or a higher priority
+            for index in range(len(self._order) - 1, -1, -1):
+                if self._priority(self._order[index]) >= priority:
+                    return index + 1
+            return 0
+        for index, name in enumerate(self._order):
+            if self._priority(name) <= priority:
+                return index
+        return len(self._order)
+
+    def push(
+        self,
+        name: str,
+        entry: dict,
+        front: bool = False,
+        priority: int = 0,
+        tags: Iterable[str] = (),
+    ):
+        """Queue `name` (not already queued) at the back of its priority, or the front."""
+        entry = dict(entry)
+        if priority:
+            entry["priority"] = priority
+        if tags:
+            entry["tags"] = sorted(set(tags))
+
+        index = self._slot(priority, front)
+        if index == len(self._order):
+            entry["position"] = self._next_position()
+            self._order.append(name)
+        else:
+            self._order.insert(index, name)
+            self._reordered = True
+
+        self._entries[name] = entry
+        self._names.setdefault(name_key(name), name)
+        self._changed.add(name)
+        self._removed.discard(name)
+
+    def remove(self, name: str) -> Optional[str]:
+        """Remove a queued problem; returns its stored name, or None if not queued."""
+        stored = self.find(name)
+        if stored is None:
+            return None
+        self._order.remove(stored)
+        self._forget(stored)
+        return stored
+
+    def _forget(self, name: str):
+        del self._entries[name]
+        if self._names.get(name_key(name)) == name:
+            del self._names[name_key(name)]
+        self._changed.discard(name)
+        self._removed.add(name)
+
+    def pop(self, n: int = 1) -> list[tuple[str, dict]]:
+        """Remove and return the first `n` problems."""
+        popped = []
+        while self._order and len(popped) < n:
+            name = self._order.popleft()
+            popped.append((name, self._entries[name]))
+            self._forget(name)
+        return popped
+
+    def move(self, name: str, index: int) -> Optional[str]:
+        """
+        Move a queued problem to `index` (0 is the head). It takes the priority of
+        the problem it lands in front of (or behind, at the end), so priorities
+        stay in order. Returns the stored name, or None if not queued.
+        """
+        stored = self.find(name)
+        if stored is None:
+            return None
+        self._order.remove(stored)
+        index = max(0, min(index, len(self._order)))
+        self._order.insert(index, stored)
+
+        if index + 1 < len(self._order):
+            priority = self._priority(self._order[index + 1])
+        elif index:
+            priority = self._priority(self._order[index - 1])
+        else:
+            priority = 0
+        entry = self._writable(stored)
+        if priority:
+            entry["priority"] = priority
+        else:
+            entry.pop("priority", None)
+        self._changed.add(stored)
+        self._reordered = True
+        return stored
+
+    def tag(self, name: str, tags: Iterable[str], remove: bool = False) -> Optional[str]:
+        """Add (or remove) tags on a queued problem. Returns the stored name, or None."""
+        stored = self.find(name)
+        if stored is None:
+            return None
+        entry = self._writable(stored)
+        current = set(entry.get("tags", []))
+        current = current - set(tags) if remove else current | set(tags)
+        if current:
+            entry["tags"] = sorted(current)
+        else:
+            entry.pop("tags", None)
+        self._changed.add(stored)
+        return stored
+
+    def save(self):
+        """
+        Write the changes: a single appended, changed or removed entry on its own,
+        anything more (or a new order, with positions renumbered) as a rewrite.
+        """
+        with transaction():
+            if not self._reordered and len(self._changed) + len(self._removed) == 1:
+                for name in self._removed:
+                    delete_entry(storage.NEXT_UP_FILE, name)
+                for name in self._changed:
+                    put_entry(storage.NEXT_UP_FILE, name, self._entries[name])
+            elif self._reordered or self._changed or self._removed:
+                if self._reordered:
+                    for position, name in enumerate(self._order):
+                        self._writable(name)["position"] = position
+                save_json(storage.NEXT_UP_FILE, {name: self._entries[name] for name in self._order})
+        self._reordered = False
+        self._changed = set()
+        self._removed = set()
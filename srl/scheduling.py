@@ -0,0 +1,246 @@
+"""
+Scheduling engines: when a problem in progress is next due, and when it counts
+as mastered.
+
+The engine is selected with `srl config --scheduler`. `default` is the original
+rule (due `rating` days after the last attempt, mastered after two 5s in a row)
+and keeps no state. `sm2` and `fsrs` store their per-problem state in the entry
+under "schedule", updated on every attempt, so finding what is due never replays
+the history. Stored state is only trusted while it covers the whole history;
+otherwise (an audit failure, a merge, a hand edit) the history is replayed.
+"""
+
+from datetime import date, datetime, timedelta
+from typing import Optional
+import math
+from srl.storage import DEFAULT_SCHEDULER, load_balance_days, scheduler_name  # noqa: F401
+
+# sm2 and fsrs: problems whose next interval reaches this many days are mastered
+MASTERY_INTERVAL = 30
+
+
+def attempt_date(attempt: dict) -> date:
+    return datetime.fromisoformat(attempt["date"]).date()
+
+
+class Scheduler:
+    """
+    Base class for scheduling engines. Subclasses implement `review` and
+    `is_mastered`; state is a JSON-serializable dict with at least "due".
+    """
+
+    name = ""
+    # Whether the state is stored with the entry
+    stateful = True
+
+    def review(self, state: Optional[dict], rating: int, on: date) -> dict:
+        """State after an attempt rated `rating` on `on` (`state` None for the first)."""
+        raise NotImplementedError
+
+    def is_mastered(self, history: list[dict], state: dict) -> bool:
+        raise NotImplementedError
+
+    def replay(self, history: list[dict]) -> dict:
+        state = None
+        for attempt in history:
+            state = self.review(state, attempt["rating"], attempt_date(attempt))
+        return state
+
+    def state(self, entry: dict) -> dict:
+        """Current state of a problem with a non-empty history."""
+        history = entry["history"]
+        stored = entry.get("schedule")
+        if (
+            stored is not None
+            and stored.get("scheduler") == self.name
+            and stored.get("reviews") == len(history)
+        ):
+            return stored
+        return self.replay(history)
+
+    def record(self, entry: dict, rating: int, on: date) -> bool:
+        """
+        Add an attempt to `entry`, updating its stored state. An attempt dated
+        before the latest one (from `srl add --batch`) is inserted in date order
+        and the state replayed. Returns whether the problem is now mastered.
+        """
+        history = entry["history"]
+        attempt = {"rating": rating, "date": on.isoformat()}
+        if history and attempt_date(history[-1]) > on:
+            position = len(history)
+            while position and attempt_date(history[position - 1]) > on:
+                position -= 1
+            history.insert(position, attempt)
+            state = self.replay(history)
+        else:
+            state = self.state(entry) if history else None
+            history.append(attempt)
+            state = self.review(state, rating, on)
+        if self.stateful:
+            entry["schedule"] = state
+        return self.is_mastered(history, state)
+
+    def mastery_attempt(self, history: list[dict], state: dict) -> bool:
+        """Whether a 5 on the due date would master the problem (starred in `srl list`)."""
+        due = date.fromisoformat(state["due"])
+        attempt = {"rating": 5, "date": state["due"]}
+        return self.is_mastered(history + [attempt], self.review(state, 5, due))
+
+    def _state(self, on: date, interval: int, reviews: int, **fields) -> dict:
+        return {
+            "scheduler": self.name,
+            "due": (on + timedelta(days=interval)).isoformat(),
+            "last": on.isoformat(),
+            "interval": interval,
+            "reviews": reviews,
+            **fields,
+        }
+
+
+class DefaultScheduler(Scheduler):
+    """Due `rating` days after the last attempt; mastered after two 5s in a row."""
+
+    name = "default"
+    stateful = False
+
+    def review(self, state, rating, on):
+        return {"due": (on + timedelta(days=rating)).isoformat(), "rating": rating}
+
+    def replay(self, history):
+        # Only the last attempt matters
+        last = history[-1]
+        return self.review(None, last["rating"], attempt_date(last))
+
+    def state(self, entry):
+        return self.replay(entry["history"])
+
+    def is_mastered(self, history, state):
+        return len(history) >= 2 and history[-1]["rating"] == 5 and history[-2]["rating"] == 5
+
+    def mastery_attempt(self, history, state):
+        return state["rating"] == 5
+
+
+class SM2Scheduler(Scheduler):
+    """
+    SuperMemo 2, with the 1-5 rating as the response quality: 1 and 2 restart
+    the repetitions, 3-5 grow the interval by the problem's ease factor.
+    """
+
+    name = "sm2"
+
+    def review(self, state, rating, on):
+        ease = state["ease"] if state else 2.5
+        interval = state["interval"] if state else 0
+        repetitions = state["repetitions"] if state else 0
+        reviews = state["reviews"] if state else 0
+
+        if rating >= 3:
+            if repetitions == 0:
+                interval = 1
+            elif repetitions == 1:
+                interval = 6
+            else:
+                interval = round(interval * ease)
+            repetitions += 1
+        else:
+            repetitions = 0
+            interval = 1
+
+        miss = 5 - rating
+        ease = max(1.3, ease + 0.1 - miss * (0.08 + miss * 0.02))
+        return self._state(
+            on, interval, reviews + 1, ease=round(ease, 4), repetitions=repetitions
+        )
+
+    def is_mastered(self, history, state):
+        return state["interval"] >= MASTERY_INTERVAL
+
+
+class FSRSScheduler(Scheduler):
+    """
+    FSRS (v4.5 with its default weights) at 90% desired retention. Ratings map to
+    its grades as 1 Again, 2 Hard, 3 Good, 4 and 5 Easy. The state is the memory
+    stability (days until recall drops to 90%) and difficulty (1-10).
+    """
+
+    name = "fsrs"
+
+    W = (
+        0.4872, 1.4003, 3.7145, 13.8206, 5.1618, 1.2298, 0.8975, 0.031, 1.6474,
+        0.1367, 1.0461, 2.1072, 0.0793, 0.3246, 1.587, 0.2272, 2.8755,
+    )
+    DECAY = -0.5
+    FACTOR = 19 / 81
+    RETENTION = 0.9
+
+    def _initial_difficulty(self, grade: int) -> float:
+        return self.W[4] - (grade - 3) * self.W[5]
+
+    def review(self, state, rating, on):
+        w = self.W
+        grade = min(rating, 4)
+
+        if state is None:
+            stability = w[grade - 1]
+            difficulty = self._initial_difficulty(grade)
+            reviews = 0
+        else:
+            stability = state["stability"]
+            difficulty = state["difficulty"]
+            reviews = state["reviews"]
+            elapsed = max((on - date.fromisoformat(state["last"])).days, 0)
+            recall = (1 + self.FACTOR * elapsed / stability) ** self.DECAY
+
+            if grade == 1:
+                stability = (
+                    w[11]
+                    * difficulty ** -w[12]
+                    * ((stability + 1) ** w[13] - 1)
+                    * math.exp(w[14] * (1 - recall))
+                )
+            else:
+                hard = w[15] if grade == 2 else 1
+                easy = w[16] if grade == 4 else 1
+                stability *= 1 + (
+                    math.exp(w[8])
+                    * (11 - difficulty)
+                    * stability ** -w[9]
+                    * (math.exp(w[10] * (1 - recall)) - 1)
+                    * hard
+                    * easy
+                )
+
+            difficulty -= w[6] * (grade - 3)
+            # Mean reversion towards the difficulty of a first "Good"
+            difficulty = w[7] * self._initial_difficulty(3) + (1 - w[7]) * difficulty
+
+        difficulty = min(max(difficulty, 1), 10)
+        interval = stability / self.FACTOR * (self.RETENTION ** (1 / self.DECAY) - 1)
+        return self._state(
+            on,
+            max(1, round(interval)),
+            reviews + 1,
+            stability=round(stability, 4),
+            difficulty=round(difficulty, 4),
+        )
+
+    def is_mastered(self, history, state):
+        return state["interval"] >= MASTERY_INTERVAL
+
+
+SCHEDULERS = {
+    scheduler.name: scheduler
+    for scheduler in (DefaultScheduler(), SM2Scheduler(), FSRSScheduler())
+}
+
+
+def merge_history(history: list[dict], other: list[dict]):
+    """Add the attempts of `other` to `history`, keeping it in date order."""
+    history.extend(other)
+    history.sort(key=attempt_date)
+
+
+def get_scheduler(name: Optional[str] = None) -> Scheduler:
+    """Return the scheduler selected in config (or the one named explicitly)."""
+    return SCHEDULERS.get(name or scheduler_name(), SCHEDULERS[DEFAULT_SCHEDULER])
@@ -1,25 +1,107 @@
-from fastapi import FastAPI, HTTPException, APIRouter
-from fastapi.responses import JSONResponse
-from pydantic import BaseModel
+from fastapi import FastAPI, HTTPException, APIRouter, Query, Request
+from fastapi.responses import JSONResponse, PlainTextResponse
+from pydantic import BaseModel, Field
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+import asyncio
+import contextvars
+import datetime
 import shlex
 import io
-from rich.console import Console
+import time
 from srl.cli import build_parser
-from srl.storage import ensure_data_dir
+from srl.commands.add import record_identified_attempt
+from srl.commands.calendar import get_all_date_counts
+from srl.commands.forecast import get_forecast
+from srl.commands.history import get_history
+from srl.commands.inprogress import get_in_progress
+from srl.commands.list_ import get_due_details
+from srl.commands.mastered import get_mastered_problems
+from srl.commands.nextup import get_next_up_problems, queue_problem, ADDED
+from srl.utils import today
+from srl import metrics, storage, timing
+from srl.memory_backend import MemoryBackend, FLUSH_DELAY
+from srl.storage import ensure_data_dir, get_backend, use_backend
 import uvicorn
-from typing import Optional, List
+from typing import Dict, List, Optional
 
 router = APIRouter()
+# JSON endpoints that return data directly instead of rendered console text
+api = APIRouter()
 parser = None
 
+# Handlers run concurrently on this many worker threads
+DEFAULT_WORKERS = 4
+# Seconds a request may wait and run before it is answered with a timeout
+DEFAULT_TIMEOUT = 30.0
+
+REQUESTS = metrics.Counter(
+    "srl_http_requests_total", "HTTP requests answered", ("method", "path", "status")
+)
+REQUEST_SECONDS = metrics.Histogram(
+    "srl_http_request_duration_seconds", "Time to answer HTTP requests", ("method", "path")
+)
+COMMAND_SECONDS = metrics.Histogram(
+    "srl_command_duration_seconds", "Time to run commands sent to /run", ("command",)
+)
+
+
+def collection_sizes() -> dict:
+    return {
+        (collection,): len(storage.view_json(file_path))
+        for collection, file_path in (
+            ("in_progress", storage.PROGRESS_FILE),
+            ("mastered", storage.MASTERED_FILE),
+            ("next_up", storage.NEXT_UP_FILE),
+        )
+    }
+
+
+def data_size() -> dict:
+    data_dir = storage.PROGRESS_FILE.parent
+    if not data_dir.exists():
+        return {(): 0}
+    return {(): sum(path.stat().st_size for path in data_dir.iterdir() if path.is_file())}
+
+
+def pending_writes() -> dict:
+    pending = getattr(storage.get_backend(), "pending", None)
+    return {(): pending() if pending else 0}
+
+
+metrics.Gauge("srl_problems", "Problems per collection", ("collection",), collect=collection_sizes)
+metrics.Gauge("srl_data_bytes", "Size of the files in the data directory", collect=data_size)
+metrics.Gauge("srl_pending_writes", "Changed documents not yet written to disk", collect=pending_writes)
+
 
 class RunRequest(BaseModel):
     argv: Optional[List[str]] = None
     cmd: Optional[str] = None
 
 
+async def run_blocking(app: FastAPI, fn, *args):
+    """
+    Run `fn` on the app's worker pool so slow handlers don't block the event loop.
+    At most `workers` calls run at once; raises asyncio.TimeoutError when the call
+    has not finished within the app's timeout (the worker still runs to completion).
+    The call runs in the request's context and its time is charged to compute.
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + app.state.timeout
+    limiter = app.state.limiter
+
+    await asyncio.wait_for(limiter.acquire(), app.state.timeout)
+    context = contextvars.copy_context()
+    future = loop.run_in_executor(app.state.pool, context.run, timing.call, "compute", fn, *args)
+    # The slot is freed when the worker finishes, not when the client gives up
+    future.add_done_callback(lambda _: limiter.release())
+    return await asyncio.wait_for(
+        asyncio.shield(future), max(0.0, deadline - loop.time())
+    )
+
+
 @router.post("/run")
-async def run(req: RunRequest):
+async def run(req: RunRequest, request: Request):
     argv = req.argv
     if req.cmd and not argv:
         argv = shlex.split(req.cmd)
@@ -48,13 +130,21 @@ async def run(req: RunRequest):
                 },
             )
 
-        console = Console(record=True)
+        console = timing.console(record=True)
 
         if hasattr(args, "handler"):
+            start = time.perf_counter()
             try:
-                result = args.handler(args, console)
+                result = await run_blocking(request.app, args.handler, args, console)
                 if hasattr(result, "__await__"):
                     await result
+            except asyncio.TimeoutError:
+                return JSONResponse(
+                    status_code=504,
+                    content={
+                        "error": "Command timed out",
+                    },
+                )
             except Exception:
                 return JSONResponse(
                     status_code=500,
@@ -62,6 +152,10 @@ async def run(req: RunRequest):
                         "error": "Error executing handler",
                     },
                 )
+            finally:
+                COMMAND_SECONDS.observe(
+                    time.perf_counter() - start, getattr(args, "command", None) or "other"
+                )
         else:
             buf = io.StringIO()
             parser.print_help(file=buf)
@@ -81,12 +175,243 @@ async def run(req: RunRequest):
         )
 
 
-def create_app() -> FastAPI:
-    app = FastAPI(title="srl CLI HTTP API")
+class Problem(BaseModel):
+    name: str
+    url: Optional[str] = None
+
+
+class DueProblem(Problem):
+    mastery_attempt: bool = False
+
+
+class DueResponse(BaseModel):
+    date: str
+    problems: List[DueProblem]
+
+
+class ProblemsResponse(BaseModel):
+    problems: List[Problem]
+
+
+class MasteredProblem(Problem):
+    attempts: int
+    mastered_date: str
+
+
+class MasteredResponse(BaseModel):
+    problems: List[MasteredProblem]
+
+
+class HistoryEntry(BaseModel):
+    date: str
+    problem: str
+    rating: int
+    status: str
+    url: Optional[str] = None
+
+
+class HistoryResponse(BaseModel):
+    entries: List[HistoryEntry]
+
+
+class CalendarResponse(BaseModel):
+    counts: Dict[str, int]
+
+
+class ForecastDay(BaseModel):
+    date: str
+    due: int
+
+
+class ForecastResponse(BaseModel):
+    days: List[ForecastDay]
+
+
+class AttemptRequest(BaseModel):
+    name: str
+    rating: int = Field(ge=1, le=5)
+    url: Optional[str] = None
+
+
+class AttemptResponse(BaseModel):
+    name: str
+    rating: int
+    mastered: bool
+
+
+class NextUpRequest(BaseModel):
+    name: str
+    allow_mastered: bool = False
+
+
+class NextUpResponse(BaseModel):
+    name: str
+    status: str
+
+
+async def call(request: Request, fn, *args):
+    """run_blocking for the JSON endpoints, with a timeout mapped to a 504."""
+    try:
+        return await run_blocking(request.app, fn, *args)
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=504, detail="Request timed out")
+
+
+@api.get("/due", response_model=DueResponse)
+async def due(request: Request, limit: Optional[int] = None):
+    problems = await call(request, get_due_details, limit)
+    return DueResponse(
+        date=today().isoformat(),
+        problems=[
+            DueProblem(name=name, url=url, mastery_attempt=mastery)
+            for name, url, mastery in problems
+        ],
+    )
+
+
+@api.get("/inprogress", response_model=ProblemsResponse)
+async def inprogress(request: Request):
+    problems = await call(request, get_in_progress)
+    return ProblemsResponse(
+        problems=[Problem(name=name, url=url) for name, url in problems]
+    )
+
+
+@api.get("/mastered", response_model=MasteredResponse)
+async def mastered(request: Request):
+    problems = await call(request, get_mastered_problems)
+    return MasteredResponse(
+        problems=[
+            MasteredProblem(name=name, attempts=attempts, mastered_date=date, url=url)
+            for name, attempts, date, url in problems
+        ]
+    )
+
+
+@api.get("/history", response_model=HistoryResponse)
+async def history(
+    request: Request,
+    limit: int = 20,
+    since: Optional[datetime.date] = None,
+    until: Optional[datetime.date] = None,
+    problem: Optional[str] = None,
+):
+    entries = await call(
+        request,
+        get_history,
+        limit,
+        since and since.isoformat(),
+        until and until.isoformat(),
+        problem,
+    )
+    return HistoryResponse(entries=[HistoryEntry(**entry) for entry in entries])
+
+
+@api.get("/calendar", response_model=CalendarResponse)
+async def calendar(request: Request):
+    counts = await call(request, get_all_date_counts)
+    return CalendarResponse(counts=dict(counts))
+
+
+@api.get("/forecast", response_model=ForecastResponse)
+async def forecast(
+    request: Request,
+    days: int = Query(14, ge=1, le=3650),
+    rating: Optional[int] = Query(None, ge=1, le=5),
+):
+    counts = await call(request, get_forecast, days, rating)
+    return ForecastResponse(days=[ForecastDay(date=day, due=due) for day, due in counts])
+
+
+@api.get("/nextup", response_model=ProblemsResponse)
+async def nextup(request: Request):
+    problems = await call(request, get_next_up_problems)
+    return ProblemsResponse(
+        problems=[Problem(name=name, url=url) for name, url in problems]
+    )
+
+
+@api.post("/attempts", response_model=AttemptResponse, status_code=201)
+async def add_attempt(req: AttemptRequest, request: Request):
+    # `name` may also be a LeetCode URL or a due list number, as for `srl add`
+    name, mastered = await call(request, record_identified_attempt, req.name, req.rating, req.url)
+    if name is None:
+        raise HTTPException(status_code=400, detail=f"Unknown problem: {req.name}")
+    return AttemptResponse(name=name, rating=req.rating, mastered=mastered)
+
+
+@api.post("/nextup", response_model=NextUpResponse, status_code=201)
+async def add_nextup(req: NextUpRequest, request: Request):
+    name, status = await call(request, queue_problem, req.name, req.allow_mastered)
+    if status not in ADDED:
+        # Already queued, in progress or mastered, or an unrecognized URL
+        return JSONResponse(
+            status_code=409 if status != "invalid_url" else 400,
+            content={"name": name, "status": status},
+        )
+    return NextUpResponse(name=name, status=status)
+
+
+@api.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics(request: Request):
+    """Counters, histograms and sizes in the Prometheus text format."""
+    text = await call(request, metrics.render)
+    return PlainTextResponse(text, media_type="text/plain; version=0.0.4")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Serve requests from memory while the app runs; flush changes on shutdown."""
+    ensure_data_dir()
+    engine = MemoryBackend(get_backend(), delay=app.state.flush_delay)
+    app.state.engine = engine
+    use_backend(engine)
+    try:
+        yield
+    finally:
+        # Let running handlers finish before the last flush
+        app.state.pool.shutdown(wait=True)
+        use_backend(None)
+        engine.close()
+
+
+def create_app(
+    flush_delay: float = FLUSH_DELAY,
+    workers: int = DEFAULT_WORKERS,
+    timeout: float = DEFAULT_TIMEOUT,
+) -> FastAPI:
+    app = FastAPI(title="srl CLI HTTP API", lifespan=lifespan)
+    app.state.flush_delay = flush_delay
+    app.state.timeout = timeout
+    app.state.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="srl-handler")
+    app.state.limiter = asyncio.Semaphore(workers)
     app.include_router(router)
+    app.include_router(api)
+    # Requests for other paths share one label, so they can't grow the metrics
+    paths = {route.path for route in router.routes + api.routes}
+
+    @app.middleware("http")
+    async def instrument(request: Request, call_next):
+        # Phases of the request's handler, for the browser's or client's timing view
+        with timing.record() as timings:
+            response = await call_next(request)
+        response.headers["Server-Timing"] = timings.server_timing()
+
+        path = request.url.path if request.url.path in paths else "other"
+        REQUESTS.inc(request.method, path, str(response.status_code))
+        REQUEST_SECONDS.observe(timings.total, request.method, path)
+        return response
+
     return app
 
 
-def run_server(host: str = "127.0.0.1", port: int = 8080, reload: bool = False):
-    app = create_app()
+def run_server(
+    host: str = "127.0.0.1",
+    port: int = 8080,
+    reload: bool = False,
+    flush_delay: float = FLUSH_DELAY,
+    workers: int = DEFAULT_WORKERS,
+    timeout: float = DEFAULT_TIMEOUT,
+):
+    app = create_app(flush_delay=flush_delay, workers=workers, timeout=timeout)
     uvicorn.run(app, host=host, port=port, reload=reload)
@@ -0,0 +1,443 @@
+from pathlib import Path
+from collections import Counter
+from contextlib import contextmanager
+from typing import Iterator, Optional
+import sqlite3
+import threading
+from srl import codec, storage, timing
+from srl.storage import StorageBackend
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS problems (
+    status TEXT NOT NULL,
+    name TEXT NOT NULL,
+    url TEXT,
+    extra TEXT,
+    key TEXT,
+    PRIMARY KEY (status, name)
+);
+CREATE INDEX IF NOT EXISTS idx_problems_name ON problems (status, name COLLATE NOCASE);
+
+CREATE TABLE IF NOT EXISTS attempts (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    status TEXT NOT NULL,
+    name TEXT NOT NULL,
+    date TEXT NOT NULL,
+    rating INTEGER NOT NULL,
+    extra TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_attempts_name ON attempts (status, name, id);
+CREATE INDEX IF NOT EXISTS idx_attempts_date ON attempts (status, date);
+
+CREATE TABLE IF NOT EXISTS next_up (
+    name TEXT PRIMARY KEY,
+    data TEXT NOT NULL,
+    key TEXT
+);
+
+CREATE TABLE IF NOT EXISTS audit (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    date TEXT NOT NULL,
+    problem TEXT NOT NULL,
+    result TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_audit_date ON audit (date);
+
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+# Indexes on the normalized names (storage.name_key), created once the column
+# exists in databases from before it was added
+KEY_INDEXES = """
+CREATE INDEX IF NOT EXISTS idx_problems_key ON problems (status, key);
+CREATE INDEX IF NOT EXISTS idx_next_up_key ON next_up (key);
+"""
+
+# Documents stored in the problems/attempts tables, keyed by status
+PROBLEM_DOCUMENTS = ("progress", "mastered")
+
+
+def _split(data: dict, known: tuple[str, ...]) -> Optional[str]:
+    """Serialize the keys of `data` that have no dedicated column."""
+    extra = {k: v for k, v in data.items() if k not in known}
+    return codec.dumps_text(extra) if extra else None
+
+
+class SqliteBackend(StorageBackend):
+    """
+    Stores problems, attempts, the next up queue and audits in a single SQLite database.
+
+    Entry-level operations and queries only touch the rows they need, so recording an
+    attempt no longer rewrites the whole collection.
+    """
+
+    name = "sqlite"
+
+    def __init__(self, db_path: Optional[Path] = None):
+        self.db_path = db_path or storage.DB_FILE
+        self._local = threading.local()
+
+    def connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path)
+            conn.executescript(SCHEMA)
+            for table in ("problems", "next_up"):
+                self._add_key_column(conn, table)
+            conn.executescript(KEY_INDEXES)
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def _add_key_column(conn: sqlite3.Connection, table: str):
+        columns = [row[1] for row in conn.execute(f"PRAGMA table_info({table})")]
+        if "key" in columns:
+            return
+        with conn:
+            conn.execute(f"ALTER TABLE {table} ADD COLUMN key TEXT")
+            conn.executemany(
+                f"UPDATE {table} SET key = ? WHERE rowid = ?",
+                [
+                    (storage.name_key(name), rowid)
+                    for rowid, name in conn.execute(f"SELECT rowid, name FROM {table}").fetchall()
+                ],
+            )
+
+    @contextmanager
+    def transaction(self):
+        conn = self.connect()
+        depth = getattr(self._local, "depth", 0)
+        self._local.depth = depth + 1
+        try:
+            yield
+        except BaseException:
+            if depth == 0:
+                conn.rollback()
+            raise
+        else:
+            if depth == 0:
+                with timing.phase("save"):
+                    conn.commit()
+        finally:
+            self._local.depth = depth
+
+    def _status(self, file_path: Path) -> str:
+        doc = storage.document_name(file_path)
+        if doc not in PROBLEM_DOCUMENTS:
+            raise ValueError(f"{file_path} does not hold problem entries")
+        return doc
+
+    # Whole-document access
+
+    def load(self, file_path: Path) -> dict:
+        doc = storage.document_name(file_path)
+        if doc in PROBLEM_DOCUMENTS:
+            return self._load_problems(doc)
+        if doc == "next_up":
+            return self._load_next_up()
+        if doc == "audit":
+            return self._load_audit()
+        raise ValueError(f"{file_path} is not stored in SQLite")
+
+    def save(self, file_path: Path, data: dict):
+        doc = storage.document_name(file_path)
+        conn = self.connect()
+        with self.transaction():
+            if doc in PROBLEM_DOCUMENTS:
+                self._save_problems(conn, doc, data)
+            elif doc == "next_up":
+                self._save_next_up(conn, data)
+            elif doc == "audit":
+                self._save_audit(conn, data)
+            else:
+                raise ValueError(f"{file_path} is not stored in SQLite")
+            self._bump(conn, doc)
+
+    def signature(self, file_path: Path):
+        row = self.connect().execute(
+            "SELECT value FROM meta WHERE key = ?",
+            (f"version:{storage.document_name(file_path)}",),
+        ).fetchone()
+        return int(row[0]) if row else 0
+
+    @staticmethod
+    def _bump(conn: sqlite3.Connection, doc: str):
+        conn.execute(
+            """
+            INSERT INTO meta (key, value) VALUES (?, 1)
+            ON CONFLICT (key) DO UPDATE SET value = value + 1
+            """,
+            (f"version:{doc}",),
+        )
+
+    def _load_problems(self, status: str) -> dict:
+        conn = self.connect()
+        data = {}
+        for name, url, extra in conn.execute(
+            "SELECT name, url, extra FROM problems WHERE status = ? ORDER BY rowid",
+            (status,),
+        ):
+            data[name] = self._entry(url, extra, [])
+
+        for name, date, rating, extra in conn.execute(
+            "SELECT name, date, rating, extra FROM attempts WHERE status = ? ORDER BY id",
+            (status,),
+        ):
+            if name in data:
+                data[name]["history"].append(self._attempt(date, rating, extra))
+        return data
+
+    def _save_problems(self, conn: sqlite3.Connection, status: str, data: dict):
+        current = self._load_problems(status)
+        for name in current.keys() - data.keys():
+            self._delete(conn, status, name)
+        for name, entry in data.items():
+            old = current.get(name)
+            if old != entry:
+                self._write(conn, status, name, entry, old)
+
+    def _load_next_up(self) -> dict:
+        rows = self.connect().execute("SELECT name, data FROM next_up ORDER BY rowid")
+        return {name: codec.loads(data) for name, data in rows}
+
+    def _save_next_up(self, conn: sqlite3.Connection, data: dict):
+        conn.execute("DELETE FROM next_up")
+        conn.executemany(
+            "INSERT INTO next_up (name, data, key) VALUES (?, ?, ?)",
+            [(name, codec.dumps_text(info), storage.name_key(name)) for name, info in data.items()],
+        )
+
+    def _load_audit(self) -> dict:
+        conn = self.connect()
+        data = {}
+        row = conn.execute("SELECT value FROM meta WHERE key = 'current_audit'").fetchone()
+        if row:
+            data["current_audit"] = row[0]
+        history = [
+            {"date": date, "problem": problem, "result": result}
+            for date, problem, result in conn.execute(
+                "SELECT date, problem, result FROM audit ORDER BY id"
+            )
+        ]
+        if history:
+            data["history"] = history
+        return data
+
+    def _save_audit(self, conn: sqlite3.Connection, data: dict):
+        current = self._load_audit().get("history", [])
+        history = data.get("history", [])
+        if history[: len(current)] != current:
+            conn.execute("DELETE FROM audit")
+            current = []
+        conn.executemany(
+            "INSERT INTO audit (date, problem, result) VALUES (?, ?, ?)",
+            [(r["date"], r["problem"], r["result"]) for r in history[len(current):]],
+        )
+
+        if "current_audit" in data:
+            conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('current_audit', ?)",
+                (data["current_audit"],),
+            )
+        else:
+            conn.execute("DELETE FROM meta WHERE key = 'current_audit'")
+
+    # Row helpers
+
+    @staticmethod
+    def _entry(url: Optional[str], extra: Optional[str], history: list) -> dict:
+        entry = {"history": history}
+        if url:
+            entry["url"] = url
+        if extra:
+            entry.update(codec.loads(extra))
+        return entry
+
+    @staticmethod
+    def _attempt(date: str, rating: int, extra: Optional[str]) -> dict:
+        attempt = {"rating": rating, "date": date}
+        if extra:
+            attempt.update(codec.loads(extra))
+        return attempt
+
+    def _write(self, conn: sqlite3.Connection, status: str, name: str, entry: dict, old: Optional[dict]):
+        conn.execute(
+            """
+            INSERT INTO problems (status, name, url, extra, key) VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT (status, name) DO UPDATE SET url = excluded.url, extra = excluded.extra
+            """,
+            (status, name, entry.get("url"), _split(entry, ("history", "url")), storage.name_key(name)),
+        )
+
+        history = entry.get("history", [])
+        old_history = old.get("history", []) if old else []
+        if history[: len(old_history)] == old_history:
+            # Only the new attempts need to be appended
+            new_attempts = history[len(old_history):]
+        else:
+            conn.execute("DELETE FROM attempts WHERE status = ? AND name = ?", (status, name))
+            new_attempts = history
+
+        conn.executemany(
+            "INSERT INTO attempts (status, name, date, rating, extra) VALUES (?, ?, ?, ?, ?)",
+            [
+                (status, name, a["date"], a["rating"], _split(a, ("date", "rating")))
+                for a in new_attempts
+            ],
+        )
+
+    @staticmethod
+    def _delete(conn: sqlite3.Connection, status: str, name: str) -> bool:
+        cur = conn.execute("DELETE FROM problems WHERE status = ? AND name = ?", (status, name))
+        conn.execute("DELETE FROM attempts WHERE status = ? AND name = ?", (status, name))
+        return cur.rowcount > 0
+
+    # Entry-level access
+
+    def get_entry(self, file_path: Path, name: str) -> Optional[dict]:
+        if storage.document_name(file_path) not in PROBLEM_DOCUMENTS:
+            return super().get_entry(file_path, name)
+
+        status = self._status(file_path)
+        conn = self.connect()
+        row = conn.execute(
+            "SELECT url, extra FROM problems WHERE status = ? AND name = ?",
+            (status, name),
+        ).fetchone()
+        if row is None:
+            return None
+
+        history = [
+            self._attempt(date, rating, extra)
+            for date, rating, extra in conn.execute(
+                "SELECT date, rating, extra FROM attempts WHERE status = ? AND name = ? ORDER BY id",
+                (status, name),
+            )
+        ]
+        return self._entry(row[0], row[1], history)
+
+    def find_name(self, file_path: Path, name: str) -> Optional[str]:
+        doc = storage.document_name(file_path)
+        if doc in PROBLEM_DOCUMENTS:
+            table, where, params = "problems", "status = ? AND ", (doc,)
+        elif doc == "next_up":
+            table, where, params = "next_up", "", ()
+        else:
+            return super().find_name(file_path, name)
+
+        conn = self.connect()
+        row = conn.execute(
+            f"SELECT name FROM {table} WHERE {where}name = ?", params + (name,)
+        ).fetchone() or conn.execute(
+            f"SELECT name FROM {table} WHERE {where}key = ? ORDER BY rowid LIMIT 1",
+            params + (storage.name_key(name),),
+        ).fetchone()
+        return row[0] if row else None
+
+    def put_entry(self, file_path: Path, name: str, entry: dict):
+        if storage.document_name(file_path) not in PROBLEM_DOCUMENTS:
+            return super().put_entry(file_path, name, entry)
+
+        old = self.get_entry(file_path, name)
+        status = self._status(file_path)
+        conn = self.connect()
+        with self.transaction():
+            self._write(conn, status, name, entry, old)
+            self._bump(conn, status)
+
+    def delete_entry(self, file_path: Path, name: str) -> bool:
+        doc = storage.document_name(file_path)
+        conn = self.connect()
+        with self.transaction():
+            if doc == "next_up":
+                deleted = conn.execute("DELETE FROM next_up WHERE name = ?", (name,)).rowcount > 0
+            elif doc in PROBLEM_DOCUMENTS:
+                deleted = self._delete(conn, doc, name)
+            else:
+                return super().delete_entry(file_path, name)
+            if deleted:
+                self._bump(conn, doc)
+        return deleted
+
+    # Queries
+
+    def first_names(self, file_path: Path, n: int) -> list[str]:
+        doc = storage.document_name(file_path)
+        if doc == "next_up":
+            sql, params = "SELECT name FROM next_up ORDER BY rowid LIMIT ?", ()
+        elif doc in PROBLEM_DOCUMENTS:
+            sql, params = "SELECT name FROM problems WHERE status = ? ORDER BY rowid LIMIT ?", (doc,)
+        else:
+            return super().first_names(file_path, n)
+        return [name for (name,) in self.connect().execute(sql, params + (max(n, 0),))]
+
+    def last_attempts(self, file_path: Path) -> Iterator[tuple[str, dict]]:
+        rows = self.connect().execute(
+            """
+            SELECT a.name, a.date, a.rating, a.extra
+            FROM problems p
+            JOIN attempts a ON a.id = (
+                SELECT MAX(id) FROM attempts WHERE status = p.status AND name = p.name
+            )
+            WHERE p.status = ?
+            ORDER BY p.rowid
+            """,
+            (self._status(file_path),),
+        )
+        for name, date, rating, extra in rows:
+            yield name, self._attempt(date, rating, extra)
+
+    def recent_attempts(
+        self,
+        file_path: Path,
+        limit: int,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        problem: Optional[str] = None,
+    ) -> list[tuple[int, str, dict, Optional[str]]]:
+        where = ["a.status = ?"]
+        params = [self._status(file_path)]
+        # Dates may carry a time; compare their date part as the JSON backend does
+        if since is not None:
+            where.append("substr(a.date, 1, 10) >= ?")
+            params.append(since)
+        if until is not None:
+            where.append("substr(a.date, 1, 10) <= ?")
+            params.append(until)
+        if problem is not None:
+            where.append("p.key = ?")
+            params.append(storage.name_key(problem))
+
+        rows = self.connect().execute(
+            f"""
+            SELECT a.id, a.name, a.date, a.rating, a.extra, p.url
+            FROM attempts a
+            JOIN problems p ON p.status = a.status AND p.name = a.name
+            WHERE {" AND ".join(where)}
+            ORDER BY a.date DESC, a.id DESC
+            LIMIT ?
+            """,
+            (*params, max(limit, 0)),
+        )
+        return [
+            (seq, name, self._attempt(date, rating, extra), url)
+            for seq, name, date, rating, extra, url in rows
+        ]
+
+    def attempt_dates(self, file_path: Path) -> list[str]:
+        rows = self.connect().execute(
+            "SELECT date FROM attempts WHERE status = ? ORDER BY id",
+            (self._status(file_path),),
+        )
+        return [date for (date,) in rows if date]
+
+    def date_counts(self, file_path: Path) -> Counter[str]:
+        rows = self.connect().execute(
+            "SELECT date, COUNT(*) FROM attempts WHERE status = ? GROUP BY date",
+            (self._status(file_path),),
+        )
+        return Counter({date: count for date, count in rows if date})
+
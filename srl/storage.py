@@ -1,5 +1,23 @@
 from pathlib import Path
-import json
+from collections import Counter
+from contextlib import contextmanager
+from typing import Iterator, Optional
+import heapq
+import importlib
+import itertools
+import marshal
+import os
+import re
+import stat
+import tempfile
+import threading
+import time
+from srl import codec, metrics, timing
+
+try:
+    import fcntl
+except ImportError:  # Windows: locking between processes is not available
+    fcntl = None
 
 DATA_DIR = Path.home() / ".srl"
 PROGRESS_FILE = DATA_DIR / "problems_in_progress.json"
@@ -7,19 +25,776 @@ MASTERED_FILE = DATA_DIR / "problems_mastered.json"
 NEXT_UP_FILE = DATA_DIR / "next_up.json"
 AUDIT_FILE = DATA_DIR / "audit.json"
 CONFIG_FILE = DATA_DIR / "config.json"
+DB_FILE = DATA_DIR / "srl.db"
+DUE_INDEX_FILE = DATA_DIR / "due_index.json"
+DUE_INDEX_LOG_FILE = DATA_DIR / "due_index.log"
+EVENT_LOG_FILE = DATA_DIR / "events.log"
+SNAPSHOT_FILE = DATA_DIR / "snapshot.json"
+JOURNAL_FILE = DATA_DIR / "transaction.json"
+LOCK_FILE = DATA_DIR / "srl.lock"
+DAEMON_SOCKET = DATA_DIR / "srl.sock"
+ACTIVITY_FILE = DATA_DIR / "activity.json"
+
+# Applied to new data files; it can only be read by setting it, so once here
+_UMASK = os.umask(0o022)
+os.umask(_UMASK)
+
+DEFAULT_BACKEND = "json"
+DEFAULT_SCHEDULER = "default"
+
+JSON_FORMATS = ("compact", "pretty")
+DEFAULT_JSON_FORMAT = "compact"
+BACKENDS = {
+    "json": "srl.storage:JsonBackend",
+    "sqlite": "srl.sqlite_backend:SqliteBackend",
+    "eventlog": "srl.eventlog_backend:EventLogBackend",
+}
+
+# A file modified within this long after a cached read may share its timestamp
+# with the cached version; such entries are confirmed against the raw bytes
+RACY_WINDOW_NS = 2_000_000_000
+
+_backends = {}
+_override = None
+_local = threading.local()
+_cache = {}
+_names = {}
+_thread_lock = threading.Lock()
+
+_LEETCODE_SLUG = re.compile(r"leetcode\.com/problems/([^/]+)")
+_SEPARATORS = re.compile(r"[\s_-]+")
 
 
 def ensure_data_dir():
     DATA_DIR.mkdir(parents=True, exist_ok=True)
+    recover_transaction()
 
 
-def load_json(file_path: Path) -> dict:
-    if not file_path.exists():
+def document_name(file_path: Path) -> Optional[str]:
+    """
+    Map a data file path to the logical document it holds.
+    Returns None for files that are not managed by a storage backend (e.g. config).
+    """
+    documents = {
+        PROGRESS_FILE: "progress",
+        MASTERED_FILE: "mastered",
+        NEXT_UP_FILE: "next_up",
+        AUDIT_FILE: "audit",
+    }
+    return documents.get(file_path)
+
+
+def clone_json(data):
+    """Fast deep copy for JSON-shaped data."""
+    return marshal.loads(marshal.dumps(data))
+
+
+def _file_key(file_path: Path):
+    try:
+        st = os.stat(file_path)
+    except FileNotFoundError:
+        return None
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+
+def _remember(file_path: Path, key, raw: bytes, data):
+    clean = time.time_ns() - key[0] > RACY_WINDOW_NS
+    _cache[file_path] = (key, None if clean else raw, data)
+
+
+def view_json_file(file_path: Path) -> dict:
+    """
+    Parsed content of a JSON file, shared with other readers: do not mutate it.
+
+    Parses are cached per process and reused while the file's mtime, size and
+    inode are unchanged, so a repeated read costs a stat() instead of a parse.
+    """
+    key = _file_key(file_path)
+    if key is None:
+        _cache.pop(file_path, None)
         return {}
-    with open(file_path, "r") as f:
-        return json.load(f)
+
+    cached = _cache.get(file_path)
+    if cached is not None and cached[0] == key and cached[1] is None:
+        metrics.cache("parse", hit=True)
+        return cached[2]
+
+    with timing.phase("load"):
+        start = time.perf_counter()
+        raw = file_path.read_bytes()
+        timing.count(len(raw))
+        if cached is not None and cached[0] == key and raw == cached[1]:
+            metrics.cache("parse", hit=True)
+            _remember(file_path, key, raw, cached[2])
+            return cached[2]
+        data = codec.loads(raw)
+        metrics.cache("parse", hit=False)
+        metrics.storage_read(len(raw), time.perf_counter() - start)
+    _remember(file_path, key, raw, data)
+    return data
+
+
+def read_json_file(file_path: Path) -> dict:
+    """Private copy of a JSON file's content that the caller may modify."""
+    return clone_json(view_json_file(file_path))
+
+
+def invalidate(file_path: Optional[Path] = None):
+    """Forget cached parses of `file_path`, or of every file."""
+    if file_path is None:
+        _cache.clear()
+    else:
+        _cache.pop(file_path, None)
+
+
+def _written(file_path: Path, raw: bytes, data: dict):
+    key = _file_key(file_path)
+    if key is not None:
+        _remember(file_path, key, raw, clone_json(data))
+
+
+def _mode(file_path: Path) -> int:
+    """Permissions for a new version of `file_path`: those of the file it replaces."""
+    try:
+        return stat.S_IMODE(os.stat(file_path).st_mode)
+    except FileNotFoundError:
+        return 0o666 & ~_UMASK
+
+
+def _write_temp(file_path: Path, raw: bytes) -> str:
+    """Write `raw` to a synced temp file next to `file_path` and return its path."""
+    fd, tmp = tempfile.mkstemp(
+        dir=file_path.parent, prefix=f".{file_path.name}.", suffix=".tmp"
+    )
+    try:
+        # mkstemp creates files readable by their owner only
+        os.chmod(tmp, _mode(file_path))
+        with os.fdopen(fd, "wb") as f:
+            f.write(raw)
+            f.flush()
+            os.fsync(f.fileno())
+    except BaseException:
+        os.unlink(tmp)
+        raise
+    return tmp
+
+
+def json_format() -> str:
+    """How data files are written: "compact" (the default) or "pretty" (indented)."""
+    return view_json_file(CONFIG_FILE).get("json_format", DEFAULT_JSON_FORMAT)
+
+
+def _encode(data: dict) -> bytes:
+    return codec.dumps(data, pretty=json_format() == "pretty")
+
+
+def _sync_dir(directory: Path):
+    """Persist renames in `directory` (not supported on every platform)."""
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def write_file(file_path: Path, raw: bytes):
+    """
+    Crash-safe write: `raw` goes to a temp file in the same directory, is
+    fsynced, then atomically replaces the target, keeping its permissions.
+    Readers see either the old or the new content, never a truncated file.
+    """
+    tmp = _write_temp(file_path, raw)
+    os.replace(tmp, file_path)
+    _sync_dir(file_path.parent)
+
+
+def write_json_file(file_path: Path, data: dict):
+    """Crash-safe write of `data` as JSON (see write_file)."""
+    with timing.phase("save"):
+        start = time.perf_counter()
+        raw = _encode(data)
+        timing.count(len(raw))
+        write_file(file_path, raw)
+        metrics.storage_write(len(raw), time.perf_counter() - start)
+    _written(file_path, raw, data)
+
+
+def write_json_files(files: dict[Path, dict]):
+    """
+    Replace several JSON files as one unit.
+
+    Every file is written to a synced temp file first. A journal listing the
+    pending renames is then committed atomically; once it exists the
+    transaction is durable and `recover_transaction` rolls it forward if the
+    process dies before all renames are done.
+    """
+    if not files:
+        return
+    if len(files) == 1:
+        [(file_path, data)] = files.items()
+        write_json_file(file_path, data)
+        return
+
+    renames = []
+    with timing.phase("save"):
+        start = time.perf_counter()
+        encoded = {file_path: _encode(data) for file_path, data in files.items()}
+        nbytes = sum(map(len, encoded.values()))
+        timing.count(nbytes)
+        try:
+            for file_path, raw in encoded.items():
+                renames.append([_write_temp(file_path, raw), str(file_path)])
+        except BaseException:
+            for tmp, _ in renames:
+                os.unlink(tmp)
+            raise
+
+        # Held until the journal is gone, so recover_transaction never replays it
+        with data_lock():
+            write_json_file(JOURNAL_FILE, {"renames": renames})
+            _apply_journal(renames)
+        metrics.storage_write(nbytes, time.perf_counter() - start, files=len(encoded))
+    for file_path, raw in encoded.items():
+        _written(file_path, raw, files[file_path])
+
+
+def _apply_journal(renames: list):
+    for tmp, target in renames:
+        if os.path.exists(tmp):
+            os.replace(tmp, target)
+        invalidate(Path(target))
+    for directory in {Path(target).parent for _, target in renames}:
+        _sync_dir(directory)
+    JOURNAL_FILE.unlink(missing_ok=True)
+
+
+def recover_transaction():
+    """
+    Finish a multi-file commit interrupted after its journal was written.
+
+    A journal also exists while a commit is in progress, so it is only read and
+    replayed under `data_lock`: once the lock is ours, a journal still present
+    was left by a writer that died.
+    """
+    if not JOURNAL_FILE.exists():
+        # Nothing to recover; a commit starting now holds the lock throughout
+        return
+    with data_lock():
+        if JOURNAL_FILE.exists():
+            _apply_journal(read_json_file(JOURNAL_FILE).get("renames", []))
+
+
+class StorageBackend:
+    """
+    Base class for storage engines.
+
+    Documents are addressed by their JSON file path (PROGRESS_FILE, MASTERED_FILE, ...)
+    so commands stay agnostic of the engine. Subclasses must implement `load` and
+    `save`; the entry-level and query helpers fall back to whole-document access
+    and can be overridden by engines that can answer them more cheaply.
+    """
+
+    name = ""
+    # Whether derived indexes should be persisted next to the data
+    persistent = True
+
+    def load(self, file_path: Path) -> dict:
+        raise NotImplementedError
+
+    def save(self, file_path: Path, data: dict):
+        raise NotImplementedError
+
+    def view(self, file_path: Path) -> dict:
+        """Document for read-only use; engines may hand out shared state."""
+        return self.load(file_path)
+
+    @contextmanager
+    def transaction(self):
+        """Commit every write made inside the block together, or none of them."""
+        yield
+
+    def signature(self, file_path: Path):
+        """
+        JSON-serializable token that changes whenever the document changes.
+        Derived indexes store it to detect that they are out of date.
+        """
+        raise NotImplementedError
+
+    def get_entry(self, file_path: Path, name: str) -> Optional[dict]:
+        entry = self.view(file_path).get(name)
+        return clone_json(entry) if entry is not None else None
+
+    def find_name(self, file_path: Path, name: str) -> Optional[str]:
+        """
+        Stored name of the entry `name` refers to, ignoring case and slug or URL
+        form (see name_key), or None. An exact match wins.
+        """
+        if name in self.view(file_path):
+            return name
+        return name_index(self, file_path)[0].get(name_key(name))
+
+    def find_entry(self, file_path: Path, name: str) -> tuple[Optional[str], Optional[dict]]:
+        """Lookup as find_name. Returns (stored_name, entry) or (None, None)."""
+        stored = self.find_name(file_path, name)
+        entry = self.get_entry(file_path, stored) if stored is not None else None
+        if entry is None:
+            return None, None
+        return stored, entry
+
+    def put_entry(self, file_path: Path, name: str, entry: dict):
+        data = self.load(file_path)
+        data[name] = entry
+        self.save(file_path, data)
+
+    def delete_entry(self, file_path: Path, name: str) -> bool:
+        data = self.load(file_path)
+        if name not in data:
+            return False
+        del data[name]
+        self.save(file_path, data)
+        return True
+
+    def first_names(self, file_path: Path, n: int) -> list[str]:
+        """The first `n` names of a document, in stored order."""
+        return list(itertools.islice(self.view(file_path), n))
+
+    def last_attempts(self, file_path: Path) -> Iterator[tuple[str, dict]]:
+        """Yield (name, last_attempt) for every entry with a non-empty history."""
+        for name, info in self.view(file_path).items():
+            history = info.get("history", [])
+            if history:
+                yield name, history[-1]
+
+    def recent_attempts(
+        self,
+        file_path: Path,
+        limit: int,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        problem: Optional[str] = None,
+    ) -> list[tuple[int, str, dict, Optional[str]]]:
+        """
+        Return up to `limit` attempts as (seq, name, attempt, url), most recent first.
+        `seq` orders attempts within the document and breaks ties on equal dates.
+        `since`/`until` keep attempts within an inclusive range of ISO dates
+        (compared on the date part of each attempt) and `problem` those of one
+        problem, matched by name_key.
+
+        Histories are kept in date order, so they are merged newest first and
+        only the attempts returned are visited, not every attempt in the file.
+        """
+        streams = []
+        seq = 0
+        key = name_key(problem) if problem is not None else None
+        for name, info in self.view(file_path).items():
+            history = info.get("history", [])
+            if history and (problem is None or name_key(name) == key):
+                streams.append(_newest_first(name, info.get("url"), history, seq, until))
+            seq += len(history)
+
+        merged = heapq.merge(*streams, reverse=True)
+        if since is not None:
+            merged = itertools.takewhile(lambda entry: entry[0][:10] >= since, merged)
+        return [
+            (seq, name, attempt, url)
+            for _, seq, name, attempt, url in itertools.islice(merged, max(limit, 0))
+        ]
+
+    def attempt_dates(self, file_path: Path) -> list[str]:
+        res = []
+        for obj in self.view(file_path).values():
+            for record in obj.get("history", []):
+                date = record.get("date", "")
+                if date:
+                    res.append(date)
+        return res
+
+    def date_counts(self, file_path: Path) -> Counter[str]:
+        return Counter(self.attempt_dates(file_path))
+
+
+def _newest_first(name: str, url: Optional[str], history: list, start: int, until: Optional[str]):
+    """(date, seq, name, attempt, url) for a history, last attempt first."""
+    for i in range(len(history) - 1, -1, -1):
+        attempt = history[i]
+        if until is None or attempt["date"][:10] <= until:
+            yield attempt["date"], start + i, name, attempt, url
+
+
+class JsonBackend(StorageBackend):
+    """Stores every document as a standalone JSON file in DATA_DIR (the default)."""
+
+    name = "json"
+
+    def __init__(self):
+        self._local = threading.local()
+
+    def _pending(self) -> Optional[dict]:
+        return getattr(self._local, "pending", None)
+
+    def load(self, file_path: Path) -> dict:
+        pending = self._pending()
+        if pending is not None and file_path in pending:
+            return pending[file_path]
+        return read_json_file(file_path)
+
+    def view(self, file_path: Path) -> dict:
+        pending = self._pending()
+        if pending is not None and file_path in pending:
+            return pending[file_path]
+        return view_json_file(file_path)
+
+    def save(self, file_path: Path, data: dict):
+        pending = self._pending()
+        if pending is not None:
+            pending[file_path] = data
+        else:
+            write_json_file(file_path, data)
+
+    @contextmanager
+    def transaction(self):
+        if self._pending() is not None:
+            yield
+            return
+
+        self._local.pending = {}
+        try:
+            yield
+            write_json_files(self._local.pending)
+        finally:
+            self._local.pending = None
+
+    def signature(self, file_path: Path):
+        try:
+            st = os.stat(file_path)
+        except FileNotFoundError:
+            return None
+        return [st.st_mtime_ns, st.st_size, st.st_ino]
+
+
+def backend_name() -> str:
+    return view_json_file(CONFIG_FILE).get("storage_backend", DEFAULT_BACKEND)
+
+
+def scheduler_name() -> str:
+    return view_json_file(CONFIG_FILE).get("scheduler", DEFAULT_SCHEDULER)
+
+
+def load_balance_days() -> int:
+    """How far due dates may move to even out the daily workload (0: off)."""
+    return view_json_file(CONFIG_FILE).get("load_balance_days", 0)
+
+
+def use_backend(backend: Optional[StorageBackend]):
+    """
+    Route all document access through `backend` instead of the engine selected
+    in config, e.g. the server's in-memory engine. None restores the default.
+    """
+    global _override
+    _override = backend
+
+
+def get_backend(name: Optional[str] = None) -> StorageBackend:
+    """Return the storage engine selected in config (or the one named explicitly)."""
+    if name is None and _override is not None:
+        return _override
+    name = name or backend_name()
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown storage backend: {name}")
+
+    # One engine instance per data directory
+    key = (name, PROGRESS_FILE.parent)
+    if key not in _backends:
+        module_name, class_name = BACKENDS[name].split(":")
+        backend_cls = getattr(importlib.import_module(module_name), class_name)
+        _backends[key] = backend_cls()
+    return _backends[key]
+
+
+def load_json(file_path: Path) -> dict:
+    if document_name(file_path) is None:
+        return read_json_file(file_path)
+    with timing.phase("load"):
+        return get_backend().load(file_path)
+
+
+def view_json(file_path: Path) -> dict:
+    """Like load_json, for read-only use: the result may be shared, do not modify it."""
+    if document_name(file_path) is None:
+        return view_json_file(file_path)
+    with timing.phase("load"):
+        return get_backend().view(file_path)
 
 
 def save_json(file_path: Path, data: dict):
-    with open(file_path, "w") as f:
-        json.dump(data, f, indent=2)
+    if document_name(file_path) is None:
+        write_json_file(file_path, data)
+        return
+    if getattr(_local, "changes", None) is not None:
+        # Entry changes recorded in this transaction no longer describe the document
+        _local.changes[file_path] = (_REWRITTEN, [])
+    _names.pop(file_path, None)
+    with timing.phase("save"):
+        get_backend().save(file_path, data)
+
+
+def get_entry(file_path: Path, name: str) -> Optional[dict]:
+    with timing.phase("load"):
+        return get_backend().get_entry(file_path, name)
+
+
+def find_name(file_path: Path, name: str) -> Optional[str]:
+    with timing.phase("load"):
+        return get_backend().find_name(file_path, name)
+
+
+def find_entry(file_path: Path, name: str) -> tuple[Optional[str], Optional[dict]]:
+    with timing.phase("load"):
+        return get_backend().find_entry(file_path, name)
+
+
+def name_key(name: str) -> str:
+    """
+    Normalized form of a problem name or LeetCode URL, used to match entries:
+    "Two Sum", "two-sum" and "https://leetcode.com/problems/two-sum/" -> "two-sum"
+    """
+    if name.startswith(("http://", "https://")):
+        match = _LEETCODE_SLUG.search(name)
+        if match:
+            name = match.group(1)
+    return _SEPARATORS.sub("-", name.casefold()).strip("-")
+
+
+def name_index(backend: StorageBackend, file_path: Path) -> tuple[dict[str, str], set]:
+    """
+    (name_key -> stored name, keys shared by several entries) for a document, the
+    first entry in document order winning a shared key. Cached while the
+    backend's view and signature of the document are unchanged; entry writes made
+    through this module keep it up to date, whole-document saves drop it.
+    """
+    cached = _current_names(backend, file_path)
+    metrics.cache("names", hit=cached is not None)
+    if cached is not None:
+        return cached
+
+    index, shared = {}, set()
+    for name in backend.view(file_path):
+        key = name_key(name)
+        if key in index:
+            shared.add(key)
+        else:
+            index[key] = name
+    _stamp_names(backend, file_path, (index, shared))
+    return index, shared
+
+
+def _current_names(backend: StorageBackend, file_path: Path) -> Optional[tuple[dict, set]]:
+    cached = _names.get(file_path)
+    if (
+        cached is None
+        or cached[0] is not backend
+        or cached[1] is not backend.view(file_path)
+        or cached[2] != backend.signature(file_path)
+    ):
+        return None
+    return cached[3]
+
+
+def _stamp_names(backend: StorageBackend, file_path: Path, names: tuple[dict, set]):
+    _names[file_path] = (backend, backend.view(file_path), backend.signature(file_path), names)
+
+
+def _names_written(backend: StorageBackend, file_path: Path, names, name: str, added: bool):
+    """Apply an entry write to the name index that was current before it."""
+    if names is None:
+        return
+    index, shared = names
+    key = name_key(name)
+    if added:
+        if index.setdefault(key, name) != name:
+            shared.add(key)
+    elif key in shared:
+        # Another entry may now own the key: rebuild on the next lookup
+        _names.pop(file_path, None)
+        return
+    elif index.get(key) == name:
+        del index[key]
+    _stamp_names(backend, file_path, names)
+
+
+@contextmanager
+def data_lock():
+    """
+    Exclusive lock on the data directory, held by writers across threads and
+    processes (an advisory flock on LOCK_FILE). Readers don't need it: files are
+    replaced atomically, so they always see a complete version. Reentrant.
+    """
+    depth = getattr(_local, "lock_depth", 0)
+    if depth:
+        _local.lock_depth += 1
+        try:
+            yield
+        finally:
+            _local.lock_depth -= 1
+        return
+
+    with _thread_lock:
+        fd = None
+        if fcntl is not None:
+            LOCK_FILE.parent.mkdir(parents=True, exist_ok=True)
+            fd = os.open(LOCK_FILE, os.O_RDWR | os.O_CREAT, 0o644)
+            fcntl.flock(fd, fcntl.LOCK_EX)
+        _local.lock_depth = 1
+        try:
+            yield
+        finally:
+            _local.lock_depth = 0
+            if fd is not None:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+                os.close(fd)
+
+
+@contextmanager
+def transaction():
+    """
+    Group writes so they are committed together, e.g. the progress, mastered and
+    next up updates made by `srl add`. Nested blocks join the outermost one.
+
+    The block holds `data_lock`, so reads made inside it are not invalidated by a
+    concurrent writer: read-modify-write commands run entirely within one.
+    """
+    if getattr(_local, "changes", None) is not None:
+        yield
+        return
+
+    with data_lock():
+        backend = get_backend()
+        _local.changes = {}
+        try:
+            with backend.transaction():
+                yield
+                changes = _local.changes
+                # Name indexes kept up to date by the writes stay valid once committed
+                names = {
+                    file_path: _current_names(backend, file_path)
+                    for file_path in changes
+                    if file_path in _names
+                }
+        finally:
+            _local.changes = None
+
+        for file_path, current in names.items():
+            if current is not None:
+                _stamp_names(backend, file_path, current)
+        for file_path, (before, entries) in changes.items():
+            _entries_written(backend, file_path, entries, before)
+
+
+# Recorded in place of a signature when a transaction rewrote a whole document
+_REWRITTEN = object()
+
+
+def _record_change(file_path: Path, name: str, old: Optional[dict], entry: Optional[dict], before):
+    changes = _local.changes
+    if file_path not in changes:
+        changes[file_path] = (before, [])
+    changes[file_path][1].append((name, old, entry))
+
+
+def _previous(backend: StorageBackend, file_path: Path, name: str) -> Optional[dict]:
+    """Entry about to be replaced, for indexes that count attempts."""
+    if file_path not in (PROGRESS_FILE, MASTERED_FILE):
+        return None
+    return backend.get_entry(file_path, name)
+
+
+def put_entry(file_path: Path, name: str, entry: dict):
+    with transaction():
+        backend = get_backend()
+        before = backend.signature(file_path)
+        old = _previous(backend, file_path, name)
+        names = _current_names(backend, file_path) if file_path in _names else None
+        with timing.phase("save"):
+            backend.put_entry(file_path, name, entry)
+        _record_change(file_path, name, old, entry, before)
+        _names_written(backend, file_path, names, name, added=True)
+
+
+def delete_entry(file_path: Path, name: str) -> bool:
+    with transaction():
+        backend = get_backend()
+        before = backend.signature(file_path)
+        old = _previous(backend, file_path, name)
+        names = _current_names(backend, file_path) if file_path in _names else None
+        with timing.phase("save"):
+            deleted = backend.delete_entry(file_path, name)
+        if deleted:
+            _record_change(file_path, name, old, None, before)
+            _names_written(backend, file_path, names, name, added=False)
+        return deleted
+
+
+def _entries_written(backend: StorageBackend, file_path: Path, entries: list, before):
+    """
+    Keep derived indexes in step with committed entry writes, given as
+    (name, previous entry, new entry). `before` is the document signature prior
+    to the first write in the transaction; indexes over documents rewritten
+    whole are left to be rebuilt.
+    """
+    if before is _REWRITTEN:
+        return
+    if file_path == PROGRESS_FILE:
+        from srl import due_index
+
+        due_index.update(backend, [(name, entry) for name, _, entry in entries], before)
+    if file_path in (PROGRESS_FILE, MASTERED_FILE):
+        from srl import activity
+
+        activity.update(backend, file_path, entries, before)
+
+
+def last_attempts(file_path: Path) -> Iterator[tuple[str, dict]]:
+    return get_backend().last_attempts(file_path)
+
+
+def first_names(file_path: Path, n: int) -> list[str]:
+    with timing.phase("load"):
+        return get_backend().first_names(file_path, n)
+
+
+def recent_attempts(
+    file_path: Path,
+    limit: int,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    problem: Optional[str] = None,
+) -> list[tuple[int, str, dict, Optional[str]]]:
+    return get_backend().recent_attempts(file_path, limit, since, until, problem)
+
+
+def attempt_dates(file_path: Path) -> list[str]:
+    return get_backend().attempt_dates(file_path)
+
+
+def date_counts(file_path: Path) -> Counter[str]:
+    return get_backend().date_counts(file_path)
+
+
+def import_json_files(backend: StorageBackend) -> dict[str, int]:
+    """
+    Copy every JSON data file into `backend`, replacing what it holds.
+    Returns the number of entries imported per document.
+    """
+    counts = {}
+    with data_lock(), backend.transaction():
+        for file_path in (PROGRESS_FILE, MASTERED_FILE, NEXT_UP_FILE, AUDIT_FILE):
+            data = read_json_file(file_path)
+            backend.save(file_path, data)
+            doc = document_name(file_path)
+            counts[doc] = len(data.get("history", [])) if doc == "audit" else len(data)
+    return counts
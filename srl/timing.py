@@ -0,0 +1,210 @@
+"""
+Time and bytes spent in each phase of a command: load (reading and parsing the
+data), compute, render (console output) and save (encoding and writing).
+
+Timing is off unless a `Timings` is being recorded in the current context (by
+`srl --timings`, or by the server for every request); `phase` is then a no-op.
+Phases nest, and time is charged to the innermost one only, so a load made by a
+handler running in the compute phase counts as load. The recording is held in
+a context variable, so concurrent server requests each keep their own.
+
+Only the standard library is imported here: srl.storage uses this module.
+"""
+
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from typing import Optional
+import functools
+import sys
+import time
+
+PHASES = ("load", "compute", "render", "save")
+
+_current: ContextVar[Optional["Timings"]] = ContextVar("srl_timings", default=None)
+_NO_PHASE = nullcontext()
+
+
+class Timings:
+    """Seconds, bytes and calls per phase, recorded on one thread at a time."""
+
+    def __init__(self):
+        self.phases: dict[str, list] = {}
+        self._stack: list[str] = []
+        self.started = self._mark = time.perf_counter()
+        self.finished: Optional[float] = None
+
+    def _charge(self):
+        now = time.perf_counter()
+        if self._stack:
+            self.phases[self._stack[-1]][0] += now - self._mark
+        self._mark = now
+
+    @contextmanager
+    def phase(self, name: str):
+        self._charge()
+        stats = self.phases.setdefault(name, [0.0, 0, 0])
+        # A phase entered again from within itself is the same call
+        if not self._stack or self._stack[-1] != name:
+            stats[2] += 1
+        self._stack.append(name)
+        try:
+            yield
+        finally:
+            self._charge()
+            self._stack.pop()
+
+    def count(self, nbytes: int):
+        """Add `nbytes` read or written to the current phase."""
+        if self._stack:
+            self.phases[self._stack[-1]][1] += nbytes
+
+    @property
+    def total(self) -> float:
+        return (self.finished or time.perf_counter()) - self.started
+
+    def rows(self) -> list[tuple[str, float, int, int]]:
+        """(phase, seconds, bytes, calls) in PHASES order, then any other phase."""
+        names = [name for name in PHASES if name in self.phases]
+        names += sorted(set(self.phases) - set(PHASES))
+        return [(name, *self.phases[name]) for name in names]
+
+    def server_timing(self) -> str:
+        """The phases as a Server-Timing header value, durations in milliseconds."""
+        metrics = [
+            f'{name};dur={seconds * 1000:.2f};desc="{nbytes} bytes"'
+            for name, seconds, nbytes, _ in self.rows()
+        ]
+        metrics.append(f"total;dur={self.total * 1000:.2f}")
+        return ", ".join(metrics)
+
+
+@contextmanager
+def record():
+    """Record the phases of everything run in the block (and copies of its context)."""
+    timings = Timings()
+    token = _current.set(timings)
+    try:
+        yield timings
+    finally:
+        timings.finished = time.perf_counter()
+        _current.reset(token)
+
+
+def phase(name: str):
+    """Context manager charging the block to `name` while timings are recorded."""
+    timings = _current.get()
+    return _NO_PHASE if timings is None else timings.phase(name)
+
+
+def count(nbytes: int):
+    timings = _current.get()
+    if timings is not None:
+        timings.count(nbytes)
+
+
+def call(name: str, fn, *args):
+    """fn(*args), charged to phase `name`."""
+    with phase(name):
+        return fn(*args)
+
+
+class _CountingWriter:
+    """Text stream wrapper counting what is written as bytes of the current phase."""
+
+    def __init__(self, stream):
+        self._stream = stream
+
+    def write(self, text: str) -> int:
+        count(len(text.encode("utf-8", "replace")))
+        return self._stream.write(text)
+
+    def __getattr__(self, name):
+        return getattr(self._stream, name)
+
+
+@functools.cache
+def _console_class():
+    from rich.console import Console
+
+    class TimedConsole(Console):
+        """Console whose output is charged to the render phase."""
+
+        def print(self, *objects, **kwargs):
+            with phase("render"):
+                super().print(*objects, **kwargs)
+
+        def rule(self, *args, **kwargs):
+            with phase("render"):
+                super().rule(*args, **kwargs)
+
+        def export_text(self, **kwargs) -> str:
+            with phase("render"):
+                text = super().export_text(**kwargs)
+                count(len(text.encode("utf-8", "replace")))
+                return text
+
+    return TimedConsole
+
+
+def console(**kwargs):
+    """A rich Console charging its output to the render phase."""
+    if "file" not in kwargs and not kwargs.get("record"):
+        # Count the bytes written to the terminal
+        kwargs["file"] = _CountingWriter(sys.stdout)
+    return _console_class()(**kwargs)
+
+
+def _size(nbytes: int) -> str:
+    if nbytes < 1024:
+        return f"{nbytes} B"
+    if nbytes < 1024 * 1024:
+        return f"{nbytes / 1024:.1f} KB"
+    return f"{nbytes / (1024 * 1024):.1f} MB"
+
+
+def report(timings: Timings, command: str, console):
+    """Print the phases of a command as a table."""
+    from rich.table import Table
+
+    total = timings.total
+    table = Table(title=f"srl {command}: {total * 1000:.1f} ms", title_justify="left")
+    table.add_column("Phase")
+    table.add_column("ms", justify="right")
+    table.add_column("%", justify="right")
+    table.add_column("Bytes", justify="right")
+    table.add_column("Calls", justify="right")
+    for name, seconds, nbytes, calls in timings.rows():
+        share = seconds / total * 100 if total else 0
+        table.add_row(name, f"{seconds * 1000:.1f}", f"{share:.0f}", _size(nbytes), str(calls))
+    console.print(table)
+
+
+def run_handler(args, profile: Optional[str] = None):
+    """
+    Run a parsed command with its phases timed, report them on stderr and, with
+    `profile`, write a cProfile dump of the handler to that path (read it with
+    `python -m pstats`).
+    """
+    from rich.console import Console
+
+    out = console()
+    profiler = None
+    if profile:
+        import cProfile
+
+        profiler = cProfile.Profile()
+
+    with record() as timings:
+        if profiler is not None:
+            profiler.enable()
+        try:
+            call("compute", args.handler, args, out)
+        finally:
+            if profiler is not None:
+                profiler.disable()
+
+    err = Console(stderr=True)
+    report(timings, getattr(args, "command", None) or "", err)
+    if profiler is not None:
+        profiler.dump_stats(profile)
+        err.print(f"Profile written to {profile} (view it with: python -m pstats {profile})")
@@ -8,6 +8,11 @@ import json
 from datetime import datetime, timedelta
 from srl import cli
 
+# Commands are imported lazily by the CLI; import them all up front so
+# mock_data can redirect the data files each of them imports from storage
+for _command in cli.COMMANDS:
+    cli.command_module(_command)
+
 
 @dataclass
 class Paths:
@@ -16,6 +21,15 @@ class Paths:
     NEXT_UP_FILE: pathlib.Path
     AUDIT_FILE: pathlib.Path
     CONFIG_FILE: pathlib.Path
+    DB_FILE: pathlib.Path
+    DUE_INDEX_FILE: pathlib.Path
+    DUE_INDEX_LOG_FILE: pathlib.Path
+    EVENT_LOG_FILE: pathlib.Path
+    SNAPSHOT_FILE: pathlib.Path
+    JOURNAL_FILE: pathlib.Path
+    LOCK_FILE: pathlib.Path
+    DAEMON_SOCKET: pathlib.Path
+    ACTIVITY_FILE: pathlib.Path
 
 
 @pytest.fixture
@@ -52,10 +66,20 @@ def mock_data(tmp_path, monkeypatch):
         NEXT_UP_FILE=tmp_path / "next_up.json",
         AUDIT_FILE=tmp_path / "audit.json",
         CONFIG_FILE=tmp_path / "config.json",
+        DB_FILE=tmp_path / "srl.db",
+        DUE_INDEX_FILE=tmp_path / "due_index.json",
+        DUE_INDEX_LOG_FILE=tmp_path / "due_index.log",
+        EVENT_LOG_FILE=tmp_path / "events.log",
+        SNAPSHOT_FILE=tmp_path / "snapshot.json",
+        JOURNAL_FILE=tmp_path / "transaction.json",
+        LOCK_FILE=tmp_path / "srl.lock",
+        DAEMON_SOCKET=tmp_path / "srl.sock",
+        ACTIVITY_FILE=tmp_path / "activity.json",
     )
 
     for name, path in vars(paths).items():
-        path.write_text("{}")
+        if path.suffix == ".json" and name != "JOURNAL_FILE":
+            path.write_text("{}")
         for mod in vars(srl.commands).values():
             if hasattr(mod, name):
                 monkeypatch.setattr(f"{mod.__name__}.{name}", path)
@@ -0,0 +1,76 @@
+from types import SimpleNamespace
+import pytest
+
+from srl import activity, storage
+from srl.commands import add, audit, calendar, remove
+
+
+def _recount():
+    return activity.rebuild()["documents"]
+
+
+def test_counts_match_a_full_scan(mock_data, dump_json):
+    dump_json(
+        mock_data.PROGRESS_FILE,
+        {"A": {"history": [{"rating": 1, "date": "2024-06-01"}, {"rating": 2, "date": "2024-06-02"}]}},
+    )
+    dump_json(mock_data.MASTERED_FILE, {"M": {"history": [{"rating": 5, "date": "2024-06-01"}]}})
+    dump_json(
+        mock_data.AUDIT_FILE,
+        {
+            "history": [
+                {"date": "2024-06-02", "problem": "M", "result": "pass"},
+                {"date": "2024-06-03", "problem": "M", "result": "fail"},
+            ]
+        },
+    )
+
+    assert calendar.get_all_date_counts() == {"2024-06-01": 2, "2024-06-02": 2}
+
+
+def test_writes_update_counts_incrementally(mock_data, console, load_json):
+    add.handle(SimpleNamespace(identifier="A", rating=3), console)
+    activity.load()  # count once
+    progress = load_json(mock_data.PROGRESS_FILE)
+
+    add.handle(SimpleNamespace(identifier="B", rating=1), console)
+    add.handle(SimpleNamespace(identifier="A", rating=5), console)
+    add.handle(SimpleNamespace(identifier="A", rating=5), console)  # mastered
+    remove.handle(SimpleNamespace(identifier="B"), console)
+
+    assert load_json(mock_data.PROGRESS_FILE) != progress
+    incremental = load_json(mock_data.ACTIVITY_FILE)["documents"]
+    assert incremental == _recount()
+    assert sum(calendar.get_all_date_counts().values()) == 3
+
+
+def test_audit_results_are_counted(mock_data, console, dump_json, load_json):
+    dump_json(mock_data.MASTERED_FILE, {"M": {"history": [{"rating": 5, "date": "2024-06-01"}]}})
+    dump_json(mock_data.AUDIT_FILE, {"current_audit": "M"})
+    assert sum(calendar.get_all_date_counts().values()) == 1
+
+    audit.handle(SimpleNamespace(audit_pass=True, audit_fail=False), console)
+    assert sum(calendar.get_all_date_counts().values()) == 2
+
+    audit_data = load_json(mock_data.AUDIT_FILE)
+    dump_json(mock_data.AUDIT_FILE, dict(audit_data, current_audit="M"))
+    audit.handle(SimpleNamespace(audit_pass=False, audit_fail=True), console)
+    # The failed attempt is recorded on the problem, the audit itself is not counted
+    assert sum(calendar.get_all_date_counts().values()) == 3
+    assert load_documents(mock_data) == _recount()
+
+
+def load_documents(mock_data):
+    return storage.read_json_file(mock_data.ACTIVITY_FILE)["documents"]
+
+
+@pytest.mark.parametrize("backend", ["sqlite", "eventlog"])
+def test_other_backends(backend, mock_data, console, dump_json):
+    dump_json(mock_data.CONFIG_FILE, {"storage_backend": backend})
+    add.handle(SimpleNamespace(identifier="A", rating=3), console)
+    activity.load()
+
+    add.handle(SimpleNamespace(identifier="A", rating=4), console)
+
+    assert load_documents(mock_data) == _recount()
+    assert sum(calendar.get_all_date_counts().values()) == 2
@@ -0,0 +1,34 @@
+from datetime import date, timedelta
+import random
+import pytest
+
+from srl import batch, due_index, storage
+
+pytest.importorskip("numpy")
+
+
+def test_batch_rows_match_per_problem_build(mock_data, dump_json, monkeypatch):
+    rng = random.Random(3)
+    today = date.today()
+    dump_json(
+        mock_data.PROGRESS_FILE,
+        {
+            f"P{i}": {
+                "history": [
+                    {"rating": rng.randint(1, 5), "date": (today - timedelta(days=rng.randint(0, 9))).isoformat()}
+                    for _ in range(rng.randint(1, 3))
+                ]
+            }
+            for i in range(300)
+        },
+    )
+    backend = storage.get_backend()
+
+    monkeypatch.setattr(batch, "BATCH_THRESHOLD", float("inf"))
+    expected = due_index.build(backend)
+    monkeypatch.setattr(batch, "BATCH_THRESHOLD", 0)
+    assert due_index.build(backend) == expected
+
+
+def test_batch_rows_empty():
+    assert batch.due_rows([]) == []
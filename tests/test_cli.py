@@ -22,9 +22,11 @@ def test_add_mutually_exclusive_both_given(parser):
         parser.parse_args(["add", "Two Sum", "-n", "4", "3"])
 
 
-def test_add_requires_name_or_number(parser):
-    with pytest.raises(SystemExit):
-        parser.parse_args(["add"])
+def test_add_requires_name_or_number(parser, console):
+    # The problem and rating are optional with --batch, so handle() checks them
+    args = parser.parse_args(["add"])
+    args.handler(args, console)
+    assert "Please provide a problem and a rating" in console.export_text()
 
 
 def test_add_invalid_rating(parser):
@@ -223,3 +225,20 @@ def test_random_command_all_flag(parser):
     assert args.command == "random"
     assert hasattr(args, "handler")
     assert args.all
+
+
+def test_registry_help_matches_commands():
+    import argparse
+    from srl import cli
+
+    for name, (_, help) in cli.COMMANDS.items():
+        subparsers = argparse.ArgumentParser().add_subparsers()
+        cli.command_module(name).add_subparser(subparsers)
+        assert [a.help for a in subparsers._choices_actions] == [help], name
+
+
+def test_lazy_parser_builds_selected_command(parser):
+    args = parser.parse_args(["history", "-n", "5"])
+    assert args.command == "history"
+    assert args.n == 5
+    assert list(parser._subparsers._group_actions[0].choices)[:2] == ["add", "list"]
@@ -0,0 +1,42 @@
+import json
+import pytest
+from srl import codec, storage
+
+
+@pytest.fixture(params=["fast", "stdlib"])
+def implementation(request, monkeypatch):
+    if request.param == "fast":
+        if not codec.available():
+            pytest.skip("orjson is not installed")
+        monkeypatch.setattr(codec, "FAST_LOADS_BYTES", 0)
+    else:
+        monkeypatch.setattr(codec, "orjson", None)
+    return request.param
+
+
+def test_round_trip(implementation):
+    data = {"Café Problem": {"history": [{"rating": 3, "date": "2024-01-01"}], "url": None}}
+
+    raw = codec.dumps(data)
+
+    assert b"\n" not in raw
+    assert json.loads(raw) == data
+    assert codec.loads(raw) == data
+    assert codec.loads(raw.decode()) == data
+
+
+def test_pretty_and_non_string_keys(implementation):
+    raw = codec.dumps({"calendar_colors": {0: "#1a1a1a"}}, pretty=True)
+
+    assert raw.decode() == json.dumps({"calendar_colors": {"0": "#1a1a1a"}}, indent=2)
+
+
+def test_data_files_follow_the_configured_format(mock_data, dump_json):
+    data = {"Two Sum": {"history": [{"rating": 3, "date": "2024-01-01"}]}}
+
+    storage.save_json(mock_data.PROGRESS_FILE, data)
+    assert mock_data.PROGRESS_FILE.read_bytes() == codec.dumps(data)
+
+    dump_json(mock_data.CONFIG_FILE, {"json_format": "pretty"})
+    storage.save_json(mock_data.PROGRESS_FILE, data)
+    assert mock_data.PROGRESS_FILE.read_text() == json.dumps(data, indent=2)
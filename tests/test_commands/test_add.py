@@ -186,6 +186,16 @@ def test_add_by_number_removes_from_nextup(console, load_json, mock_data):
     assert f"Added rating {rating} for '{problem}'" in output
 
 
+def test_mastery_merges_into_differently_spelled_entry(mock_data, load_json, dump_json):
+    dump_json(mock_data.MASTERED_FILE, {"two sum": {"history": [{"rating": 5, "date": "2025-11-14"}]}})
+    dump_json(mock_data.PROGRESS_FILE, {"Two Sum": {"history": [{"rating": 5, "date": "2025-11-15"}]}})
+
+    assert add.record_attempt("Two Sum", 5) == ("two sum", True)
+
+    assert load_json(mock_data.PROGRESS_FILE) == {}
+    assert len(load_json(mock_data.MASTERED_FILE)["two sum"]["history"]) == 3
+
+
 def test_add_by_number_mastery(console, load_json, backdate_problem, mock_data):
     problem = "Problem to be mastered"
     add.handle(SimpleNamespace(name=problem, rating=5, number=None), console)
@@ -0,0 +1,101 @@
+from srl import storage
+from srl.commands import add
+from types import SimpleNamespace
+
+
+def test_batch_csv_records_attempts(mock_data, console, load_json, tmp_path):
+    batch = tmp_path / "attempts.csv"
+    batch.write_text(
+        "identifier,rating,date\n"
+        "Two Sum,3,2024-01-01\n"
+        "https://leetcode.com/problems/valid-anagram/,2,2024-01-02\n"
+        "two sum,4,2024-01-05\n"
+    )
+
+    add.handle(SimpleNamespace(identifier=None, rating=None, batch=str(batch)), console)
+
+    progress = load_json(mock_data.PROGRESS_FILE)
+    assert [a["rating"] for a in progress["Two Sum"]["history"]] == [3, 4]
+    assert progress["Two Sum"]["history"][-1]["date"] == "2024-01-05"
+    assert progress["Valid Anagram"]["url"] == "https://leetcode.com/problems/valid-anagram/"
+    assert "Recorded 3 attempt(s) for 2 problem(s)" in console.export_text()
+
+
+def test_batch_ndjson_masters_and_clears_next_up(
+    mock_data, console, load_json, dump_json, tmp_path
+):
+    dump_json(mock_data.NEXT_UP_FILE, {"Climb": {"url": None}})
+    batch = tmp_path / "attempts.ndjson"
+    batch.write_text(
+        '{"name": "Climb", "rating": 5, "date": "2024-01-01"}\n'
+        '{"identifier": "Climb", "rating": 5, "date": "2024-01-06"}\n'
+    )
+
+    add.handle(SimpleNamespace(identifier=None, rating=None, batch=str(batch)), console)
+
+    assert "Climb" not in load_json(mock_data.PROGRESS_FILE)
+    assert len(load_json(mock_data.MASTERED_FILE)["Climb"]["history"]) == 2
+    assert load_json(mock_data.NEXT_UP_FILE) == {}
+    assert "1 moved to mastered" in console.export_text()
+
+
+def test_batch_with_invalid_row_records_nothing(mock_data, console, load_json, tmp_path):
+    batch = tmp_path / "attempts.csv"
+    batch.write_text("Two Sum,3\nThree Sum,9\nFour Sum,2,not-a-date\n")
+
+    add.handle(SimpleNamespace(identifier=None, rating=None, batch=str(batch)), console)
+
+    assert load_json(mock_data.PROGRESS_FILE) == {}
+    output = console.export_text()
+    assert "row 2: rating must be 1-5" in output
+    assert "row 3: invalid rating or date" in output
+    assert "No attempts recorded: 2 invalid row(s)." in output
+
+
+def test_batch_matches_single_adds(mock_data, load_json):
+    attempts = [("A", 5, None, add.today()), ("a", 5, None, add.today()), ("B", 1, None, add.today())]
+    results = add.record_attempts(attempts)
+
+    assert results == [("A", False), ("A", True), ("B", False)]
+    assert list(load_json(mock_data.PROGRESS_FILE)) == ["B"]
+    assert list(load_json(mock_data.MASTERED_FILE)) == ["A"]
+
+
+def test_batch_keeps_histories_in_date_order(mock_data, console, load_json, dump_json, tmp_path):
+    dump_json(mock_data.PROGRESS_FILE, {"Two Sum": {"history": [{"rating": 3, "date": "2026-10-15"}]}})
+    batch = tmp_path / "attempts.csv"
+    batch.write_text("Two Sum,2,2026-09-01\nValid Anagram,4,2026-10-12\nValid Anagram,1,2026-10-02\n")
+
+    add.handle(SimpleNamespace(identifier=None, rating=None, batch=str(batch)), console)
+
+    progress = load_json(mock_data.PROGRESS_FILE)
+    assert [a["date"] for a in progress["Two Sum"]["history"]] == ["2026-09-01", "2026-10-15"]
+    assert [a["date"] for a in progress["Valid Anagram"]["history"]] == ["2026-10-02", "2026-10-12"]
+    # The newest attempts come first in `srl history`
+    latest = storage.recent_attempts(mock_data.PROGRESS_FILE, 2)
+    assert [(name, attempt["date"]) for _, name, attempt, _ in latest] == [
+        ("Two Sum", "2026-10-15"),
+        ("Valid Anagram", "2026-10-12"),
+    ]
+
+
+def test_batch_rejects_problem_and_rating_arguments(mock_data, console, load_json, tmp_path):
+    batch = tmp_path / "attempts.csv"
+    batch.write_text("Two Sum,3\n")
+
+    add.handle(SimpleNamespace(identifier="Two Sum", rating=4, batch=str(batch)), console)
+
+    assert load_json(mock_data.PROGRESS_FILE) == {}
+    assert "not both" in console.export_text()
+
+
+def test_batch_rejects_fractional_rating(mock_data, console, load_json, tmp_path):
+    batch = tmp_path / "attempts.ndjson"
+    batch.write_text('{"name": "Two Sum", "rating": 3.7}\n{"name": "Climb", "rating": 4.0}\n')
+
+    add.handle(SimpleNamespace(identifier=None, rating=None, batch=str(batch)), console)
+
+    assert load_json(mock_data.PROGRESS_FILE) == {}
+    output = console.export_text()
+    assert "row 1: rating must be 1-5" in output
+    assert "1 invalid row(s)" in output
@@ -37,3 +37,16 @@ def test_add_case_insensitive_update(mock_data, console, load_json):
     history = progress[problem_original]["history"]
     assert len(history) == 2
     assert history[1]["rating"] == rating2
+
+
+def test_add_slug_and_url_forms_update_existing(mock_data, console, load_json):
+    add.handle(SimpleNamespace(identifier="Two Sum", rating=2), console)
+    add.handle(SimpleNamespace(identifier="two-sum", rating=3), console)
+    add.handle(
+        SimpleNamespace(identifier="https://leetcode.com/problems/two-sum/description/", rating=4),
+        console,
+    )
+
+    progress = load_json(mock_data.PROGRESS_FILE)
+    assert list(progress) == ["Two Sum"]
+    assert [a["rating"] for a in progress["Two Sum"]["history"]] == [2, 3, 4]
@@ -0,0 +1,20 @@
+from types import SimpleNamespace
+
+from srl.commands import add, compact
+
+
+def test_compact_with_json_backend(console):
+    compact.handle(SimpleNamespace(), console)
+
+    output = console.export_text()
+    assert "no event log to compact" in output
+
+
+def test_compact_event_log(mock_data, console, dump_json):
+    dump_json(mock_data.CONFIG_FILE, {"storage_backend": "eventlog"})
+    add.handle(SimpleNamespace(identifier="Two Sum", rating=3), console)
+
+    compact.handle(SimpleNamespace(), console)
+
+    output = console.export_text()
+    assert "Compacted 1 event(s)" in output
@@ -153,3 +153,16 @@ def test_config_load_converts_color_keys_to_ints(mock_data, dump_json):
         1: "#222222",
     }
     assert cfg.audit_probability == 0.42
+
+
+def test_set_json_format_rewrites_data_files(mock_data, console, dump_json, load_json):
+    dump_json(mock_data.PROGRESS_FILE, {"Two Sum": {"history": []}})
+
+    config.handle(SimpleNamespace(audit_probability=None, get=False, json_format="pretty"), console)
+
+    assert load_json(mock_data.CONFIG_FILE)["json_format"] == "pretty"
+    assert mock_data.PROGRESS_FILE.read_text() == json.dumps({"Two Sum": {"history": []}}, indent=2)
+    assert Config.load().json_format == "pretty"
+
+    config.handle(SimpleNamespace(audit_probability=None, get=False, json_format="compact"), console)
+    assert mock_data.PROGRESS_FILE.read_text() == '{"Two Sum":{"history":[]}}'
@@ -0,0 +1,66 @@
+from datetime import date, timedelta
+from types import SimpleNamespace
+
+from srl.commands import add, forecast
+
+
+def _day(offset):
+    return (date.today() + timedelta(days=offset)).isoformat()
+
+
+def _progress(dump_json, mock_data):
+    dump_json(
+        mock_data.PROGRESS_FILE,
+        {
+            # Overdue: counted today
+            "A": {"history": [{"rating": 1, "date": _day(-5)}]},
+            "B": {"history": [{"rating": 2, "date": _day(0)}]},
+            "C": {"history": [{"rating": 3, "date": _day(-1)}]},
+            "D": {"history": [{"rating": 5, "date": _day(0)}]},
+        },
+    )
+
+
+def test_due_counts_per_day(mock_data, dump_json):
+    _progress(dump_json, mock_data)
+
+    assert forecast.get_forecast(4) == [(_day(0), 1), (_day(1), 0), (_day(2), 2), (_day(3), 0)]
+
+
+def test_simulated_ratings_add_follow_up_reviews(mock_data, dump_json):
+    _progress(dump_json, mock_data)
+
+    counts = dict(forecast.get_forecast(6, rating=2))
+    # A: today, +2, +4; B and C: +2, +4; D: +5
+    assert counts == {_day(0): 1, _day(1): 0, _day(2): 3, _day(3): 0, _day(4): 3, _day(5): 1}
+
+    # A second 5 in a row masters a problem: D leaves after its review on day +5
+    counts = dict(forecast.get_forecast(11, rating=5))
+    assert counts[_day(5)] == 2  # A again, D
+    assert counts[_day(10)] == 0
+
+
+def test_simulated_ratings_follow_load_balancing(mock_data, dump_json, console):
+    dump_json(mock_data.CONFIG_FILE, {"load_balance_days": 3})
+    for i in range(30):
+        add.handle(SimpleNamespace(identifier=f"S{i}", rating=4), console)
+
+    listed = dict(forecast.get_forecast(6))
+    counts = dict(forecast.get_forecast(12, rating=4))
+    # The first reviews fall where `srl list` will show them
+    assert {day: counts[day] for day in listed} == listed
+    assert [counts[_day(i)] for i in range(3, 6)] == [10, 10, 10]
+    # and their follow-ups are spread the same way
+    assert max(counts.values()) <= 10
+    assert sum(counts.values()) >= 60
+
+
+def test_handle(mock_data, dump_json, console):
+    forecast.handle(SimpleNamespace(days=7, rating=None), console)
+    assert "No reviews due in the next 7 day(s)" in console.export_text()
+
+    _progress(dump_json, mock_data)
+    forecast.handle(SimpleNamespace(days=7, rating=None), console)
+    output = console.export_text()
+    assert "Reviews due over the next 7 day(s) (4)" in output
+    assert f"{_day(2)}     2" in output
@@ -0,0 +1,76 @@
+from types import SimpleNamespace
+import pytest
+
+from srl.commands import history
+
+PROGRESS = {
+    "A": {"history": [{"rating": 1, "date": "2024-01-01"}, {"rating": 3, "date": "2024-01-05"}]},
+    "B": {
+        "history": [{"rating": 2, "date": "2024-01-03"}, {"rating": 4, "date": "2024-01-05"}],
+        "url": "https://leetcode.com/problems/b/",
+    },
+}
+MASTERED = {"C": {"history": [{"rating": 5, "date": "2024-01-02"}, {"rating": 5, "date": "2024-01-05"}]}}
+
+
+@pytest.fixture
+def attempts(mock_data, dump_json):
+    dump_json(mock_data.PROGRESS_FILE, PROGRESS)
+    dump_json(mock_data.MASTERED_FILE, MASTERED)
+
+
+def summary(entries):
+    return [(e["date"], e["problem"], e["status"]) for e in entries]
+
+
+def test_most_recent_first_across_files(attempts):
+    # Ties on a date go to the later entry on disk: mastered, then later problems
+    assert summary(history.get_history(4)) == [
+        ("2024-01-05", "C", "Mastered"),
+        ("2024-01-05", "B", "In Progress"),
+        ("2024-01-05", "A", "In Progress"),
+        ("2024-01-03", "B", "In Progress"),
+    ]
+    assert len(history.get_history(100)) == 6
+    assert history.get_history(1)[0]["url"] is None
+
+
+def test_date_range_and_problem_filters(attempts):
+    entries = history.get_history(10, since="2024-01-02", until="2024-01-03")
+    assert summary(entries) == [
+        ("2024-01-03", "B", "In Progress"),
+        ("2024-01-02", "C", "Mastered"),
+    ]
+
+    entries = history.get_history(10, problem="b")
+    assert [(e["date"], e["rating"], e["url"]) for e in entries] == [
+        ("2024-01-05", 4, "https://leetcode.com/problems/b/"),
+        ("2024-01-03", 2, "https://leetcode.com/problems/b/"),
+    ]
+
+
+def test_filters_match_timestamps_and_slugs(mock_data, dump_json):
+    progress = {"Two Sum": {"history": [{"rating": 3, "date": "2024-01-03T21:15:00"}]}}
+    dump_json(mock_data.PROGRESS_FILE, progress)
+
+    entries = history.get_history(10, since="2024-01-03", until="2024-01-03", problem="two-sum")
+    assert [(e["problem"], e["rating"]) for e in entries] == [("Two Sum", 3)]
+    assert history.get_history(10, until="2024-01-02") == []
+    assert history.get_history(10, since="2024-01-04") == []
+
+
+def test_handle_filters_and_rejects_bad_dates(attempts, console, parser):
+    args = parser.parse_args(["history", "--since", "2024-01-05", "--problem", "A"])
+    history.handle(args, console)
+
+    output = console.export_text()
+    assert "Last 1 entries" in output
+    assert "2024-01-05" in output
+
+    with pytest.raises(SystemExit):
+        parser.parse_args(["history", "--since", "yesterday"])
+
+
+def test_handle_without_history(console):
+    history.handle(SimpleNamespace(n=20), console)
+    assert "No history found" in console.export_text()
@@ -0,0 +1,34 @@
+from types import SimpleNamespace
+
+from srl import storage
+from srl.commands import import_json
+
+
+def test_import_noop_with_json_backend(console):
+    import_json.handle(SimpleNamespace(), console)
+
+    output = console.export_text()
+    assert "nothing to import" in output
+
+
+def test_import_into_sqlite(mock_data, console, dump_json):
+    progress = {"Two Sum": {"history": [{"rating": 3, "date": "2024-01-01"}]}}
+    mastered = {"Valid Anagram": {"history": [{"rating": 5, "date": "2024-01-02"}]}}
+    next_up = {"Group Anagrams": {"added": "2024-01-03"}}
+    audit = {"history": [{"date": "2024-01-04", "problem": "Valid Anagram", "result": "pass"}]}
+    dump_json(mock_data.PROGRESS_FILE, progress)
+    dump_json(mock_data.MASTERED_FILE, mastered)
+    dump_json(mock_data.NEXT_UP_FILE, next_up)
+    dump_json(mock_data.AUDIT_FILE, audit)
+    dump_json(mock_data.CONFIG_FILE, {"storage_backend": "sqlite"})
+
+    import_json.handle(SimpleNamespace(), console)
+
+    assert storage.load_json(mock_data.PROGRESS_FILE) == progress
+    assert storage.load_json(mock_data.MASTERED_FILE) == mastered
+    assert storage.load_json(mock_data.NEXT_UP_FILE) == next_up
+    assert storage.load_json(mock_data.AUDIT_FILE) == audit
+
+    output = console.export_text()
+    assert "Imported JSON data into sqlite" in output
+    assert "In progress: 1" in output
@@ -1,3 +1,4 @@
+from srl import next_up_queue, storage
 from srl.commands import nextup
 from types import SimpleNamespace
 import shutil
@@ -7,7 +8,7 @@ import pytest
 
 @pytest.fixture
 def blind75_file(tmp_path):
-    src = Path("starter_data/blind_75.txt")
+    src = Path("srl/starter_data/blind_75.txt")
     dst = tmp_path / "blind_75.txt"
     shutil.copy(src, dst)
     return dst
@@ -101,6 +102,20 @@ def test_clear_next_up(mock_data, console, load_json):
     assert "Next Up queue cleared" in output
 
 
+def test_clear_next_up_holds_data_lock(mock_data, console, monkeypatch):
+    locked = []
+    save_json = nextup.save_json
+    monkeypatch.setattr(
+        nextup,
+        "save_json",
+        lambda *args: locked.append(getattr(storage._local, "lock_depth", 0)) or save_json(*args),
+    )
+
+    nextup.handle(args=SimpleNamespace(action="clear"), console=console)
+
+    assert locked == [1]
+
+
 def test_nextup_add_file_all_new(blind75_file, console, mock_data, load_json):
     args = SimpleNamespace(action="add", file=str(blind75_file))
     nextup.handle(args=args, console=console)
@@ -312,3 +327,70 @@ def test_nextup_add_file_some_mastered_allow_mastered(
     output = console.export_text()
     assert '"Problem Y" is mastered but will be added due to flag.' in output
     assert "Added 3 problems from file" in output
+
+
+def test_add_to_next_up_matches_slug_form(mock_data, console, dump_json, load_json):
+    dump_json(mock_data.PROGRESS_FILE, {"Two Sum": {"history": [{"rating": 3, "date": "2024-01-01"}]}})
+
+    nextup.handle(SimpleNamespace(action="add", name="https://leetcode.com/problems/two-sum/"), console)
+    nextup.handle(SimpleNamespace(action="add", name="Valid Anagram"), console)
+    nextup.handle(SimpleNamespace(action="remove", name="valid-anagram"), console)
+
+    assert load_json(mock_data.NEXT_UP_FILE) == {}
+    output = console.export_text()
+    assert '"Two Sum" is already in progress.' in output
+    assert "Removed Valid Anagram from Next Up Queue" in output
+
+
+def test_nextup_add_file_reads_and_writes_once(
+    mock_data, console, dump_json, load_json, monkeypatch, tmp_path
+):
+    dump_json(mock_data.PROGRESS_FILE, {"Two Sum": {"history": []}})
+    problems = tmp_path / "problems.txt"
+    problems.write_text("two-sum\nValid Anagram\n\nvalid anagram\nhttps://example.com/\nClimbing Stairs\n")
+
+    saves = []
+    save_json = next_up_queue.save_json
+    monkeypatch.setattr(next_up_queue, "save_json", lambda *a: saves.append(a) or save_json(*a))
+    nextup.handle(SimpleNamespace(action="add", file=str(problems)), console)
+
+    assert len(saves) == 1
+    assert list(load_json(mock_data.NEXT_UP_FILE)) == ["Valid Anagram", "Climbing Stairs"]
+    output = console.export_text()
+    assert '"Two Sum" is already in progress.' in output
+    assert '"Valid Anagram" is already in the Next Up queue.' in output
+    assert "Could not extract problem name from URL: https://example.com/" in output
+    assert "Added 2 problems from file" in output
+
+
+def test_nextup_import_starter(mock_data, console, load_json):
+    nextup.handle(SimpleNamespace(action="import-starter", name="neetcode_150"), console)
+
+    data = load_json(mock_data.NEXT_UP_FILE)
+    assert len(data) == 150
+    assert list(data)[0] == "Two Sum"
+    assert "Added 150 problems from neetcode_150" in console.export_text()
+
+
+def test_nextup_import_starter_unknown_list(mock_data, console, load_json):
+    nextup.handle(SimpleNamespace(action="import-starter", name="blind_1000"), console)
+
+    assert load_json(mock_data.NEXT_UP_FILE) == {}
+    assert "Please choose a starter list: blind_75, neetcode_150" in console.export_text()
+
+
+def test_nextup_pop_move_and_tag(mock_data, console, load_json):
+    for name in ("A", "B", "C"):
+        nextup.handle(SimpleNamespace(action="add", name=name), console)
+    nextup.handle(SimpleNamespace(action="move", name="c", to=1, tags=[]), console)
+    nextup.handle(SimpleNamespace(action="tag", name="B", tags=["graphs"]), console)
+    nextup.handle(SimpleNamespace(action="list", tags=["graphs"]), console)
+    nextup.handle(SimpleNamespace(action="pop", count=2, tags=[]), console)
+
+    assert list(load_json(mock_data.NEXT_UP_FILE)) == ["B"]
+    output = console.export_text()
+    assert "Moved C to position 1" in output
+    assert "Tags of B: graphs" in output
+    assert "Next Up Problems (1)" in output
+    assert "Took 2 problem(s) off the Next Up Queue" in output
+    assert "• C" in output and "• A" in output
@@ -0,0 +1,39 @@
+from types import SimpleNamespace
+import pytest
+
+from srl import storage
+from srl.commands import reset
+
+
+def reset_args(**flags):
+    args = dict(all=False, progress=False, mastered=False, next_up=False, audit=False, yes=True)
+    return SimpleNamespace(**{**args, **flags})
+
+
+@pytest.mark.parametrize("backend", ["json", "sqlite", "eventlog"])
+def test_reset_all_clears_every_backend(backend, mock_data, dump_json, console):
+    dump_json(mock_data.CONFIG_FILE, {"storage_backend": backend})
+    storage.save_json(mock_data.PROGRESS_FILE, {"A": {"history": [{"rating": 3, "date": "2024-01-01"}]}})
+    storage.save_json(mock_data.MASTERED_FILE, {"B": {"history": [{"rating": 5, "date": "2024-01-01"}]}})
+    storage.save_json(mock_data.NEXT_UP_FILE, {"C": {}})
+
+    reset.handle(reset_args(all=True), console)
+
+    for file_path in (mock_data.PROGRESS_FILE, mock_data.MASTERED_FILE, mock_data.NEXT_UP_FILE):
+        assert storage.load_json(file_path) == {}
+    assert "Successfully reset 3 data file(s)." in console.export_text()
+
+
+def test_reset_selected_only(mock_data, console):
+    storage.save_json(mock_data.PROGRESS_FILE, {"A": {"history": []}})
+    storage.save_json(mock_data.NEXT_UP_FILE, {"C": {}})
+
+    reset.handle(reset_args(next_up=True), console)
+
+    assert storage.load_json(mock_data.NEXT_UP_FILE) == {}
+    assert list(storage.load_json(mock_data.PROGRESS_FILE)) == ["A"]
+
+
+def test_reset_without_data(mock_data, console):
+    reset.handle(reset_args(all=True), console)
+    assert "No data found to reset." in console.export_text()
@@ -0,0 +1,61 @@
+import sys
+import threading
+import pytest
+
+from srl import daemon, main
+
+
+@pytest.fixture
+def running_daemon(mock_data):
+    ready = threading.Event()
+    thread = threading.Thread(target=daemon.serve, kwargs={"ready": ready}, daemon=True)
+    thread.start()
+    assert ready.wait(5)
+    yield
+    daemon.stop()
+    thread.join(5)
+    assert not mock_data.DAEMON_SOCKET.exists()
+
+
+def run_srl(monkeypatch, *argv):
+    monkeypatch.setattr(sys, "argv", ["srl", *argv])
+    main.main()
+
+
+def test_commands_are_forwarded_to_the_daemon(
+    running_daemon, mock_data, load_json, monkeypatch, capsys
+):
+    # Fails loudly if the command runs in this process instead
+    monkeypatch.setattr(main, "build_parser", None)
+
+    run_srl(monkeypatch, "add", "Two Sum", "3")
+    run_srl(monkeypatch, "inprogress")
+
+    out, _ = capsys.readouterr()
+    assert "Two Sum" in out
+    assert "Two Sum" in load_json(mock_data.PROGRESS_FILE)
+    assert daemon.status()["served"] == 2
+
+
+def test_daemon_reports_usage_errors(running_daemon, monkeypatch, capsys):
+    with pytest.raises(SystemExit) as exc:
+        run_srl(monkeypatch, "add", "Two Sum", "9")
+
+    assert exc.value.code == 2
+    assert "usage:" in capsys.readouterr().err
+
+
+def test_falls_back_without_a_daemon(mock_data, load_json, monkeypatch):
+    # Left behind by a daemon that was killed
+    mock_data.DAEMON_SOCKET.touch()
+
+    run_srl(monkeypatch, "add", "Two Sum", "3")
+
+    assert "Two Sum" in load_json(mock_data.PROGRESS_FILE)
+
+
+def test_timed_commands_run_locally(running_daemon, monkeypatch, capsys):
+    run_srl(monkeypatch, "--timings", "inprogress")
+
+    assert "srl inprogress" in capsys.readouterr().err
+    assert daemon.status()["served"] == 0
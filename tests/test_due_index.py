@@ -0,0 +1,142 @@
+from datetime import date, timedelta
+from types import SimpleNamespace
+
+from srl import due_index, storage
+from srl.commands import add, audit, list_, remove
+
+
+def _days_ago(days):
+    return (date.today() - timedelta(days=days)).isoformat()
+
+
+def test_index_rebuilt_when_progress_edited(mock_data, dump_json, load_json):
+    dump_json(
+        mock_data.PROGRESS_FILE,
+        {"A": {"history": [{"rating": 1, "date": _days_ago(3)}]}},
+    )
+    assert list_.get_due_problems() == ["A"]
+
+    dump_json(
+        mock_data.PROGRESS_FILE,
+        {
+            "A": {"history": [{"rating": 1, "date": _days_ago(3)}]},
+            "B": {"history": [{"rating": 2, "date": _days_ago(5)}]},
+        },
+    )
+    assert list_.get_due_problems() == ["B", "A"]
+
+    index = load_json(mock_data.DUE_INDEX_FILE)
+    assert index["source"][1] == storage.get_backend().signature(mock_data.PROGRESS_FILE)
+
+
+def test_writes_update_index_incrementally(mock_data, console, load_json):
+    add.handle(SimpleNamespace(identifier="A", rating=3), console)
+    due_index.load()  # build once
+    logged = len(mock_data.DUE_INDEX_LOG_FILE.read_text().splitlines())
+
+    add.handle(SimpleNamespace(identifier="B", rating=1), console)
+    add.handle(SimpleNamespace(identifier="A", rating=5), console)
+    remove.handle(SimpleNamespace(identifier="B"), console)
+
+    incremental = due_index.load()
+    rebuilt = due_index.build(storage.get_backend())
+    assert incremental["rows"] == rebuilt["rows"]
+    assert incremental["source"] == rebuilt["source"]
+    # The writes were logged, not written into the base file
+    assert len(mock_data.DUE_INDEX_LOG_FILE.read_text().splitlines()) == logged + 3
+    assert "names" not in load_json(mock_data.DUE_INDEX_FILE)
+
+
+def test_audit_fail_adds_to_index(mock_data, console, dump_json):
+    dump_json(
+        mock_data.MASTERED_FILE,
+        {"M": {"history": [{"rating": 5, "date": _days_ago(10)}]}},
+    )
+    dump_json(mock_data.AUDIT_FILE, {"current_audit": "M"})
+    due_index.load()
+
+    audit.handle(SimpleNamespace(audit_pass=False, audit_fail=True), console)
+
+    assert due_index.last_ratings() == {"M": 1}
+
+
+def test_due_rows_order_and_limit(mock_data, dump_json):
+    dump_json(
+        mock_data.PROGRESS_FILE,
+        {
+            "p2": {"history": [{"rating": 2, "date": _days_ago(4)}]},
+            "p1": {"history": [{"rating": 2, "date": _days_ago(4)}]},
+            "low": {"history": [{"rating": 1, "date": _days_ago(4)}]},
+            "old": {"history": [{"rating": 5, "date": _days_ago(9)}]},
+            "later": {"history": [{"rating": 5, "date": _days_ago(1)}]},
+        },
+    )
+
+    # Ties keep insertion order, like the original scan
+    assert list_.get_due_problems() == ["old", "low", "p2", "p1"]
+    assert list_.get_due_problems(2) == ["old", "low"]
+    assert list_.mastery_candidates() == {"old", "later"}
+
+
+def test_load_balancing_flattens_spikes(mock_data, dump_json, console, load_json):
+    dump_json(mock_data.CONFIG_FILE, {"load_balance_days": 3})
+    for i in range(30):
+        add.handle(SimpleNamespace(identifier=f"S{i}", rating=4), console)
+    add.handle(SimpleNamespace(identifier="Hard", rating=1), console)
+    index = due_index.load()
+
+    # A 4-day interval may move one day either way; a 1-day interval stays put
+    assert sorted(index["load"].values()) == [1, 10, 10, 10]
+    assert set(index["load"]) == {_days_ago(-1), _days_ago(-3), _days_ago(-4), _days_ago(-5)}
+    assert index["names"]["Hard"][0] == _days_ago(-1)
+
+    # The day is stored with the entry, so a rebuild reads the same dates back
+    entry = load_json(mock_data.PROGRESS_FILE)["S1"]
+    assert entry["balance"] == {"due": _days_ago(-4), "on": index["names"]["S1"][0]}
+    assert due_index.build(storage.get_backend())["rows"] == index["rows"]
+
+
+def test_balanced_dates_survive_rebuilds(mock_data, dump_json, console):
+    progress = {
+        f"P{i}": {"history": [{"rating": 2 + i % 4, "date": _days_ago(i % 3)}]} for i in range(12)
+    }
+    dump_json(mock_data.PROGRESS_FILE, progress)
+    dump_json(mock_data.CONFIG_FILE, {"load_balance_days": 3})
+    before = {row[-1]: row[0] for row in due_index.load()["rows"]}
+
+    for name, rating in [("P0", 3), ("P5", 4), ("P6", 4), ("N1", 4), ("N2", 3)]:
+        add.handle(SimpleNamespace(identifier=name, rating=rating), console)
+    due = {row[-1]: row[0] for row in due_index.load()["rows"]}
+
+    # Problems not attempted kept their dates, and a rebuild (after a batch
+    # import, say) chooses none again
+    assert all(due[name] == before[name] for name in progress if name not in ("P0", "P5", "P6"))
+    assert {row[-1]: row[0] for row in due_index.build(storage.get_backend())["rows"]} == due
+
+
+def test_logged_changes_replayed_from_disk(mock_data, console, monkeypatch):
+    add.handle(SimpleNamespace(identifier="A", rating=3), console)
+    add.handle(SimpleNamespace(identifier="B", rating=1), console)
+    # A log line left by a base that has since been replaced is skipped
+    with open(mock_data.DUE_INDEX_LOG_FILE, "a") as f:
+        f.write('{"base": "old", "source": [], "next_seq": 9, "changes": [["A", null]]}\n')
+
+    # As a new process would see it
+    monkeypatch.setattr(due_index, "_loaded", {})
+    storage.invalidate()
+    index = due_index.load()
+
+    assert set(index["names"]) == {"A", "B"}
+    assert index["rows"] == due_index.build(storage.get_backend())["rows"]
+
+
+def test_log_folded_into_base_when_full(mock_data, console, load_json, monkeypatch):
+    monkeypatch.setattr(due_index, "LOG_LIMIT", 400)
+    for name in "ABCDEF":
+        add.handle(SimpleNamespace(identifier=name, rating=2), console)
+
+    base = load_json(mock_data.DUE_INDEX_FILE)
+    logged = mock_data.DUE_INDEX_LOG_FILE.read_text() if mock_data.DUE_INDEX_LOG_FILE.exists() else ""
+    assert base["rows"] and len(logged) <= 400
+    assert len(base["rows"]) + len(logged.splitlines()) == 6
+    assert [row[-1] for row in due_index.load()["rows"]] == list("ABCDEF")
@@ -0,0 +1,172 @@
+import json
+import threading
+from types import SimpleNamespace
+import pytest
+
+from srl import eventlog_backend, storage
+from srl.commands import add, audit, list_, nextup
+from srl.eventlog_backend import EventLogBackend
+
+
+@pytest.fixture
+def use_eventlog(mock_data, dump_json):
+    dump_json(mock_data.CONFIG_FILE, {"storage_backend": "eventlog"})
+    return mock_data
+
+
+def read_events(path):
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+def flatten(events):
+    """Expand the batches written by transactions into their events."""
+    return [inner for e in events for inner in (e["events"] if e["op"] == "batch" else [e])]
+
+
+def test_rating_appends_single_event(use_eventlog, console):
+    add.handle(SimpleNamespace(identifier="Two Sum", rating=3), console)
+    add.handle(SimpleNamespace(identifier="Two Sum", rating=4), console)
+
+    events = read_events(use_eventlog.EVENT_LOG_FILE)
+    assert [e["op"] for e in events] == ["put", "attempt"]
+    assert events[-1]["attempt"]["rating"] == 4
+
+    history = storage.get_entry(use_eventlog.PROGRESS_FILE, "Two Sum")["history"]
+    assert [a["rating"] for a in history] == [3, 4]
+
+
+def test_state_replayed_by_new_instance(use_eventlog, console):
+    add.handle(SimpleNamespace(identifier="A", rating=5), console)
+    add.handle(SimpleNamespace(identifier="A", rating=5), console)
+    nextup.handle(SimpleNamespace(action="add", name="B", allow_mastered=False), console)
+
+    fresh = EventLogBackend()
+    assert "A" in fresh.load(use_eventlog.MASTERED_FILE)
+    assert fresh.load(use_eventlog.PROGRESS_FILE) == {}
+    assert list(fresh.load(use_eventlog.NEXT_UP_FILE)) == ["B"]
+
+
+def test_audit_results_are_appended(use_eventlog, console):
+    storage.save_json(
+        use_eventlog.MASTERED_FILE,
+        {"M": {"history": [{"rating": 5, "date": "2024-01-01"}]}},
+    )
+    for _ in range(2):
+        audit.handle(SimpleNamespace(audit_pass=False, audit_fail=False), console)
+        audit.handle(SimpleNamespace(audit_pass=True, audit_fail=False), console)
+
+    events = flatten(read_events(use_eventlog.EVENT_LOG_FILE))
+    appended = [e for e in events if e["op"] == "append" and e["name"] == "history"]
+    assert appended[-1]["item"]["result"] == "pass"
+    assert len(storage.load_json(use_eventlog.AUDIT_FILE)["history"]) == 2
+
+
+def test_compact_folds_log_into_snapshot(use_eventlog, console, load_json):
+    add.handle(SimpleNamespace(identifier="A", rating=1), console)
+    add.handle(SimpleNamespace(identifier="B", rating=2), console)
+
+    backend = storage.get_backend()
+    assert backend.compact() == 2
+    assert use_eventlog.EVENT_LOG_FILE.read_text() == ""
+    assert set(load_json(use_eventlog.SNAPSHOT_FILE)["docs"]["progress"]) == {"A", "B"}
+
+    add.handle(SimpleNamespace(identifier="A", rating=3), console)
+    fresh = EventLogBackend()
+    assert [a["rating"] for a in fresh.load(use_eventlog.PROGRESS_FILE)["A"]["history"]] == [1, 3]
+
+
+def test_replay_skips_events_already_in_snapshot(use_eventlog, console):
+    add.handle(SimpleNamespace(identifier="A", rating=1), console)
+    log = use_eventlog.EVENT_LOG_FILE.read_text()
+
+    storage.get_backend().compact()
+    # Simulate a crash after the snapshot was written but before the log was reset
+    use_eventlog.EVENT_LOG_FILE.write_text(log)
+
+    fresh = EventLogBackend()
+    assert len(fresh.load(use_eventlog.PROGRESS_FILE)["A"]["history"]) == 1
+
+
+def test_torn_last_line_is_ignored(use_eventlog, console):
+    add.handle(SimpleNamespace(identifier="A", rating=1), console)
+    with open(use_eventlog.EVENT_LOG_FILE, "a") as f:
+        f.write('{"op": "attempt", "doc"')
+
+    add.handle(SimpleNamespace(identifier="A", rating=2), console)
+
+    fresh = EventLogBackend()
+    assert [a["rating"] for a in fresh.load(use_eventlog.PROGRESS_FILE)["A"]["history"]] == [1, 2]
+
+
+def test_line_completed_after_refresh_is_applied(use_eventlog):
+    reader = EventLogBackend()
+    reader.put_entry(use_eventlog.NEXT_UP_FILE, "A", {})
+    EventLogBackend().put_entry(use_eventlog.NEXT_UP_FILE, "B", {})
+
+    # The reader refreshes while B's line is only half written
+    raw = use_eventlog.EVENT_LOG_FILE.read_bytes()
+    cut = raw.rfind(b"\n", 0, len(raw) - 1) + 10
+    use_eventlog.EVENT_LOG_FILE.write_bytes(raw[:cut])
+    assert list(reader.view(use_eventlog.NEXT_UP_FILE)) == ["A"]
+    with open(use_eventlog.EVENT_LOG_FILE, "ab") as f:
+        f.write(raw[cut:])
+
+    reader.put_entry(use_eventlog.NEXT_UP_FILE, "C", {})
+    assert [e["seq"] for e in read_events(use_eventlog.EVENT_LOG_FILE)] == [1, 2, 3]
+    assert list(EventLogBackend().load(use_eventlog.NEXT_UP_FILE)) == ["A", "B", "C"]
+
+
+def test_list_reads_materialized_state(use_eventlog, monkeypatch):
+    monkeypatch.setattr(list_, "should_audit", lambda: False)
+    storage.save_json(
+        use_eventlog.PROGRESS_FILE,
+        {"Old": {"history": [{"rating": 1, "date": "2024-01-01"}]}},
+    )
+    assert list_.get_due_problems() == ["Old"]
+
+
+def test_mastery_move_is_one_batch(use_eventlog, console):
+    add.handle(SimpleNamespace(identifier="A", rating=5), console)
+    add.handle(SimpleNamespace(identifier="A", rating=5), console)
+
+    events = read_events(use_eventlog.EVENT_LOG_FILE)
+    assert events[-1]["op"] == "batch"
+    assert {(e["op"], e["doc"]) for e in events[-1]["events"]} == {
+        ("put", "mastered"),
+        ("delete", "progress"),
+    }
+
+
+def test_reordered_document_keeps_its_order(use_eventlog):
+    storage.save_json(use_eventlog.NEXT_UP_FILE, {name: {} for name in "ABCDEFGHIJ"})
+    storage.save_json(use_eventlog.NEXT_UP_FILE, {name: {} for name in "BACDEFGHIJ"})
+
+    assert list(EventLogBackend().load(use_eventlog.NEXT_UP_FILE)) == list("BACDEFGHIJ")
+
+
+def test_compact_waits_for_writers(use_eventlog, console):
+    add.handle(SimpleNamespace(identifier="A", rating=1), console)
+    backend = storage.get_backend()
+
+    with storage.data_lock():
+        compacting = threading.Thread(target=backend.compact)
+        compacting.start()
+        compacting.join(0.2)
+        assert compacting.is_alive()
+        # Appended while compact waits: must end up in the snapshot, not be lost
+        add.handle(SimpleNamespace(identifier="B", rating=2), console)
+    compacting.join()
+
+    fresh = EventLogBackend()
+    assert set(fresh.load(use_eventlog.PROGRESS_FILE)) == {"A", "B"}
+    assert use_eventlog.EVENT_LOG_FILE.read_text() == ""
+
+
+def test_large_replace_is_compacted_right_away(use_eventlog, monkeypatch):
+    monkeypatch.setattr(eventlog_backend, "AUTO_COMPACT_BYTES", 4096)
+    progress = {f"P{i}": {"history": [{"rating": 3, "date": "2024-01-01"}]} for i in range(100)}
+
+    storage.save_json(use_eventlog.PROGRESS_FILE, progress)
+
+    assert use_eventlog.EVENT_LOG_FILE.read_text() == ""
+    assert len(EventLogBackend().load(use_eventlog.PROGRESS_FILE)) == 100
@@ -55,3 +55,16 @@ def test_main_calls_ensure_data_dir(monkeypatch):
     main.main()
 
     assert called["called"] is True
+
+
+def test_main_reports_timings(monkeypatch, capsys, tmp_path):
+    profile = tmp_path / "srl.prof"
+    monkeypatch.setattr(sys, "argv", ["prog", "--profile", str(profile), "mastered", "-c"])
+
+    main.main()
+
+    out, err = capsys.readouterr()
+    assert "Mastered Count" in out
+    assert "srl mastered" in err
+    assert "compute" in err and "render" in err
+    assert profile.exists()
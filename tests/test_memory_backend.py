@@ -0,0 +1,95 @@
+from types import SimpleNamespace
+import time
+import pytest
+from fastapi.testclient import TestClient
+
+from srl import server as server_mod
+from srl import storage
+from srl.commands import add, list_
+from srl.memory_backend import MemoryBackend
+from srl.server import create_app
+
+
+@pytest.fixture
+def engine(mock_data):
+    engine = MemoryBackend(storage.get_backend(), delay=60)
+    storage.use_backend(engine)
+    yield engine
+    storage.use_backend(None)
+    engine.close()
+
+
+def test_writes_are_deferred_until_close(engine, mock_data, console, load_json):
+    add.handle(SimpleNamespace(identifier="A", rating=1), console)
+
+    assert storage.get_entry(mock_data.PROGRESS_FILE, "A")["history"][0]["rating"] == 1
+    assert load_json(mock_data.PROGRESS_FILE) == {}
+    assert engine.pending() == 1
+
+    engine.close()
+    assert "A" in load_json(mock_data.PROGRESS_FILE)
+    assert engine.pending() == 0
+
+
+def test_background_flush_after_quiet_period(engine, mock_data, console, load_json):
+    engine.delay = 0.01
+    add.handle(SimpleNamespace(identifier="A", rating=1), console)
+    add.handle(SimpleNamespace(identifier="B", rating=2), console)
+
+    deadline = time.monotonic() + 5
+    while engine.pending() and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    assert set(load_json(mock_data.PROGRESS_FILE)) == {"A", "B"}
+
+
+def test_failed_transaction_is_undone(engine, mock_data):
+    storage.put_entry(mock_data.PROGRESS_FILE, "A", {"history": []})
+
+    with pytest.raises(RuntimeError):
+        with storage.transaction():
+            storage.delete_entry(mock_data.PROGRESS_FILE, "A")
+            storage.put_entry(mock_data.MASTERED_FILE, "A", {"history": []})
+            raise RuntimeError("interrupted")
+
+    assert storage.get_entry(mock_data.PROGRESS_FILE, "A") == {"history": []}
+    assert storage.get_entry(mock_data.MASTERED_FILE, "A") is None
+
+
+def test_external_changes_are_picked_up(engine, mock_data, dump_json):
+    assert list_.get_due_problems() == []
+
+    dump_json(
+        mock_data.PROGRESS_FILE,
+        {"A": {"history": [{"rating": 1, "date": "2024-01-01"}]}},
+    )
+
+    assert list_.get_due_problems() == ["A"]
+
+
+def test_server_flushes_on_shutdown(mock_data, load_json, monkeypatch):
+    monkeypatch.setattr(server_mod, "parser", None)
+
+    with TestClient(create_app(flush_delay=60)) as client:
+        resp = client.post("/run", json={"argv": ["add", "Two Sum", "3"]})
+        assert resp.status_code == 200
+        assert load_json(mock_data.PROGRESS_FILE) == {}
+
+        resp = client.post("/run", json={"argv": ["inprogress"]})
+        assert "Two Sum" in resp.json()["output"]
+
+    assert "Two Sum" in load_json(mock_data.PROGRESS_FILE)
+
+
+def test_flush_merges_changes_from_other_processes(engine, mock_data, load_json):
+    storage.put_entry(mock_data.NEXT_UP_FILE, "A", {})
+    engine.flush()
+
+    storage.put_entry(mock_data.NEXT_UP_FILE, "B", {})
+    # Another process adds "C" while "B" is still pending in memory
+    storage.write_json_file(mock_data.NEXT_UP_FILE, {"A": {}, "C": {}})
+
+    engine.flush()
+
+    assert set(load_json(mock_data.NEXT_UP_FILE)) == {"A", "B", "C"}
+    assert set(storage.load_json(mock_data.NEXT_UP_FILE)) == {"A", "B", "C"}
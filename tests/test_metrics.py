@@ -0,0 +1,48 @@
+from srl import metrics, storage
+
+
+def test_counter_and_histogram_rendering():
+    counter = metrics.Counter("test_events_total", "Events", ("kind",))
+    histogram = metrics.Histogram("test_seconds", "Durations", buckets=(0.1, 1.0))
+    try:
+        counter.inc('say "hi"')
+        counter.inc('say "hi"', amount=2)
+        histogram.observe(0.05)
+        histogram.observe(0.5)
+        histogram.observe(5)
+
+        text = metrics.render([counter, histogram])
+    finally:
+        metrics.REGISTRY.remove(counter)
+        metrics.REGISTRY.remove(histogram)
+
+    assert text.splitlines() == [
+        "# HELP test_events_total Events",
+        "# TYPE test_events_total counter",
+        'test_events_total{kind="say \\"hi\\""} 3',
+        "# HELP test_seconds Durations",
+        "# TYPE test_seconds histogram",
+        'test_seconds_bucket{le="0.1"} 1',
+        'test_seconds_bucket{le="1"} 2',
+        'test_seconds_bucket{le="+Inf"} 3',
+        "test_seconds_sum 5.55",
+        "test_seconds_count 3",
+    ]
+
+
+def test_storage_reads_writes_and_cache(mock_data):
+    read = metrics.STORAGE_READ_BYTES.value()
+    writes = metrics.STORAGE_WRITES.value()
+    written = metrics.STORAGE_WRITE_BYTES.value()
+    hits = metrics.CACHE_REQUESTS.value("parse", "hit")
+
+    storage.save_json(mock_data.PROGRESS_FILE, {"Two Sum": {"history": []}})
+    storage.invalidate()
+    storage.view_json(mock_data.PROGRESS_FILE)
+    storage.view_json(mock_data.PROGRESS_FILE)
+
+    assert metrics.STORAGE_WRITES.value() == writes + 1
+    assert metrics.STORAGE_WRITE_BYTES.value() == written + mock_data.PROGRESS_FILE.stat().st_size
+    # Config is read back too, after the cache is dropped
+    assert metrics.STORAGE_READ_BYTES.value() >= read + mock_data.PROGRESS_FILE.stat().st_size
+    assert metrics.CACHE_REQUESTS.value("parse", "hit") > hits
@@ -0,0 +1,114 @@
+from types import SimpleNamespace
+
+from srl import next_up_queue, storage
+from srl.commands import list_, nextup
+from srl.next_up_queue import NextUpQueue
+
+
+def queued(names):
+    queue = NextUpQueue.load()
+    for name in names:
+        queue.push(name, {"added": "2024-01-01"})
+    queue.save()
+    return queue
+
+
+def test_push_orders_by_priority_then_position(mock_data, load_json):
+    queue = queued(["A", "B"])
+    queue.push("C", {}, priority=2)
+    queue.push("D", {}, front=True)
+    queue.push("E", {}, priority=2)
+    queue.push("F", {}, front=True, priority=5)
+    queue.save()
+
+    assert list(queue) == ["F", "C", "E", "D", "A", "B"]
+    stored = load_json(mock_data.NEXT_UP_FILE)
+    # Stored in queue order with positions renumbered
+    assert list(stored) == ["F", "C", "E", "D", "A", "B"]
+    assert [entry["position"] for entry in stored.values()] == list(range(6))
+    assert next_up_queue.head(2) == ["F", "C"]
+
+
+def test_append_writes_single_entry(mock_data, monkeypatch):
+    queued(["A", "B"])
+    saves = []
+    monkeypatch.setattr(next_up_queue, "save_json", lambda *a: saves.append(a))
+
+    queue = NextUpQueue.load()
+    queue.push("C", {})
+    queue.save()
+
+    assert saves == []
+    assert list(NextUpQueue.load()) == ["A", "B", "C"]
+    assert storage.get_entry(mock_data.NEXT_UP_FILE, "C")["position"] == 2
+
+
+def test_pop_move_and_tag(mock_data):
+    queue = queued(["A", "B", "C", "D"])
+
+    assert [name for name, _ in queue.pop(2)] == ["A", "B"]
+    assert queue.move("d", 0) == "D"
+    assert queue.tag("c", ["graphs", "dp"]) == "C"
+    assert queue.tag("c", ["dp"], remove=True) == "C"
+    assert queue.move("Missing", 0) is None
+    queue.save()
+
+    queue = NextUpQueue.load()
+    assert [(name, entry.get("tags")) for name, entry in queue.items()] == [
+        ("D", None),
+        ("C", ["graphs"]),
+    ]
+
+
+def test_move_takes_neighbouring_priority(mock_data):
+    queue = queued(["A", "B"])
+    queue.push("P", {}, priority=3)
+
+    queue.move("B", 0)
+    assert list(queue) == ["B", "P", "A"]
+    assert queue.get("B")["priority"] == 3
+    queue.move("B", 2)
+    assert "priority" not in queue.get("B")
+
+
+def test_documents_without_positions_keep_their_order(mock_data, dump_json):
+    dump_json(mock_data.NEXT_UP_FILE, {"X": {"added": "2024-01-01"}, "Y": {}})
+
+    queue = NextUpQueue.load()
+    queue.push("Z", {})
+    queue.save()
+
+    assert list(NextUpQueue.load()) == ["X", "Y", "Z"]
+    assert storage.get_entry(mock_data.NEXT_UP_FILE, "Z")["position"] == 2
+
+
+def test_out_of_order_document_is_repaired(mock_data, dump_json, load_json):
+    dump_json(mock_data.NEXT_UP_FILE, {"B": {"position": 5}, "A": {"position": 1}})
+
+    queue = NextUpQueue.load()
+    assert list(queue) == ["A", "B"]
+    queue.push("C", {})
+    queue.save()
+
+    assert list(load_json(mock_data.NEXT_UP_FILE)) == ["A", "B", "C"]
+
+
+def test_list_falls_back_to_head_of_queue(mock_data, console):
+    queued(["A", "B", "C", "D"])
+    nextup.handle(SimpleNamespace(action="add", name="Urgent", front=True), console)
+
+    assert list_.get_due_problems() == ["Urgent", "A", "B"]
+
+
+def test_entries_that_are_not_objects(mock_data, dump_json, load_json, console):
+    dump_json(mock_data.NEXT_UP_FILE, {"A": None, "B": "x", "C": {"priority": 1}})
+
+    nextup.handle(SimpleNamespace(action="list"), console)
+    assert "Next Up Problems (3)" in console.export_text()
+
+    queue = NextUpQueue.load()
+    assert list(queue) == ["C", "A", "B"]
+    queue.move("B", 0)
+    queue.save()
+    assert list(load_json(mock_data.NEXT_UP_FILE)) == ["B", "C", "A"]
+    assert load_json(mock_data.NEXT_UP_FILE)["A"] == {"position": 2}
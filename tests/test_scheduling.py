@@ -0,0 +1,126 @@
+from datetime import date, timedelta
+from types import SimpleNamespace
+import random
+import pytest
+
+from srl import storage
+from srl.commands import add, config, list_
+from srl.scheduling import get_scheduler, SCHEDULERS
+
+TODAY = date.today()
+
+
+def _days_ago(days):
+    return (TODAY - timedelta(days=days)).isoformat()
+
+
+def _use(scheduler, console):
+    config.handle(SimpleNamespace(scheduler=scheduler), console)
+
+
+def test_default_matches_original_rule(mock_data, dump_json):
+    rng = random.Random(7)
+    progress = {
+        f"P{i}": {
+            "history": [
+                {"rating": rng.randint(1, 5), "date": _days_ago(rng.randint(0, 12))}
+                for _ in range(rng.randint(1, 4))
+            ]
+        }
+        for i in range(50)
+    }
+    dump_json(mock_data.PROGRESS_FILE, progress)
+
+    # The rule get_due_problems applied before schedulers existed
+    due = []
+    for seq, (name, entry) in enumerate(progress.items()):
+        last = entry["history"][-1]
+        last_date = date.fromisoformat(last["date"])
+        if last_date + timedelta(days=last["rating"]) <= TODAY:
+            due.append((last_date, last["rating"], seq, name))
+    assert list_.get_due_problems() == [name for *_, name in sorted(due)]
+    assert list_.mastery_candidates() == {
+        name for name, e in progress.items() if e["history"][-1]["rating"] == 5
+    }
+
+
+def test_default_masters_after_two_fives_and_stores_no_state(mock_data, console, load_json):
+    scheduler = get_scheduler()
+    assert scheduler.name == "default"
+
+    for rating, mastered in [(5, False), (4, False), (5, False), (5, True)]:
+        add.handle(SimpleNamespace(identifier="A", rating=rating), console)
+        assert ("A" in load_json(mock_data.MASTERED_FILE)) == mastered
+
+    assert load_json(mock_data.MASTERED_FILE)["A"] == {
+        "history": [{"rating": r, "date": TODAY.isoformat()} for r in (5, 4, 5, 5)]
+    }
+
+
+def test_sm2_intervals():
+    sm2 = SCHEDULERS["sm2"]
+    state = None
+    intervals = []
+    for rating in (5, 5, 5, 5):
+        state = sm2.review(state, rating, TODAY)
+        intervals.append(state["interval"])
+    assert intervals == [1, 6, 16, 45]
+    assert sm2.is_mastered([], state)
+
+    lapsed = sm2.review(state, 1, TODAY)
+    assert (lapsed["interval"], lapsed["repetitions"]) == (1, 0)
+    assert lapsed["ease"] < state["ease"]
+
+
+def test_fsrs_grows_stability_with_recall():
+    fsrs = SCHEDULERS["fsrs"]
+    good = fsrs.review(None, 3, TODAY)
+    assert good["interval"] == 4
+    assert fsrs.review(None, 1, TODAY)["stability"] < good["stability"]
+
+    on = date.fromisoformat(good["due"])
+    again = fsrs.review(good, 1, on)
+    easy = fsrs.review(good, 5, on)
+    assert again["stability"] < good["stability"] < easy["stability"]
+    assert again["difficulty"] > good["difficulty"] > easy["difficulty"]
+    assert not fsrs.is_mastered([], good)
+    assert fsrs.is_mastered([], fsrs.review(easy, 5, date.fromisoformat(easy["due"])))
+
+
+@pytest.mark.parametrize("backend", ["json", "sqlite", "eventlog"])
+@pytest.mark.parametrize("name", ["sm2", "fsrs"])
+def test_state_is_stored_on_each_attempt(name, backend, mock_data, console, dump_json):
+    dump_json(mock_data.CONFIG_FILE, {"storage_backend": backend})
+    _use(name, console)
+
+    add.handle(SimpleNamespace(identifier="A", rating=3), console)
+    add.handle(SimpleNamespace(identifier="A", rating=4), console)
+
+    entry = storage.get_entry(mock_data.PROGRESS_FILE, "A")
+    scheduler = get_scheduler()
+    assert entry["schedule"]["reviews"] == 2
+    assert entry["schedule"] == scheduler.replay(entry["history"])
+    assert list_.get_due_problems() == []
+
+
+def test_due_lookups_use_stored_state(mock_data, console, dump_json):
+    _use("sm2", console)
+    # Stored state wins over replaying the history while it covers every attempt
+    state = {"scheduler": "sm2", "due": _days_ago(1), "last": _days_ago(2), "interval": 1,
+             "reviews": 1, "ease": 2.5, "repetitions": 1}
+    dump_json(
+        mock_data.PROGRESS_FILE,
+        {
+            "Stored": {"history": [{"rating": 5, "date": TODAY.isoformat()}], "schedule": state},
+            # Attempts made since the state was stored are replayed
+            "Stale": {
+                "history": [{"rating": 1, "date": _days_ago(10)}, {"rating": 1, "date": _days_ago(5)}],
+                "schedule": state,
+            },
+        },
+    )
+
+    assert list_.get_due_problems() == ["Stale", "Stored"]
+
+    _use("default", console)
+    assert list_.get_due_problems() == ["Stale"]
@@ -1,4 +1,6 @@
 from types import SimpleNamespace
+import threading
+import time
 from fastapi.testclient import TestClient
 
 from srl import server as server_mod
@@ -54,3 +56,157 @@ def test_run_handler_exception_returns_500():
     body = resp.json()
     assert "error" in body
     assert "Error executing handler" in body["error"]
+
+
+class HandlerParser:
+    """Parser stub dispatching argv[0] to one of the given handlers."""
+
+    def __init__(self, **handlers):
+        self.handlers = handlers
+
+    def parse_args(self, argv):
+        return SimpleNamespace(handler=self.handlers[argv[0]])
+
+    def print_help(self, file=None):
+        if file:
+            file.write("fake help\n")
+
+
+def test_slow_handler_does_not_block_other_requests(monkeypatch):
+    released = threading.Event()
+
+    def slow(args, console):
+        console.print("released" if released.wait(5) else "blocked")
+
+    def fast(args, console):
+        released.set()
+        console.print("fast")
+
+    monkeypatch.setattr(server_mod, "parser", HandlerParser(slow=slow, fast=fast))
+
+    with TestClient(create_app()) as client:
+        results = {}
+        worker = threading.Thread(
+            target=lambda: results.update(slow=client.post("/run", json={"argv": ["slow"]}))
+        )
+        worker.start()
+        assert client.post("/run", json={"argv": ["fast"]}).json()["output"].strip() == "fast"
+        worker.join()
+
+    assert results["slow"].json()["output"].strip() == "released"
+
+
+def test_handler_timeout_returns_504(monkeypatch):
+    monkeypatch.setattr(
+        server_mod, "parser", HandlerParser(sleep=lambda args, console: time.sleep(0.5))
+    )
+
+    with TestClient(create_app(timeout=0.1)) as client:
+        resp = client.post("/run", json={"argv": ["sleep"]})
+
+    assert resp.status_code == 504
+    assert resp.json()["error"] == "Command timed out"
+
+
+def test_api_attempts_and_queries(backdate_problem):
+    client = TestClient(create_app())
+
+    resp = client.post("/attempts", json={"name": "Two Sum", "rating": 1})
+    assert resp.status_code == 201
+    assert resp.json() == {"name": "Two Sum", "rating": 1, "mastered": False}
+    backdate_problem("Two Sum", 1)
+
+    due = client.get("/due").json()
+    assert due["problems"] == [{"name": "Two Sum", "url": None, "mastery_attempt": False}]
+    assert client.get("/inprogress").json()["problems"][0]["name"] == "Two Sum"
+
+    entries = client.get("/history", params={"limit": 5}).json()["entries"]
+    assert [(e["problem"], e["rating"], e["status"]) for e in entries] == [
+        ("Two Sum", 1, "In Progress")
+    ]
+    assert client.get("/history", params={"since": "2999-01-01"}).json()["entries"] == []
+    assert client.get("/history", params={"since": "soon"}).status_code == 422
+    assert sum(client.get("/calendar").json()["counts"].values()) == 1
+
+    days = client.get("/forecast", params={"days": 3}).json()["days"]
+    assert [day["due"] for day in days] == [1, 0, 0]
+    assert client.get("/forecast", params={"days": 0}).status_code == 422
+
+
+def test_api_mastery_and_invalid_rating():
+    client = TestClient(create_app())
+
+    assert client.post("/attempts", json={"name": "A", "rating": 6}).status_code == 422
+
+    client.post("/attempts", json={"name": "A", "rating": 5})
+    resp = client.post("/attempts", json={"name": "a", "rating": 5})
+    assert resp.json() == {"name": "A", "rating": 5, "mastered": True}
+
+    mastered = client.get("/mastered").json()["problems"]
+    assert [(p["name"], p["attempts"]) for p in mastered] == [("A", 2)]
+
+
+def test_api_attempts_resolve_identifiers(backdate_problem):
+    client = TestClient(create_app())
+    client.post("/attempts", json={"name": "Two Sum", "rating": 1})
+    backdate_problem("Two Sum", 1)
+
+    resp = client.post("/attempts", json={"name": "1", "rating": 2})
+    assert resp.json() == {"name": "Two Sum", "rating": 2, "mastered": False}
+    assert client.post("/attempts", json={"name": "7", "rating": 2}).status_code == 400
+
+    url = "https://leetcode.com/problems/valid-anagram/"
+    resp = client.post("/attempts", json={"name": url, "rating": 3})
+    assert resp.json()["name"] == "Valid Anagram"
+    problems = client.get("/inprogress").json()["problems"]
+    assert [p["name"] for p in problems] == ["Two Sum", "Valid Anagram"]
+
+
+def test_api_nextup():
+    client = TestClient(create_app())
+
+    resp = client.post("/nextup", json={"name": "Sliding Window Maximum"})
+    assert resp.status_code == 201
+    assert resp.json()["status"] == "added"
+
+    resp = client.post("/nextup", json={"name": "Sliding Window Maximum"})
+    assert resp.status_code == 409
+    assert resp.json()["status"] == "queued"
+
+    assert client.get("/nextup").json()["problems"] == [
+        {"name": "Sliding Window Maximum", "url": None}
+    ]
+
+
+def test_responses_carry_server_timing(monkeypatch):
+    # Built afresh: other tests leave a stub parser behind
+    monkeypatch.setattr(server_mod, "parser", None)
+    client = TestClient(create_app())
+
+    resp = client.post("/run", json={"cmd": "inprogress"})
+    metrics = [metric.split(";")[0] for metric in resp.headers["Server-Timing"].split(", ")]
+    assert "compute" in metrics and "render" in metrics
+    assert metrics[-1] == "total"
+
+    assert "total;dur=" in client.get("/due").headers["Server-Timing"]
+
+
+def test_metrics_endpoint():
+    with TestClient(create_app()) as client:
+        client.post("/attempts", json={"name": "Two Sum", "rating": 3})
+        client.post("/nextup", json={"name": "Jump Game"})
+        client.get("/due")
+        client.get("/no-such-page")
+
+        resp = client.get("/metrics")
+
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("text/plain")
+    lines = resp.text.splitlines()
+    assert 'srl_problems{collection="in_progress"} 1' in lines
+    assert 'srl_problems{collection="next_up"} 1' in lines
+    assert any(line.startswith('srl_http_requests_total{method="GET",path="/due",status="200"}') for line in lines)
+    assert any(line.startswith('srl_http_requests_total{method="GET",path="other",status="404"}') for line in lines)
+    assert any(line.startswith('srl_http_request_duration_seconds_count{method="POST",path="/attempts"}') for line in lines)
+    assert any(line.startswith("srl_storage_reads_total ") for line in lines)
+    assert any(line.startswith('srl_cache_requests_total{cache="memory"') for line in lines)
@@ -0,0 +1,142 @@
+import sqlite3
+from types import SimpleNamespace
+import pytest
+
+from srl import next_up_queue, storage
+from srl.commands import add, list_, history, calendar, audit
+from srl.sqlite_backend import SqliteBackend
+
+
+@pytest.fixture
+def use_sqlite(mock_data, dump_json):
+    dump_json(mock_data.CONFIG_FILE, {"storage_backend": "sqlite"})
+    return mock_data
+
+
+def test_get_backend_defaults_to_json():
+    assert storage.get_backend().name == "json"
+
+
+def test_get_backend_reads_config(use_sqlite):
+    backend = storage.get_backend()
+    assert isinstance(backend, SqliteBackend)
+    assert backend.db_path == use_sqlite.DB_FILE
+
+
+def test_add_writes_rows_not_json(use_sqlite, console, load_json):
+    add.handle(SimpleNamespace(identifier="Two Sum", rating=3), console)
+    add.handle(SimpleNamespace(identifier="two sum", rating=4), console)
+
+    # JSON files are untouched when SQLite is active
+    assert load_json(use_sqlite.PROGRESS_FILE) == {}
+
+    conn = sqlite3.connect(use_sqlite.DB_FILE)
+    ratings = conn.execute(
+        "SELECT rating FROM attempts WHERE status = 'progress' AND name = 'Two Sum' ORDER BY id"
+    ).fetchall()
+    assert ratings == [(3,), (4,)]
+
+
+def test_mastery_moves_rows(use_sqlite, console):
+    args = SimpleNamespace(identifier="Climbing Stairs", rating=5)
+    add.handle(args, console)
+    add.handle(args, console)
+
+    assert storage.get_entry(use_sqlite.PROGRESS_FILE, "Climbing Stairs") is None
+    mastered = storage.get_entry(use_sqlite.MASTERED_FILE, "Climbing Stairs")
+    assert [a["rating"] for a in mastered["history"]] == [5, 5]
+
+
+def test_due_history_and_calendar_queries(use_sqlite, today_string):
+    storage.save_json(
+        use_sqlite.PROGRESS_FILE,
+        {
+            "Old": {"history": [{"rating": 1, "date": "2024-01-01"}]},
+            "Fresh": {"history": [{"rating": 5, "date": today_string}]},
+        },
+    )
+    storage.save_json(
+        use_sqlite.MASTERED_FILE,
+        {"Done": {"history": [{"rating": 5, "date": "2024-01-01"}]}},
+    )
+
+    assert list_.get_due_problems() == ["Old"]
+    assert [e["problem"] for e in history.get_history(2)] == ["Fresh", "Done"]
+    assert [e["problem"] for e in history.get_history(5, until="2024-01-01")] == ["Done", "Old"]
+    assert [e["problem"] for e in history.get_history(5, problem="old")] == ["Old"]
+    assert calendar.get_all_date_counts()["2024-01-01"] == 2
+
+
+def test_history_filters_match_timestamps_and_slugs(use_sqlite):
+    progress = {"Two Sum": {"history": [{"rating": 3, "date": "2024-01-03T21:15:00"}]}}
+    storage.save_json(use_sqlite.PROGRESS_FILE, progress)
+
+    entries = history.get_history(10, since="2024-01-03", until="2024-01-03", problem="two-sum")
+    assert [(e["problem"], e["rating"]) for e in entries] == [("Two Sum", 3)]
+    assert history.get_history(10, until="2024-01-02") == []
+    assert history.get_history(10, since="2024-01-04") == []
+
+
+def test_save_round_trips_documents(use_sqlite):
+    progress = {
+        "A": {"history": [{"rating": 2, "date": "2024-01-01"}], "url": "https://x"},
+        "B": {"history": []},
+    }
+    storage.save_json(use_sqlite.PROGRESS_FILE, progress)
+    assert storage.load_json(use_sqlite.PROGRESS_FILE) == progress
+
+    del progress["A"]
+    storage.save_json(use_sqlite.PROGRESS_FILE, progress)
+    assert storage.load_json(use_sqlite.PROGRESS_FILE) == progress
+
+    next_up = {"C": {"added": "2024-01-01"}}
+    storage.save_json(use_sqlite.NEXT_UP_FILE, next_up)
+    assert storage.load_json(use_sqlite.NEXT_UP_FILE) == next_up
+
+
+def test_audit_document(use_sqlite, console):
+    storage.save_json(
+        use_sqlite.MASTERED_FILE,
+        {"Problem": {"history": [{"rating": 5, "date": "2024-01-01"}]}},
+    )
+
+    audit.handle(SimpleNamespace(audit_pass=False, audit_fail=False), console)
+    assert audit.get_current_audit() == "Problem"
+
+    audit.handle(SimpleNamespace(audit_pass=True, audit_fail=False), console)
+    data = storage.load_json(use_sqlite.AUDIT_FILE)
+    assert "current_audit" not in data
+    assert data["history"][0]["result"] == "pass"
+
+
+def test_find_name_uses_normalized_key(use_sqlite):
+    storage.put_entry(use_sqlite.PROGRESS_FILE, "Two Sum", {"history": []})
+    storage.put_entry(use_sqlite.NEXT_UP_FILE, "Valid Anagram", {})
+
+    assert storage.find_name(use_sqlite.PROGRESS_FILE, "two-sum") == "Two Sum"
+    assert storage.find_name(use_sqlite.MASTERED_FILE, "two-sum") is None
+    assert storage.find_name(use_sqlite.NEXT_UP_FILE, "VALID ANAGRAM") == "Valid Anagram"
+
+
+def test_key_column_added_to_existing_database(use_sqlite):
+    conn = sqlite3.connect(use_sqlite.DB_FILE)
+    conn.executescript(
+        """
+        CREATE TABLE problems (status TEXT, name TEXT, url TEXT, extra TEXT, PRIMARY KEY (status, name));
+        CREATE TABLE next_up (name TEXT PRIMARY KEY, data TEXT NOT NULL);
+        INSERT INTO problems VALUES ('progress', 'Two Sum', NULL, NULL);
+        """
+    )
+    conn.close()
+
+    assert storage.find_name(use_sqlite.PROGRESS_FILE, "two sum") == "Two Sum"
+
+
+def test_next_up_head_reads_only_first_rows(use_sqlite, monkeypatch):
+    storage.save_json(use_sqlite.NEXT_UP_FILE, {name: {"position": i} for i, name in enumerate("ABCD")})
+
+    def load(self, file_path):
+        raise AssertionError("whole document loaded")
+
+    monkeypatch.setattr(SqliteBackend, "load", load)
+    assert next_up_queue.head(2) == ["A", "B"]
@@ -0,0 +1,82 @@
+import os
+import subprocess
+import sys
+import pytest
+
+import srl
+
+ROOT = os.path.dirname(os.path.dirname(srl.__file__))
+
+RUN = """
+import sys
+sys.argv = ["srl", *sys.argv[1:]]
+from srl.main import main
+main()
+print("\\n".join(sorted(sys.modules)))
+"""
+
+
+def cold_start(argv, tmp_path) -> tuple[set[str], int]:
+    """
+    Run `srl <argv>` in a fresh interpreter under -X importtime.
+    Returns the modules loaded and the cumulative import time in microseconds.
+    """
+    env = dict(os.environ, HOME=str(tmp_path), PYTHONPATH=ROOT)
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", RUN, *argv],
+        env=env,
+        capture_output=True,
+        text=True,
+        timeout=60,
+    )
+    assert proc.returncode == 0, proc.stderr
+
+    total = 0
+    for line in proc.stderr.splitlines():
+        fields = line.split("|")
+        # Top-level imports only: nested ones are part of their parent's total
+        if line.startswith("import time:") and len(fields) == 3 and fields[1].strip().isdigit():
+            if not fields[2].startswith("  "):
+                total += int(fields[1])
+    return set(proc.stdout.split()), total
+
+
+@pytest.mark.parametrize(
+    "argv, command, unused",
+    [
+        (["list"], "list_", ["calendar", "history", "reset", "server"]),
+        (["add", "Two Sum", "3"], "add", ["calendar", "history", "reset", "server"]),
+    ],
+)
+def test_cold_start_imports_only_the_selected_command(argv, command, unused, tmp_path):
+    modules, total = cold_start(argv, tmp_path)
+
+    assert f"srl.commands.{command}" in modules
+    for name in unused:
+        assert f"srl.commands.{name}" not in modules
+    assert "rich.table" not in modules
+    assert "rich.prompt" not in modules
+    assert total > 0
+
+
+# Loaded only to rebuild the due index, write data, reach a daemon or serve HTTP
+HEAVY_MODULES = [
+    "numpy",
+    "orjson",
+    "srl.batch",
+    "srl.scheduling",
+    "srl.daemon",
+    "socketserver",
+    "srl.server",
+    "fastapi",
+    "uvicorn",
+]
+
+
+def test_cold_list_loads_no_heavy_modules(tmp_path):
+    # The add leaves a current due index behind, as in everyday use
+    cold_start(["add", "Two Sum", "3"], tmp_path)
+    modules, _ = cold_start(["list"], tmp_path)
+
+    assert "srl.commands.list_" in modules
+    assert [name for name in HEAVY_MODULES if name in modules] == []
@@ -0,0 +1,217 @@
+import json
+import multiprocessing
+import threading
+from types import SimpleNamespace
+import pytest
+
+from srl import due_index, storage
+from srl.commands import add
+
+
+def _leftovers(directory):
+    return [p.name for p in directory.iterdir() if p.name.endswith(".tmp")]
+
+
+def test_write_is_atomic(mock_data, tmp_path):
+    storage.write_json_file(mock_data.PROGRESS_FILE, {"A": {"history": []}})
+    assert json.loads(mock_data.PROGRESS_FILE.read_text()) == {"A": {"history": []}}
+    assert _leftovers(tmp_path) == []
+
+
+def test_failed_write_keeps_original(mock_data, tmp_path):
+    storage.write_json_file(mock_data.PROGRESS_FILE, {"A": {"history": []}})
+
+    with pytest.raises(TypeError):
+        storage.write_json_file(mock_data.PROGRESS_FILE, {"A": object()})
+
+    assert json.loads(mock_data.PROGRESS_FILE.read_text()) == {"A": {"history": []}}
+    assert _leftovers(tmp_path) == []
+
+
+def test_transaction_commits_together(mock_data, load_json):
+    with storage.transaction():
+        storage.put_entry(mock_data.MASTERED_FILE, "A", {"history": []})
+        storage.put_entry(mock_data.NEXT_UP_FILE, "B", {})
+        # Nothing reaches disk before the block ends
+        assert load_json(mock_data.MASTERED_FILE) == {}
+
+    assert "A" in load_json(mock_data.MASTERED_FILE)
+    assert "B" in load_json(mock_data.NEXT_UP_FILE)
+    assert not mock_data.JOURNAL_FILE.exists()
+
+
+def test_transaction_rolls_back_on_error(mock_data, load_json):
+    with pytest.raises(RuntimeError):
+        with storage.transaction():
+            storage.put_entry(mock_data.MASTERED_FILE, "A", {"history": []})
+            raise RuntimeError("interrupted")
+
+    assert load_json(mock_data.MASTERED_FILE) == {}
+
+
+def test_mastery_moves_problem_in_one_commit(mock_data, console, load_json, monkeypatch):
+    add.handle(SimpleNamespace(identifier="A", rating=5), console)
+
+    def crash(file_path, name):
+        raise RuntimeError("crash")
+
+    # Dying half-way through a move must not leave the problem in both lists
+    monkeypatch.setattr(storage.get_backend(), "delete_entry", crash)
+    with pytest.raises(RuntimeError):
+        add.handle(SimpleNamespace(identifier="A", rating=5), console)
+
+    assert load_json(mock_data.MASTERED_FILE) == {}
+    assert len(load_json(mock_data.PROGRESS_FILE)["A"]["history"]) == 1
+
+
+def test_write_keeps_file_permissions(mock_data, tmp_path):
+    mock_data.PROGRESS_FILE.chmod(0o664)
+    storage.write_json_file(mock_data.PROGRESS_FILE, {"A": {"history": []}})
+    assert mock_data.PROGRESS_FILE.stat().st_mode & 0o777 == 0o664
+
+    new_file = tmp_path / "new.json"
+    storage.write_json_file(new_file, {})
+    assert new_file.stat().st_mode & 0o777 == 0o666 & ~storage._UMASK
+
+
+def test_recover_rolls_journal_forward(mock_data, load_json):
+    tmp = storage._write_temp(mock_data.NEXT_UP_FILE, b'{"B": {}}')
+    storage.write_json_file(
+        mock_data.JOURNAL_FILE, {"renames": [[tmp, str(mock_data.NEXT_UP_FILE)]]}
+    )
+
+    storage.recover_transaction()
+
+    assert load_json(mock_data.NEXT_UP_FILE) == {"B": {}}
+    assert not mock_data.JOURNAL_FILE.exists()
+
+
+def test_recover_waits_for_commit_in_progress(mock_data, load_json):
+    errors = []
+
+    def recover():
+        try:
+            storage.recover_transaction()
+        except Exception as e:
+            errors.append(e)
+
+    with storage.data_lock():
+        # A writer between committing its journal and finishing the renames
+        tmp = storage._write_temp(mock_data.NEXT_UP_FILE, b'{"B": {}}')
+        storage.write_json_file(
+            mock_data.JOURNAL_FILE, {"renames": [[tmp, str(mock_data.NEXT_UP_FILE)]]}
+        )
+        recovering = threading.Thread(target=recover)
+        recovering.start()
+        recovering.join(0.2)
+        assert recovering.is_alive()
+        storage._apply_journal([[tmp, str(mock_data.NEXT_UP_FILE)]])
+    recovering.join()
+
+    assert errors == []
+    assert load_json(mock_data.NEXT_UP_FILE) == {"B": {}}
+
+
+def test_repeated_reads_reuse_parse(mock_data, monkeypatch):
+    storage.write_json_file(mock_data.PROGRESS_FILE, {"A": {"history": []}})
+    storage.invalidate()
+    storage.read_json_file(mock_data.PROGRESS_FILE)
+
+    def fail(*args, **kwargs):
+        raise AssertionError("file parsed again")
+
+    # Pretend the file was written long ago so the stat alone is trusted
+    monkeypatch.setattr(storage, "RACY_WINDOW_NS", -(10**18))
+    storage.read_json_file(mock_data.PROGRESS_FILE)
+    monkeypatch.setattr(storage.codec, "loads", fail)
+    assert storage.read_json_file(mock_data.PROGRESS_FILE) == {"A": {"history": []}}
+
+
+def test_read_returns_private_copy(mock_data):
+    storage.write_json_file(mock_data.PROGRESS_FILE, {"A": {"history": []}})
+
+    data = storage.read_json_file(mock_data.PROGRESS_FILE)
+    data["A"]["history"].append({"rating": 1})
+
+    assert storage.read_json_file(mock_data.PROGRESS_FILE) == {"A": {"history": []}}
+
+
+def test_same_size_edit_in_place_is_seen(mock_data):
+    storage.write_json_file(mock_data.PROGRESS_FILE, {"A": {"rating": 1}})
+    storage.read_json_file(mock_data.PROGRESS_FILE)
+
+    # Same inode and size, possibly the same mtime tick
+    raw = mock_data.PROGRESS_FILE.read_bytes().replace(b"1", b"2")
+    with open(mock_data.PROGRESS_FILE, "r+b") as f:
+        f.write(raw)
+
+    assert storage.read_json_file(mock_data.PROGRESS_FILE) == {"A": {"rating": 2}}
+
+
+def test_find_name_ignores_case_and_slug_form(mock_data):
+    storage.write_json_file(mock_data.PROGRESS_FILE, {"Two Sum": {"history": []}, "two sum": {"history": []}})
+
+    assert storage.find_name(mock_data.PROGRESS_FILE, "two sum") == "two sum"
+    assert storage.find_name(mock_data.PROGRESS_FILE, "TWO-SUM") == "Two Sum"
+    assert storage.find_name(mock_data.PROGRESS_FILE, "https://leetcode.com/problems/two-sum/") == "Two Sum"
+    assert storage.find_name(mock_data.PROGRESS_FILE, "Three Sum") is None
+
+
+def test_name_index_follows_entry_writes(mock_data, monkeypatch):
+    storage.write_json_file(mock_data.PROGRESS_FILE, {"A": {"history": []}})
+    storage.find_name(mock_data.PROGRESS_FILE, "a")
+
+    def fail(name):
+        raise AssertionError("index rebuilt")
+
+    key = storage.name_key
+    monkeypatch.setattr(storage, "name_key", lambda name: fail(name) if name == "A" else key(name))
+    storage.put_entry(mock_data.PROGRESS_FILE, "Valid Anagram", {"history": []})
+    assert storage.find_name(mock_data.PROGRESS_FILE, "valid-anagram") == "Valid Anagram"
+    storage.delete_entry(mock_data.PROGRESS_FILE, "Valid Anagram")
+    assert storage.find_name(mock_data.PROGRESS_FILE, "valid anagram") is None
+
+    # Whole-document saves are picked up
+    monkeypatch.setattr(storage, "name_key", key)
+    storage.save_json(mock_data.PROGRESS_FILE, {"B": {"history": []}})
+    assert storage.find_name(mock_data.PROGRESS_FILE, "a") is None
+    assert storage.find_name(mock_data.PROGRESS_FILE, "b") == "B"
+
+
+def _add_attempts(names, count):
+    for i in range(count):
+        add.record_attempt(names[i % len(names)], 3)
+
+
+@pytest.mark.skipif(storage.fcntl is None, reason="needs fcntl")
+def test_parallel_adds_lose_no_attempt(mock_data, load_json):
+    ctx = multiprocessing.get_context("fork")
+    names = ["Two Sum", "Merge Intervals", "LRU Cache"]
+    due_index.load()
+    workers = [ctx.Process(target=_add_attempts, args=(names, 25)) for _ in range(8)]
+    for worker in workers:
+        worker.start()
+
+    # Threads of this process contend for the same lock
+    threads = [threading.Thread(target=_add_attempts, args=(names, 25)) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    for worker in workers:
+        worker.join()
+        assert worker.exitcode == 0
+
+    progress = load_json(mock_data.PROGRESS_FILE)
+    assert sum(len(entry["history"]) for entry in progress.values()) == 12 * 25
+    # Every process kept the due index in step under the same lock
+    index = due_index.load()
+    assert index["rows"] == due_index.build(storage.get_backend())["rows"]
+    assert index["source"] == due_index.build(storage.get_backend())["source"]
+
+
+def test_data_lock_is_reentrant(mock_data):
+    with storage.data_lock():
+        with storage.transaction():
+            storage.put_entry(mock_data.NEXT_UP_FILE, "A", {})
+    assert storage.get_entry(mock_data.NEXT_UP_FILE, "A") == {}
@@ -0,0 +1,55 @@
+import time
+from srl import storage, timing
+
+
+def test_phases_are_off_unless_recorded():
+    with timing.phase("load"):
+        timing.count(10)
+
+    with timing.record() as timings:
+        pass
+    assert timings.rows() == []
+
+
+def test_time_is_charged_to_the_innermost_phase():
+    with timing.record() as timings:
+        with timing.phase("compute"):
+            time.sleep(0.02)
+            with timing.phase("load"):
+                with timing.phase("load"):
+                    timing.count(100)
+                    time.sleep(0.02)
+            timing.count(0)
+
+    rows = {name: (seconds, nbytes, calls) for name, seconds, nbytes, calls in timings.rows()}
+    assert list(rows) == ["load", "compute"]
+    assert rows["load"][1:] == (100, 1)
+    assert rows["compute"][1:] == (0, 1)
+    assert 0.015 < rows["load"][0] < 0.04
+    assert 0.015 < rows["compute"][0] < 0.04
+    assert sum(seconds for seconds, _, _ in rows.values()) <= timings.total
+
+
+def test_storage_reports_loads_and_saves(mock_data):
+    storage.save_json(mock_data.PROGRESS_FILE, {"Two Sum": {"history": []}})
+    storage.invalidate()
+
+    with timing.record() as timings:
+        storage.load_json(mock_data.PROGRESS_FILE)
+        storage.put_entry(mock_data.PROGRESS_FILE, "Jump Game", {"history": []})
+
+    size = mock_data.PROGRESS_FILE.stat().st_size
+    rows = {name: (nbytes, calls) for name, _, nbytes, calls in timings.rows()}
+    assert rows["load"][0] > 0
+    assert rows["save"][0] >= size
+
+
+def test_server_timing_header():
+    with timing.record() as timings:
+        with timing.phase("load"):
+            timing.count(42)
+
+    header = timings.server_timing()
+    assert header.startswith('load;dur=')
+    assert 'desc="42 bytes"' in header
+    assert ", total;dur=" in header